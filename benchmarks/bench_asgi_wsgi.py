@@ -0,0 +1,113 @@
+"""
+WSGI vs ASGI benchmark for the self-service endpoints.
+
+Compares requests per second and server memory per concurrent connection of
+the sync views (`/api/v1/user/me/`, ...) served by gunicorn and their async
+variants (`/api/v1/async/user/me/`, ...) served by uvicorn.
+
+Usage:
+    pip install -e .[dev] gunicorn uvicorn psutil
+    gunicorn demo.wsgi -w 1 --threads 32 -b 127.0.0.1:8001 &
+    uvicorn demo.asgi:application --workers 1 --port 8002 &
+    python benchmarks/bench_asgi_wsgi.py --token <access token> \\
+        --wsgi http://127.0.0.1:8001 --wsgi-pid <gunicorn worker pid> \\
+        --asgi http://127.0.0.1:8002 --asgi-pid <uvicorn pid>
+
+Give both servers one worker so the RSS of a single process is compared.
+Memory is only reported when psutil is installed and the pids are given.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ENDPOINTS = {
+    'user/me': ('/users/api/v1/user/me/', '/users/api/v1/async/user/me/'),
+    'user/my_data': ('/users/api/v1/user/my_data/', '/users/api/v1/async/user/my_data/'),
+    'profile/me': ('/users/api/v1/profile/me/', '/users/api/v1/async/profile/me/'),
+}
+
+
+def rss(pid):
+    if psutil is None or pid is None:
+        return None
+    process = psutil.Process(pid)
+    return process.memory_info().rss + sum(
+        child.memory_info().rss for child in process.children(recursive=True)
+    )
+
+
+async def run(base_url, path, token, concurrency, duration):
+    """Keeps `concurrency` connections busy for `duration` seconds."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {'Authorization': f'Bearer {token}'}
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        'errors': errors,
+    }
+
+
+async def main(args):
+    print(f'psutil installed: {psutil is not None}')
+    print(f'{"endpoint":>14} {"server":>6} {"conc":>5} {"req/s":>9} {"p50 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>7} {"KiB/conn":>9}')
+
+    servers = (('wsgi', args.wsgi, args.wsgi_pid), ('asgi', args.asgi, args.asgi_pid))
+    for (name, paths) in ENDPOINTS.items():
+        for (index, (server, base_url, pid)) in enumerate(servers):
+            # Warm up connections, caches and the DB pool
+            await run(base_url, paths[index], args.token, 4, 1)
+            for concurrency in args.concurrency:
+                idle = rss(pid)
+                result = await run(base_url, paths[index], args.token, concurrency, args.duration)
+                busy = rss(pid)
+                per_connection = ''
+                if idle is not None and busy is not None:
+                    per_connection = f'{(busy - idle) / concurrency / 1024:.1f}'
+                print(f'{name:>14} {server:>6} {concurrency:>5} {result["rps"]:>9.1f} '
+                      f'{result["p50"]:>8.2f} {result["p99"]:>8.2f} {result["errors"]:>7} '
+                      f'{per_connection:>9}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--token', required=True, help='Access token of an existing user')
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8001')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8002')
+    parser.add_argument('--wsgi-pid', type=int)
+    parser.add_argument('--asgi-pid', type=int)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64, 256])
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+    asyncio.run(main(parser.parse_args()))
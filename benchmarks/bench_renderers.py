@@ -0,0 +1,95 @@
+"""
+Renderer and compression benchmark for 100 and 1000 row user pages.
+
+Usage:
+    pip install -e .[fast]
+    python benchmarks/bench_renderers.py
+
+The rows mimic the `UserSerializer` output (plus raw UUID/date/lazy string
+values, which the fast renderer handles natively).
+"""
+import gzip
+import statistics
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+settings.configure(
+    INSTALLED_APPS=['rest_framework'],
+    USE_I18N=True,
+    USE_TZ=True,
+)
+django.setup()
+
+from django.utils.translation import gettext_lazy as _  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from dj_users.presentation.v1.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_rows(count):
+    return [
+        {
+            'id': pk,
+            'username': f'user{pk}',
+            'email': f'user{pk}@example.com',
+            'first_name': 'Nombre',
+            'last_name': f'Apellido {pk}',
+            'phone_number': '5550000000',
+            'birth_date': date(1990, 1, 1),
+            'image': None,
+            'is_active': True,
+            'is_staff': False,
+            'user_type': _('Paciente'),
+            'is_email_confirmed': bool(pk % 2),
+            'agenda_token': uuid.uuid4(),
+            'last_login': datetime(2025, 1, 1, tzinfo=timezone.utc),
+            'date_joined': datetime(2024, 1, 1, tzinfo=timezone.utc),
+            'universal_state': 'active',
+            'groups': [1, 2],
+            'user_permissions': [],
+        }
+        for pk in range(count)
+    ]
+
+
+def measure(func, number=50, repeat=5):
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return statistics.median(timings) / number * 1000
+
+
+def main():
+    print(f'orjson installed: {orjson is not None}, brotli installed: {brotli is not None}')
+    print(f'{"rows":>6} {"renderer":>10} {"ms/page":>9} {"bytes":>9} '
+          f'{"gzip B":>9} {"gzip ms":>8} {"br B":>9} {"br ms":>8}')
+
+    for count in (100, 1000):
+        data = {'count': count, 'next': None, 'previous': None, 'results': build_rows(count)}
+        for name, renderer in (('drf', JSONRenderer()), ('fast', FastJSONRenderer())):
+            body = renderer.render(data)
+            render_ms = measure(lambda: renderer.render(data))
+            gz = gzip.compress(body, compresslevel=6, mtime=0)
+            gz_ms = measure(lambda: gzip.compress(body, compresslevel=6, mtime=0), number=20)
+            if brotli is not None:
+                br = len(brotli.compress(body, quality=4))
+                br_ms = measure(lambda: brotli.compress(body, quality=4), number=20)
+            else:
+                br, br_ms = 0, 0.0
+            print(f'{count:>6} {name:>10} {render_ms:>9.3f} {len(body):>9} '
+                  f'{len(gz):>9} {gz_ms:>8.3f} {br:>9} {br_ms:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,40 @@
+import logging
 import os
+from collections.abc import Sequence
 from dotenv import load_dotenv
 from datetime import timedelta
+from functools import cached_property
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+logger = logging.getLogger(__name__)
 load_dotenv(BASE_DIR / '.env')
 
-from dj_core_utils.settings.cors import get_cors_settings # noqa
 from dj_core_utils.settings.base import CoreSettings # noqa
 
 
+class LazyCorsOrigins(Sequence):
+    """Allowed origins loaded with `get_cors_settings` on first use, not at import"""
+
+    def __init__(self, project):
+        self.project = project
+
+    @cached_property
+    def origins(self):
+        from dj_core_utils.settings.cors import get_cors_settings
+        try:
+            return list(get_cors_settings(self.project)['CORS_ALLOWED_ORIGINS'])
+        except Exception:
+            logger.exception("Error loading CORS settings")
+            return []
+
+    def __getitem__(self, index):
+        return self.origins[index]
+
+    def __len__(self):
+        return len(self.origins)
+
+
 class BaseSetting(CoreSettings):
     # Database settings
     DATABASES = {
@@ -31,6 +56,8 @@ class BaseSetting(CoreSettings):
     # Middleware
     MIDDLEWARE = CoreSettings.MIDDLEWARE + [
         'django.middleware.security.SecurityMiddleware',
+        'dj_users.presentation.middleware.CompressionMiddleware',
+        'dj_users.presentation.middleware.SlowQueryMiddleware',
         'django.contrib.sessions.middleware.SessionMiddleware',
         'django.middleware.common.CommonMiddleware',
         'django.middleware.csrf.CsrfViewMiddleware',
@@ -41,12 +68,68 @@ class BaseSetting(CoreSettings):
         'django.middleware.locale.LocaleMiddleware',
     ]
 
+    # DRF
+    REST_FRAMEWORK = {
+        **getattr(CoreSettings, 'REST_FRAMEWORK', {}),
+        'DEFAULT_RENDERER_CLASSES': [
+            'dj_users.presentation.v1.renderers.FastJSONRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+        'DEFAULT_PARSER_CLASSES': [
+            'dj_users.presentation.v1.renderers.FastJSONParser',
+            'rest_framework.parsers.FormParser',
+            'rest_framework.parsers.MultiPartParser',
+        ],
+        # Revoked tokens are rejected and archived users restored
+        'DEFAULT_AUTHENTICATION_CLASSES': [
+            'dj_users.presentation.v1.authentication.GenerationJWTAuthentication',
+            'rest_framework.authentication.SessionAuthentication',
+        ],
+    }
+
+    # Restores archived users on login
+    AUTHENTICATION_BACKENDS = [
+        'dj_users.presentation.v1.authentication.ArchiveRestoringBackend',
+    ]
+
     # JWT
     SIMPLE_JWT = {
         **CoreSettings.SIMPLE_JWT,
         'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),
     }
 
+    # Celery beat
+    CELERY_BEAT_SCHEDULE = {
+        'dj_users.dispatch_confirmation_emails': {
+            'task': 'dj_users.dispatch_confirmation_emails',
+            'schedule': timedelta(seconds=30),
+        },
+        'dj_users.rebuild_signup_rollups': {
+            'task': 'dj_users.rebuild_signup_rollups',
+            'schedule': timedelta(hours=1),
+        },
+        'dj_users.find_duplicate_patients': {
+            'task': 'dj_users.find_duplicate_patients',
+            'schedule': timedelta(hours=6),
+        },
+        'dj_users.purge_terminated_users': {
+            'task': 'dj_users.purge_terminated_users',
+            'schedule': timedelta(days=1),
+        },
+        'dj_users.archive_inactive_users': {
+            'task': 'dj_users.archive_inactive_users',
+            'schedule': timedelta(days=1),
+        },
+        'dj_users.relay_change_events': {
+            'task': 'dj_users.relay_change_events',
+            'schedule': timedelta(seconds=10),
+        },
+        'dj_users.prune_change_events': {
+            'task': 'dj_users.prune_change_events',
+            'schedule': timedelta(days=1),
+        },
+    }
+
     # Otros settings
     ROOT_URLCONF = 'demo.urls'
     WSGI_APPLICATION = "demo.wsgi.application"
@@ -87,10 +170,7 @@ class BaseSetting(CoreSettings):
     DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
     # CORS
-    try:
-        CORS_ALLOWED_ORIGINS = get_cors_settings('diiwo_backend')['CORS_ALLOWED_ORIGINS']  # noqa
-    except Exception as e:
-        print(f"Error loading CORS settings: {e}")
+    CORS_ALLOWED_ORIGINS = LazyCorsOrigins('diiwo_backend')
 
     ALLOWED_HOSTS = CoreSettings.ALLOWED_HOSTS
 
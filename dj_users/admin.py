@@ -1,16 +1,33 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from dj_core_utils.db.mixins import (
     UniversalState
 )
 
+from .application.domain.change_events import ChangeAction
+from .application.domain.duplicates import DuplicateStatus
 from .models import (
+    ArchivedUser,
+    ChangeEvent,
     Clinic,
+    ConfirmationEmail,
+    DoctorDirectoryEntry,
+    DuplicateCandidate,
+    DuplicateScanRun,
+    SlowQueryStat,
+    SignupRollup,
     CustomUser,
     DoctorProfile,
     NurseProfile,
+    NurseService,
     PatientProfile,
 )
 
@@ -34,7 +51,14 @@ class CustomUserAdmin(BaseUserAdmin):
         ),
         (_('Rol y estatus'), {'fields': ('user_type', 'is_email_confirmed')}),
         (_('Acceso y bloqueo'), {'fields': ('universal_state', 'object_locked', 'lock_type')}),
-        (_('Agenda y tokens'), {'fields': ('agenda_token', 'confirmation_token')}),
+        (_('Agenda y tokens'), {
+            'fields': (
+                'agenda_token',
+                'confirmation_token',
+                'confirmation_token_created_at',
+                'token_generation',
+            )
+        }),
         (_('Permisos'), {
             'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')
         }),
@@ -96,6 +120,8 @@ class CustomUserAdmin(BaseUserAdmin):
         'created_by',
         'updated_by',
         'confirmation_token',
+        'confirmation_token_created_at',
+        'token_generation',
         'agenda_token',
         'last_login',
         'date_joined',
@@ -104,23 +130,198 @@ class CustomUserAdmin(BaseUserAdmin):
         'lock_type',
     )
 
-    # Custom actions
+    # Custom actions. The admin is imported by `django.setup()`, so the logic
+    # they call is imported when they run.
     actions = ['set_active', 'set_frozen', 'set_terminated']
 
+    # `queryset.update()` sends no signals, the actions do what the
+    # `CustomUser` receivers would. The ids are read first because the
+    # changelist filters (e.g. by state) no longer match after the update.
+    @transaction.atomic
     def set_active(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         queryset.update(universal_state=UniversalState.ACTIVE)
+        self._record_state_change(user_ids)
     set_active.short_description = _('Marcar como ACTIVE')
 
+    @transaction.atomic
     def set_frozen(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         queryset.update(universal_state=UniversalState.FROZEN)
+        from .application.logic.token_revocation import revoke_user_tokens
+        revoke_user_tokens(user_ids)
+        self._record_state_change(user_ids)
     set_frozen.short_description = _('Marcar como FROZEN')
 
+    @transaction.atomic
     def set_terminated(self, request, queryset):
-        queryset.update(universal_state=UniversalState.TERMINATED)
+        user_ids = list(queryset.values_list('pk', flat=True))
+        # `updated_at` starts the retention grace period
+        queryset.update(universal_state=UniversalState.TERMINATED, updated_at=timezone.now())
+        from .application.logic.token_revocation import revoke_user_tokens
+        revoke_user_tokens(user_ids)
+        self._record_state_change(user_ids)
     set_terminated.short_description = _('Marcar como TERMINATED')
 
+    def _record_state_change(self, user_ids):
+        from .application.logic.change_events import record_user_changes
+        from .application.logic.doctor_directory import sync_doctor_directory
+        record_user_changes(user_ids, ChangeAction.STATE_CHANGED, ['universal_state'])
+        sync_doctor_directory(
+            DoctorProfile.objects.filter(user_id__in=user_ids).values_list('pk', flat=True)
+        )
+
+    # The change form already runs in a transaction, so the event commits
+    # with the save.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        from .application.logic.change_events import record_change
+        if change:
+            record_change(obj, ChangeAction.UPDATED, form.changed_data)
+        else:
+            record_change(obj, ChangeAction.CREATED)
+
+    # Per-request profiles of staff users (infrastructure.request_profiler)
+    def get_urls(self):
+        return [
+            path(
+                'profiles/',
+                self.admin_site.admin_view(self.request_profiles_view),
+                name='dj_users_request_profiles',
+            ),
+            path(
+                'profiles/<int:profile_id>/',
+                self.admin_site.admin_view(self.request_profile_view),
+                name='dj_users_request_profile',
+            ),
+        ] + super().get_urls()
+
+    def _profiles_context(self, request, title):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        return {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': title,
+        }
+
+    def request_profiles_view(self, request):
+        from .application.utils.settings import get_setting
+        from .infrastructure.request_profiler import list_profiles, make_profiling_token
+        context = self._profiles_context(request, _('Perfiles de peticiones'))
+        context.update({
+            'profiles': list_profiles(),
+            'token': make_profiling_token(request.user),
+            'token_max_age': get_setting('PROFILING_TOKEN_MAX_AGE_SECONDS'),
+            'header': get_setting('PROFILING_HEADER'),
+            'query_param': get_setting('PROFILING_QUERY_PARAM'),
+        })
+        return TemplateResponse(request, 'admin/dj_users/request_profiles.html', context)
+
+    def request_profile_view(self, request, profile_id):
+        from .infrastructure.request_profiler import get_profile
+        profile = get_profile(profile_id)
+        if profile is None:
+            raise Http404
+        context = self._profiles_context(request, _('Perfil de petición %s') % profile_id)
+        context['profile'] = profile
+        return TemplateResponse(request, 'admin/dj_users/request_profile.html', context)
+
 
 admin.site.register(Clinic)
 admin.site.register(DoctorProfile)
-admin.site.register(NurseProfile)
 admin.site.register(PatientProfile)
+
+
+@admin.register(ConfirmationEmail)
+class ConfirmationEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('user__email', 'user__username')
+    raw_id_fields = ('user',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+
+@admin.register(SignupRollup)
+class SignupRollupAdmin(admin.ModelAdmin):
+    list_display = ('bucket_start', 'granularity', 'user_type', 'count')
+    list_filter = ('granularity', 'user_type')
+    date_hierarchy = 'bucket_start'
+
+
+@admin.register(DoctorDirectoryEntry)
+class DoctorDirectoryEntryAdmin(admin.ModelAdmin):
+    list_display = ('doctor', 'full_name', 'specialty', 'clinic_name')
+    search_fields = ('full_name',)
+    raw_id_fields = ('doctor', 'clinic')
+
+
+@admin.register(NurseProfile)
+class NurseProfileAdmin(admin.ModelAdmin):
+    # `services` is derived from `available_services` on save
+    readonly_fields = ('services',)
+
+
+@admin.register(NurseService)
+class NurseServiceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    list_display = ('cluster', 'user', 'duplicate', 'score', 'status', 'created_at')
+    list_filter = ('status',)
+    ordering = ('cluster', '-score')
+    raw_id_fields = ('user', 'duplicate')
+    readonly_fields = ('cluster', 'score', 'created_at', 'reviewed_at')
+    actions = ['set_confirmed', 'set_dismissed']
+
+    def set_confirmed(self, request, queryset):
+        queryset.update(status=DuplicateStatus.CONFIRMED, reviewed_at=timezone.now())
+    set_confirmed.short_description = _('Confirmar duplicados')
+
+    def set_dismissed(self, request, queryset):
+        queryset.update(status=DuplicateStatus.DISMISSED, reviewed_at=timezone.now())
+    set_dismissed.short_description = _('Descartar duplicados')
+
+
+@admin.register(DuplicateScanRun)
+class DuplicateScanRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'full', 'users_scanned', 'candidates_found')
+    list_filter = ('full',)
+
+
+@admin.register(ArchivedUser)
+class ArchivedUserAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'username', 'email', 'user_type', 'last_login', 'archived_at')
+    list_filter = ('user_type',)
+    search_fields = ('username', 'email')
+    readonly_fields = ('data',)
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'entity', 'entity_id', 'action', 'user_id', 'created_at', 'relayed_at')
+    list_filter = ('entity', 'action')
+    search_fields = ('=entity_id', '=user_id')
+
+
+@admin.register(SlowQueryStat)
+class SlowQueryStatAdmin(admin.ModelAdmin):
+    list_display = (
+        'origin', 'count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms', 'last_seen',
+    )
+    search_fields = ('origin', 'normalized_sql')
+    ordering = ('-total_ms',)
+    readonly_fields = (
+        'fingerprint', 'origin', 'normalized_sql', 'plan', 'count', 'total_ms', 'max_ms',
+        'p50_ms', 'p95_ms', 'p99_ms', 'histogram', 'first_seen', 'last_seen',
+    )
+
+    # Written by infrastructure.slow_queries, rows can only be deleted to reset them
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,18 @@
+# ======================================================================
+# EMAIL MESSAGES
+# ======================================================================
+from django.utils.translation import gettext_lazy as _
+
+
+class ConfirmationEmailMessages:
+    SUBJECT = _("Confirma tu correo electrónico")
+    BODY = _(
+        "Hola %(name)s,\n\n"
+        "Para confirmar tu correo electrónico abre el siguiente enlace:\n"
+        "%(link)s\n\n"
+        "Si no creaste esta cuenta puedes ignorar este mensaje."
+    )
+
+
+class EmailMessages:
+    Confirmation = ConfirmationEmailMessages
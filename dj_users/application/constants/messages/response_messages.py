@@ -13,6 +13,15 @@ class RegistrationResponseMessages:
     USER_SUCCESSFULLY_REGISTERED = _("Usuario registrado con éxito.")
 
 
+class EmailConfirmationResponseMessages:
+    PENDING = _("Confirma tu correo para terminar de activar tu cuenta.")
+    CONFIRMED = _("Correo confirmado con éxito.")
+    ALREADY_CONFIRMED = _("El correo ya había sido confirmado.")
+    EXPIRED = _("El enlace de confirmación expiró. Solicita uno nuevo.")
+    INVALID = _("El enlace de confirmación no es válido.")
+    CONFIRMATION_SENT = _("Se envió un nuevo correo de confirmación.")
+
+
 class ProfileResponseMessages:
     NO_PERMISSION_TO_LIST_PROFILES = _("No tienes permiso para listar perfiles.")
 
@@ -21,8 +30,32 @@ class AdminResponseMessages:
     SHOULD_SEND_PARAMETER_USER_TYPE = _("Debes proporcionar el parámetro `user_type`")
 
 
+class AuthResponseMessages:
+    TOO_MANY_LOGIN_ATTEMPTS = _(
+        "Demasiados intentos de inicio de sesión. Inténtalo de nuevo más tarde."
+    )
+    LOGIN_BUSY = _("El servicio de autenticación está ocupado. Inténtalo de nuevo.")
+
+
+class StatsResponseMessages:
+    NO_PERMISSION_TO_VIEW_STATS = _("No tienes permisos para ver estadísticas")
+    NO_PERMISSION_FOR_USER_TYPE = _(
+        "No tienes permisos para ver estadísticas de este tipo de usuario."
+    )
+
+
+class ConcurrencyResponseMessages:
+    PRECONDITION_FAILED = _(
+        "El recurso fue modificado por otra petición. Vuelve a cargarlo e inténtalo de nuevo."
+    )
+
+
 class ResponseMessages:
     User = UserResponseMessages
     Registration = RegistrationResponseMessages
+    EmailConfirmation = EmailConfirmationResponseMessages
     Profile = ProfileResponseMessages
     Admin = AdminResponseMessages
+    Concurrency = ConcurrencyResponseMessages
+    Auth = AuthResponseMessages
+    Stats = StatsResponseMessages
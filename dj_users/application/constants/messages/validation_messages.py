@@ -27,8 +27,57 @@ class PermissionsValidationMessages:
     ROL_NOT_PERMITED = _("Rol no permitido.")
 
 
+class BulkValidationMessages:
+    TOO_MANY_IDS = _("No puedes solicitar más de %(max)s identificadores a la vez.")
+    TOO_MANY_ITEMS = _("No puedes actualizar más de %(max)s usuarios a la vez.")
+    DUPLICATED_ID = _("El usuario aparece más de una vez en la petición.")
+    DUPLICATED_EMAIL_IN_REQUEST = _("Este correo se repite en otra fila de la petición.")
+    USER_NOT_FOUND = _("Usuario no encontrado.")
+    FIELD_NOT_UPDATABLE = _("Este campo no se puede actualizar en lote.")
+    CONFLICT = _("Otro usuario registró uno de estos valores mientras se procesaba la petición.")
+
+
+class AuthValidationMessages:
+    TOKEN_REVOKED = _("El token fue revocado.")
+    TOKEN_WITHOUT_USER = _("El token no contiene una identificación de usuario reconocible.")
+    USER_INACTIVE = _("El usuario está inactivo.")
+
+
+class StatsValidationMessages:
+    END_BEFORE_START = _("La fecha final debe ser posterior a la inicial.")
+    HOURLY_RANGE_TOO_LONG = _("Las series por hora abarcan como máximo %(max)s días.")
+
+
+class PaginationValidationMessages:
+    INVALID_CURSOR = _("El cursor de paginación no es válido.")
+
+
+class NurseServicesValidationMessages:
+    TOO_MANY_SERVICES = _("Se solicitaron demasiados servicios en una sola búsqueda.")
+
+
+class AutocompleteValidationMessages:
+    EMPTY_QUERY = _("Escribe al menos una letra para buscar.")
+
+
+class AvailabilityValidationMessages:
+    MISSING_VALUE = _("Debes enviar `username` o `email`.")
+
+
+class ChangeFeedValidationMessages:
+    INVALID_ENTITY = _("Tipo de entidad no válido.")
+
+
 class ValidationMessages:
     User = UserValidationMessages
     Password = PasswordValidationMessages
     Registration = RegistrationValidationMessages
     Permissions = PermissionsValidationMessages
+    Bulk = BulkValidationMessages
+    Auth = AuthValidationMessages
+    Stats = StatsValidationMessages
+    Pagination = PaginationValidationMessages
+    NurseServices = NurseServicesValidationMessages
+    Autocomplete = AutocompleteValidationMessages
+    Availability = AvailabilityValidationMessages
+    ChangeFeed = ChangeFeedValidationMessages
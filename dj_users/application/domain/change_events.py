@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class ChangeEntity(models.TextChoices):
+    USER = 'user', 'Usuario'
+    DOCTOR_PROFILE = 'doctor_profile', 'Perfil de médico'
+    PATIENT_PROFILE = 'patient_profile', 'Perfil de paciente'
+    NURSE_PROFILE = 'nurse_profile', 'Perfil de enfermería'
+    CLINIC = 'clinic', 'Clínica'
+
+
+class ChangeAction(models.TextChoices):
+    CREATED = 'created', 'Creado'
+    UPDATED = 'updated', 'Actualizado'
+    DELETED = 'deleted', 'Eliminado'
+    STATE_CHANGED = 'state_changed', 'Cambio de estado'
+    PASSWORD_CHANGED = 'password_changed', 'Cambio de contraseña'
@@ -0,0 +1,7 @@
+from django.db import models
+
+
+class DuplicateStatus(models.TextChoices):
+    PENDING = 'pending', 'Pendiente'
+    CONFIRMED = 'confirmed', 'Confirmado'
+    DISMISSED = 'dismissed', 'Descartado'
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class EmailConfirmationStatus(models.TextChoices):
+    PENDING = 'pending', 'Pendiente'
+    CONFIRMED = 'confirmed', 'Confirmado'
+    ALREADY_CONFIRMED = 'already_confirmed', 'Ya confirmado'
+    EXPIRED = 'expired', 'Expirado'
+    INVALID = 'invalid', 'Inválido'
+
+
+class ConfirmationEmailStatus(models.TextChoices):
+    PENDING = 'pending', 'Pendiente'
+    SENDING = 'sending', 'Enviando'
+    SENT = 'sent', 'Enviado'
+    FAILED = 'failed', 'Fallido'
+    CANCELLED = 'cancelled', 'Cancelado'
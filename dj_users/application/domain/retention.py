@@ -0,0 +1,6 @@
+from django.db import models
+
+
+class RetentionMode(models.TextChoices):
+    ANONYMIZE = 'anonymize', 'Anonimizar'
+    DELETE = 'delete', 'Eliminar'
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class RollupGranularity(models.TextChoices):
+    HOUR = 'hour', 'Hora'
+    DAY = 'day', 'Día'
+
+
+class SeriesGranularity(models.TextChoices):
+    HOUR = 'hour', 'Hora'
+    DAY = 'day', 'Día'
+    WEEK = 'week', 'Semana'
+    MONTH = 'month', 'Mes'
@@ -0,0 +1,219 @@
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.core import serializers
+from django.db import IntegrityError, router, transaction
+from django.db.models import ProtectedError, Q, RestrictedError
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.logic.change_events import record_change, record_user_changes
+from dj_users.application.logic.doctor_directory import bump_directory_version
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import (
+    ArchivedUser,
+    Clinic,
+    ConfirmationEmail,
+    CustomUser,
+    DoctorProfile,
+    NurseProfile,
+    PatientBlockingKey,
+    PatientProfile,
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODELS = (DoctorProfile, PatientProfile, NurseProfile)
+# Other rows of a user that are archived and restored with it
+USER_ROW_MODELS = (ConfirmationEmail, PatientBlockingKey)
+# Models an archived user's cascade may reach; any other row keeps it in place
+RESTORABLE_MODELS = (CustomUser,) + PROFILE_MODELS + USER_ROW_MODELS
+# Lookups accepted by `restore_archived_user`
+LOOKUP_FIELDS = ('user_id', 'username', 'email', 'agenda_token')
+
+
+def _inactive_users():
+    cutoff = timezone.now() - timedelta(days=get_setting('ARCHIVE_INACTIVE_DAYS'))
+    return CustomUser.objects.filter(
+        Q(last_login__lt=cutoff) | Q(last_login__isnull=True, date_joined__lt=cutoff),
+        is_staff=False,
+        is_superuser=False,
+        anonymized_at__isnull=True,
+    ).exclude(
+        # Doctors stay listed in the directory and the nearby search
+        user_type__in=[UserRole.ADMIN, UserRole.DOCTOR],
+    ).exclude(
+        # Left to the retention purge
+        universal_state=UniversalState.TERMINATED,
+    ).exclude(
+        # Clinics (and their doctors) depend on their owner
+        pk__in=Clinic.objects.values('owner_id'),
+    )
+
+
+def _is_restorable(model) -> bool:
+    if model in RESTORABLE_MODELS:
+        return True
+    # Auto-created M2M tables (groups, permissions, nurse services) come back
+    # with the M2M fields of the serialized rows
+    return model._meta.auto_created and any(
+        field.related_model in RESTORABLE_MODELS for field in model._meta.fields
+    )
+
+
+def _has_unrestorable_rows(user) -> bool:
+    """
+    True if deleting `user` would cascade to rows `restore_archived_user`
+    can't bring back: duplicate candidates, directory entries or rows of
+    other apps (appointments...).
+    """
+    collector = Collector(using=router.db_for_write(CustomUser))
+    try:
+        collector.collect([user])
+    except (ProtectedError, RestrictedError):
+        return True
+    if any(
+        instances and not _is_restorable(model)
+        for (model, instances) in collector.data.items()
+    ):
+        return True
+    # Fast deletes are querysets that may match nothing
+    return any(
+        not _is_restorable(queryset.model) and queryset.exists()
+        for queryset in collector.fast_deletes
+    )
+
+
+def _serialize(users) -> dict:
+    """The user, its profile and its `USER_ROW_MODELS` rows, user first."""
+    related = {}
+    for model in PROFILE_MODELS + USER_ROW_MODELS:
+        for row in model.objects.filter(user__in=users).order_by('pk'):
+            related.setdefault(row.user_id, []).append(row)
+
+    data = {}
+    for user in users:
+        objects = [user] + related.get(user.pk, [])
+        # Through JSON so dates and UUIDs are stored as strings
+        data[user.pk] = json.loads(serializers.serialize('json', objects))
+    return data
+
+
+def _archive_chunk(user_ids) -> int:
+    with transaction.atomic():
+        users = list(
+            _inactive_users().filter(pk__in=user_ids)
+            .select_for_update(skip_locked=True)
+            .prefetch_related('groups', 'user_permissions')
+        )
+        if not users:
+            return 0
+        data = _serialize(users)
+
+        archived = []
+        for user in users:
+            if _has_unrestorable_rows(user):
+                logger.info('User %s has rows that can not be archived, keeping it', user.pk)
+                continue
+            try:
+                with transaction.atomic():
+                    ArchivedUser.objects.create(
+                        user_id=user.pk,
+                        username=user.username,
+                        email=user.email,
+                        agenda_token=user.agenda_token,
+                        user_type=user.user_type,
+                        last_login=user.last_login,
+                        data=data[user.pk],
+                    )
+                    user.delete()
+                archived.append(user)
+            except (IntegrityError, ProtectedError):
+                logger.info('User %s can not be archived, keeping it', user.pk)
+
+        record_user_changes([user.pk for user in archived], ChangeAction.DELETED)
+        if any(user.user_type == UserRole.DOCTOR for user in archived):
+            bump_directory_version()
+    return len(archived)
+
+
+def archive_inactive_users(chunk_size: int = None, pause: float = None) -> int:
+    """
+    Moves users that have not logged in for `DJ_USERS_ARCHIVE_INACTIVE_DAYS`
+    to `ArchivedUser`, together with their profile and `USER_ROW_MODELS`
+    rows, in primary key chunks of short transactions. Staff, admins,
+    doctors, clinic owners, TERMINATED users and users whose deletion would
+    cascade to any other row stay in place.
+
+    Returns:
+    int: Number of users archived.
+    """
+    chunk_size = chunk_size or get_setting('ARCHIVE_CHUNK_SIZE')
+    pause = get_setting('ARCHIVE_CHUNK_PAUSE_SECONDS') if pause is None else pause
+
+    total = 0
+    last_pk = 0
+    while True:
+        user_ids = list(
+            _inactive_users().filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return total
+        last_pk = user_ids[-1]
+
+        total += _archive_chunk(user_ids)
+        if pause:
+            time.sleep(pause)
+
+
+def is_archived(**lookup) -> bool:
+    """True if an archived user matches e.g. `username=` or `email=`."""
+    return ArchivedUser.objects.filter(**lookup).exists()
+
+
+def get_archived_password(**lookup):
+    """
+    Password hash of the archived user matching `lookup`, read from its
+    serialized row without restoring it. None if nothing is archived.
+    """
+    data = ArchivedUser.objects.filter(**lookup).values_list('data', flat=True).first()
+    for obj in data or ():
+        if obj['model'] == CustomUser._meta.label_lower:
+            return obj['fields'].get('password')
+    return None
+
+
+def restore_archived_user(**lookup):
+    """
+    Moves the archived user matching one of `user_id`, `username`, `email`
+    or `agenda_token` back to the hot tables, keeping its primary key so
+    issued tokens and references stay valid.
+
+    Returns:
+    CustomUser | None: The restored user, or None if nothing was archived.
+    """
+    if len(lookup) != 1 or not set(lookup) <= set(LOOKUP_FIELDS):
+        raise ValueError(f'Lookup must be one of {LOOKUP_FIELDS}')
+
+    with transaction.atomic():
+        archived = ArchivedUser.objects.select_for_update().filter(**lookup).first()
+        if archived is None:
+            return None
+
+        for deserialized in serializers.deserialize('python', archived.data):
+            deserialized.save()
+        user = CustomUser.objects.get(pk=archived.user_id)
+        archived.delete()
+        record_change(user, ChangeAction.CREATED)
+
+    if user.user_type == UserRole.DOCTOR:
+        bump_directory_version()
+    return user
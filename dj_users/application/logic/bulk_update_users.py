@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.utils import timezone
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.logic.change_events import record_user_changes
+from dj_users.application.logic.doctor_directory import sync_doctor_directory
+from dj_users.infrastructure.availability import availability_filter
+from dj_users.infrastructure.models import CustomUser, DoctorProfile
+from dj_users.infrastructure.typeahead import typeahead_index
+
+TYPEAHEAD_FIELDS = {'first_name', 'last_name', 'username', 'user_type'}
+AVAILABILITY_FIELDS = {'username', 'email'}
+
+
+def bulk_update_users(
+    changes: list,
+    batch_size: int = 500,
+    updated_by: CustomUser = None,
+) -> int:
+    """
+    Applies already validated changes to many users with `bulk_update`.
+
+    Rows are grouped by their set of changed fields so each group becomes
+    one `UPDATE ... CASE` statement per batch, all inside a single
+    transaction. `bulk_update` sends no signals, so the directory entries
+    of the affected doctors are resynced and the in-process name and
+    availability indexes updated here, as the post_save receivers would.
+
+    Args:
+    changes (list): `(user, data)` tuples, `data` as validated by
+                    `UserUpdateSerializer`.
+    batch_size (int): Maximum rows per UPDATE statement.
+    updated_by (CustomUser): Stored in `updated_by`, since `bulk_update`
+                             bypasses the auditable fields' save hooks.
+
+    Returns:
+    int: Number of updated users.
+    """
+    groups = {}
+    for user, data in changes:
+        if data:
+            groups.setdefault(tuple(sorted(data)), []).append((user, data))
+
+    now = timezone.now()
+    updated = []
+    with transaction.atomic():
+        for fields, rows in groups.items():
+            users = []
+            for user, data in rows:
+                for field, value in data.items():
+                    setattr(user, field, value)
+                user.updated_at = now
+                if updated_by is not None:
+                    user.updated_by = updated_by
+                users.append(user)
+
+            update_fields = list(fields) + ['updated_at']
+            if updated_by is not None:
+                update_fields.append('updated_by')
+            CustomUser.objects.bulk_update(users, update_fields, batch_size=batch_size)
+            record_user_changes([user.pk for user in users], ChangeAction.UPDATED, fields)
+            updated.extend((user, set(fields)) for user in users)
+
+        sync_doctor_directory(
+            DoctorProfile.objects.filter(
+                user_id__in=[user.pk for (user, _) in updated]
+            ).values_list('pk', flat=True)
+        )
+
+    for (user, fields) in updated:
+        if fields & TYPEAHEAD_FIELDS:
+            typeahead_index.update(user)
+        if fields & AVAILABILITY_FIELDS:
+            availability_filter.add(username=user.username, email=user.email)
+    return len(updated)
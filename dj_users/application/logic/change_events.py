@@ -0,0 +1,153 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from dj_users.application.domain.change_events import ChangeEntity
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import (
+    ChangeEvent,
+    Clinic,
+    CustomUser,
+    DoctorProfile,
+    NurseProfile,
+    PatientProfile,
+)
+
+logger = logging.getLogger(__name__)
+
+ENTITY_BY_MODEL = {
+    CustomUser: ChangeEntity.USER,
+    DoctorProfile: ChangeEntity.DOCTOR_PROFILE,
+    PatientProfile: ChangeEntity.PATIENT_PROFILE,
+    NurseProfile: ChangeEntity.NURSE_PROFILE,
+    Clinic: ChangeEntity.CLINIC,
+}
+
+
+def _user_id(instance):
+    if isinstance(instance, CustomUser):
+        return instance.pk
+    if isinstance(instance, Clinic):
+        return instance.owner_id
+    return getattr(instance, 'user_id', None)
+
+
+def record_change(instance, action: str, fields=(), entity_id=None) -> ChangeEvent:
+    """
+    Writes a change event for `instance` (a user, profile or clinic). Call
+    it inside the transaction of the change, so the event commits or rolls
+    back with it. Pass `entity_id` when `instance` was already deleted.
+    """
+    return ChangeEvent.objects.create(
+        entity=ENTITY_BY_MODEL[type(instance)],
+        entity_id=instance.pk if entity_id is None else entity_id,
+        action=action,
+        user_id=_user_id(instance),
+        fields=sorted(fields),
+    )
+
+
+def record_user_changes(user_ids, action: str, fields=()) -> None:
+    """Bulk variant of `record_change` for queryset-wide updates of users."""
+    ChangeEvent.objects.bulk_create([
+        ChangeEvent(
+            entity=ChangeEntity.USER,
+            entity_id=pk,
+            action=action,
+            user_id=pk,
+            fields=sorted(fields),
+        )
+        for pk in user_ids
+    ])
+
+
+def serialize_event(event: ChangeEvent) -> dict:
+    return {
+        'id': event.pk,
+        'entity': event.entity,
+        'entity_id': event.entity_id,
+        'action': event.action,
+        'user_id': event.user_id,
+        'fields': event.fields,
+        'created_at': event.created_at.isoformat(),
+    }
+
+
+def get_change_feed(after: int = 0, limit: int = 100, entities=None) -> dict:
+    """
+    Events with an id greater than `after`, oldest first.
+
+    Ids are allocated before commit, so a slow transaction can commit an id
+    lower than one already visible. Events younger than
+    `DJ_USERS_CHANGE_FEED_SETTLE_SECONDS` are held back so consumers that
+    resume from `next` don't skip them.
+
+    Returns:
+    dict: `results` and the `next` cursor.
+    """
+    settled = timezone.now() - timedelta(seconds=get_setting('CHANGE_FEED_SETTLE_SECONDS'))
+    queryset = ChangeEvent.objects.filter(pk__gt=after, created_at__lte=settled)
+    if entities:
+        queryset = queryset.filter(entity__in=entities)
+    events = list(queryset.order_by('pk')[:limit])
+    return {
+        'results': [serialize_event(event) for event in events],
+        'next': events[-1].pk if events else after,
+    }
+
+
+def relay_change_events(batch_size: int = None) -> int:
+    """
+    Hands pending events in batches to the `DJ_USERS_CHANGE_RELAY` callable
+    (e.g. a message broker publisher) and marks them relayed. A failing
+    batch stays pending and is retried on the next run; the callable must
+    tolerate duplicates.
+
+    Returns:
+    int: Number of events relayed.
+    """
+    relay_path = get_setting('CHANGE_RELAY')
+    if not relay_path:
+        return 0
+    relay = import_string(relay_path)
+    batch_size = batch_size or get_setting('CHANGE_RELAY_BATCH_SIZE')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                ChangeEvent.objects.select_for_update(skip_locked=True)
+                .filter(relayed_at__isnull=True)
+                .order_by('pk')[:batch_size]
+            )
+            if not events:
+                return total
+            try:
+                relay([serialize_event(event) for event in events])
+            except Exception:
+                logger.exception('Could not relay %s change events', len(events))
+                return total
+            ChangeEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                relayed_at=timezone.now()
+            )
+        total += len(events)
+        if len(events) < batch_size:
+            return total
+
+
+def prune_change_events(chunk_size: int = 5000) -> int:
+    """Deletes events older than `DJ_USERS_CHANGE_EVENT_RETENTION_DAYS`, in chunks."""
+    cutoff = timezone.now() - timedelta(days=get_setting('CHANGE_EVENT_RETENTION_DAYS'))
+    pending_relay = bool(get_setting('CHANGE_RELAY'))
+    total = 0
+    while True:
+        queryset = ChangeEvent.objects.filter(created_at__lt=cutoff)
+        if pending_relay:
+            queryset = queryset.filter(relayed_at__isnull=False)
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return total
+        total += ChangeEvent.objects.filter(pk__in=ids).delete()[0]
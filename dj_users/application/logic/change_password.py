@@ -1,7 +1,24 @@
 from django.contrib.auth.models import AbstractBaseUser
+from django.db import transaction
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.logic.change_events import record_change
+from dj_users.application.logic.token_revocation import revoke_user_tokens
 
 
 def change_user_password(user: AbstractBaseUser, new_password: str):
     user.set_password(new_password)
-    user.save()
+    return save_user_password(user)
+
+
+def save_user_password(user: AbstractBaseUser):
+    """
+    Stores the password already set (hashed) on `user` and revokes its
+    tokens. Split out so async callers can hash in a worker thread first.
+    """
+    with transaction.atomic():
+        user.save()
+        revoke_user_tokens([user.pk])
+        record_change(user, ChangeAction.PASSWORD_CHANGED)
+    user.refresh_from_db(fields=['token_generation'])
     return user
@@ -0,0 +1,87 @@
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.email_confirmation import EmailConfirmationStatus
+from dj_users.application.logic.change_events import record_user_changes
+from dj_users.application.logic.confirmation_emails import enqueue_confirmation_email
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import CustomUser
+
+
+def confirm_email(token: uuid.UUID) -> str:
+    """
+    Confirms the email of the user owning `token`.
+
+    The confirmation is a single conditional UPDATE resolved through the
+    unique index on `confirmation_token`, so concurrent or repeated calls
+    (email clients prefetching the link, retries) can only flip the flag
+    once, and only the call that flips it writes the change event.
+    Repeated calls report `ALREADY_CONFIRMED`.
+
+    Args:
+    token (uuid.UUID): Token sent in the confirmation email.
+
+    Returns:
+    str: An `EmailConfirmationStatus` value.
+    """
+    now = timezone.now()
+    ttl = timedelta(hours=get_setting('EMAIL_CONFIRMATION_TTL_HOURS'))
+
+    user_id = CustomUser.objects.filter(confirmation_token=token).values_list(
+        'pk', flat=True
+    ).first()
+    if user_id is None:
+        return EmailConfirmationStatus.INVALID
+
+    with transaction.atomic():
+        confirmed = CustomUser.objects.filter(
+            pk=user_id,
+            confirmation_token=token,
+            is_email_confirmed=False,
+            confirmation_token_created_at__gte=now - ttl,
+        ).update(is_email_confirmed=True, updated_at=now)
+        if confirmed:
+            record_user_changes([user_id], ChangeAction.UPDATED, ['is_email_confirmed'])
+    if confirmed:
+        return EmailConfirmationStatus.CONFIRMED
+    return get_confirmation_status(token)
+
+
+def get_confirmation_status(token: uuid.UUID) -> str:
+    """
+    Read-only lookup of `token`: `PENDING` while it can still confirm its
+    user, else the status `confirm_email` would report.
+    """
+    row = CustomUser.objects.filter(confirmation_token=token).values_list(
+        'is_email_confirmed', 'confirmation_token_created_at'
+    ).first()
+    if row is None:
+        return EmailConfirmationStatus.INVALID
+    (is_email_confirmed, created_at) = row
+    if is_email_confirmed:
+        return EmailConfirmationStatus.ALREADY_CONFIRMED
+    ttl = timedelta(hours=get_setting('EMAIL_CONFIRMATION_TTL_HOURS'))
+    if created_at < timezone.now() - ttl:
+        return EmailConfirmationStatus.EXPIRED
+    return EmailConfirmationStatus.PENDING
+
+
+def rotate_confirmation_token(user: CustomUser) -> CustomUser:
+    """
+    Issues a new confirmation token for `user`, invalidating the previous one,
+    and queues the confirmation email.
+    """
+    user.confirmation_token = uuid.uuid4()
+    user.confirmation_token_created_at = timezone.now()
+    with transaction.atomic():
+        user.save(update_fields=[
+            'confirmation_token',
+            'confirmation_token_created_at',
+            'updated_at',
+        ])
+        enqueue_confirmation_email(user)
+    return user
@@ -0,0 +1,153 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from dj_users.application.constants.messages.email_messages import EmailMessages
+from dj_users.application.domain.email_confirmation import ConfirmationEmailStatus
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import ConfirmationEmail, CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_confirmation_email(user: CustomUser) -> ConfirmationEmail:
+    """
+    Adds a confirmation email for `user` to the outbox. Call it inside the
+    transaction that creates or rotates the token; nothing is sent here, so
+    the request never waits on the mail server.
+
+    A user has at most one PENDING row, whose token is read when it is
+    claimed. A row already SENDING may carry the token being rotated, so it
+    never stands in for a new one: a fresh PENDING row sends the new token.
+    """
+    pending = ConfirmationEmail.objects.filter(
+        user=user,
+        status=ConfirmationEmailStatus.PENDING,
+    ).first()
+    if pending:
+        return pending
+
+    outbox = ConfirmationEmail.objects.create(user=user)
+    if get_setting('EMAIL_DISPATCH_ON_COMMIT'):
+        transaction.on_commit(_schedule_dispatch)
+    return outbox
+
+
+def _schedule_dispatch():
+    from dj_users.tasks import dispatch_confirmation_emails_task
+
+    dispatch_confirmation_emails_task.delay()
+
+
+def build_confirmation_message(user: CustomUser) -> EmailMessage:
+    link = get_setting('EMAIL_CONFIRMATION_URL').format(token=user.confirmation_token)
+    return EmailMessage(
+        subject=str(EmailMessages.Confirmation.SUBJECT),
+        body=str(EmailMessages.Confirmation.BODY) % {
+            'name': user.get_full_name() or user.username,
+            'link': link,
+        },
+        from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+        to=[user.email],
+    )
+
+
+def _claim_batch(batch_size: int, now) -> list:
+    """
+    Marks up to `batch_size` due rows as SENDING. Rows stuck in SENDING (a
+    worker died mid-batch) become due again once their lease expires.
+    """
+    lease = now + timedelta(seconds=get_setting('EMAIL_DISPATCH_LEASE_SECONDS'))
+    with transaction.atomic():
+        ids = list(
+            ConfirmationEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[ConfirmationEmailStatus.PENDING, ConfirmationEmailStatus.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        ConfirmationEmail.objects.filter(pk__in=ids).update(
+            status=ConfirmationEmailStatus.SENDING,
+            next_attempt_at=lease,
+        )
+    return list(ConfirmationEmail.objects.filter(pk__in=ids).select_related('user'))
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = get_setting('EMAIL_DISPATCH_RETRY_BASE_SECONDS')
+    cap = get_setting('EMAIL_DISPATCH_RETRY_MAX_SECONDS')
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def dispatch_confirmation_emails(batch_size: int = None) -> dict:
+    """
+    Sends one batch of pending confirmation emails over a single reused
+    connection of the configured `EMAIL_BACKEND`.
+
+    Each message is sent on its own so one failure doesn't sink the batch;
+    failed messages are retried with exponential backoff until
+    `DJ_USERS_EMAIL_DISPATCH_MAX_ATTEMPTS` is reached.
+
+    Returns:
+    dict: Throughput metrics for the batch.
+    """
+    batch_size = batch_size or get_setting('EMAIL_DISPATCH_BATCH_SIZE')
+    max_attempts = get_setting('EMAIL_DISPATCH_MAX_ATTEMPTS')
+    started = time.monotonic()
+    now = timezone.now()
+
+    rows = _claim_batch(batch_size, now)
+    metrics = {'claimed': len(rows), 'sent': 0, 'retried': 0, 'failed': 0, 'cancelled': 0}
+    if not rows:
+        metrics.update(elapsed_seconds=0.0, messages_per_second=0.0)
+        return metrics
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for row in rows:
+            user = row.user
+            if user.is_email_confirmed or not user.email:
+                row.status = ConfirmationEmailStatus.CANCELLED
+                metrics['cancelled'] += 1
+                continue
+
+            row.attempts += 1
+            try:
+                connection.send_messages([build_confirmation_message(user)])
+            except Exception as exc:
+                row.last_error = f'{type(exc).__name__}: {exc}'[:1000]
+                if row.attempts >= max_attempts:
+                    row.status = ConfirmationEmailStatus.FAILED
+                    metrics['failed'] += 1
+                else:
+                    row.status = ConfirmationEmailStatus.PENDING
+                    row.next_attempt_at = timezone.now() + _retry_delay(row.attempts)
+                    metrics['retried'] += 1
+            else:
+                row.status = ConfirmationEmailStatus.SENT
+                row.sent_at = timezone.now()
+                row.last_error = ''
+                metrics['sent'] += 1
+    finally:
+        connection.close()
+
+        ConfirmationEmail.objects.bulk_update(
+            rows,
+            ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+
+    elapsed = time.monotonic() - started
+    metrics.update(
+        elapsed_seconds=round(elapsed, 3),
+        messages_per_second=round(metrics['sent'] / elapsed, 2) if elapsed else 0.0,
+    )
+    logger.info('Confirmation email dispatch: %s', metrics)
+    return metrics
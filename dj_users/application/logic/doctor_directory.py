@@ -0,0 +1,238 @@
+import base64
+import binascii
+import json
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.utils.text import normalize_text
+from dj_users.infrastructure.models import DoctorDirectoryEntry, DoctorProfile
+
+DIRECTORY_VERSION_KEY = 'dj_users:doctor_directory:version'
+ENTRY_FIELDS = [
+    'full_name',
+    'first_name_key',
+    'last_name_key',
+    'sort_key',
+    'specialty',
+    'clinic',
+    'clinic_name',
+    'image',
+    'agenda_token',
+]
+# `ENTRY_FIELDS` as stored, to compare built entries with the current rows
+ENTRY_COLUMNS = [
+    'full_name',
+    'first_name_key',
+    'last_name_key',
+    'sort_key',
+    'specialty_id',
+    'clinic_id',
+    'clinic_name',
+    'image',
+    'agenda_token',
+]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def get_directory_version() -> int:
+    version = cache.get(DIRECTORY_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(DIRECTORY_VERSION_KEY, version, None)
+    return version
+
+
+def bump_directory_version() -> None:
+    """
+    Invalidates every cached directory response once the transaction
+    commits; bumped earlier, a concurrent request could cache the rows
+    being replaced under the new version.
+    """
+    transaction.on_commit(
+        lambda: cache.set(DIRECTORY_VERSION_KEY, time.time_ns(), None)
+    )
+
+
+def is_listed(profile: DoctorProfile) -> bool:
+    user = profile.user
+    return (
+        profile.verificated and
+        profile.universal_state == UniversalState.ACTIVE and
+        user.is_active and
+        user.universal_state == UniversalState.ACTIVE
+    )
+
+
+def build_entry(profile: DoctorProfile) -> DoctorDirectoryEntry:
+    user = profile.user
+    first_name_key = normalize_text(user.first_name)
+    last_name_key = normalize_text(user.last_name)
+    return DoctorDirectoryEntry(
+        doctor=profile,
+        full_name=user.get_full_name() or user.username,
+        first_name_key=first_name_key,
+        last_name_key=last_name_key,
+        sort_key=f'{last_name_key} {first_name_key}'.strip(),
+        specialty_id=profile.specialty_id,
+        clinic_id=profile.clinic_id,
+        clinic_name=profile.clinic.name if profile.clinic else '',
+        image=user.image.name if user.image else '',
+        agenda_token=user.agenda_token,
+    )
+
+
+def sync_doctor_directory(doctor_ids) -> bool:
+    """
+    Upserts the directory entries of the listed doctors among `doctor_ids`
+    and deletes the entries of the others. Only entries whose content
+    differs are written, and the directory version is only bumped (which
+    invalidates every cached response) when some row changed.
+    """
+    doctor_ids = set(doctor_ids)
+    if not doctor_ids:
+        return False
+
+    profiles = DoctorProfile.objects.filter(pk__in=doctor_ids).select_related('user', 'clinic')
+    entries = [build_entry(profile) for profile in profiles if is_listed(profile)]
+
+    current = {
+        row[0]: row[1:]
+        for row in DoctorDirectoryEntry.objects.filter(doctor_id__in=doctor_ids)
+        .values_list('doctor_id', *ENTRY_COLUMNS)
+    }
+    changed = [
+        entry for entry in entries
+        if current.get(entry.doctor_id) != tuple(getattr(entry, column) for column in ENTRY_COLUMNS)
+    ]
+    if changed:
+        DoctorDirectoryEntry.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['doctor'],
+            update_fields=ENTRY_FIELDS,
+        )
+    unlisted = current.keys() - {entry.doctor_id for entry in entries}
+    if unlisted:
+        DoctorDirectoryEntry.objects.filter(doctor_id__in=unlisted).delete()
+
+    if changed or unlisted:
+        bump_directory_version()
+        return True
+    return False
+
+
+def rebuild_doctor_directory(chunk_size: int = 1000) -> int:
+    """Resyncs every doctor profile in primary key chunks. Returns the count."""
+    last_pk, total = 0, 0
+    while True:
+        ids = list(
+            DoctorProfile.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return total
+        sync_doctor_directory(ids)
+        last_pk = ids[-1]
+        total += len(ids)
+
+
+def encode_cursor(entry: DoctorDirectoryEntry) -> str:
+    raw = json.dumps([entry.sort_key, entry.doctor_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        (sort_key, doctor_id) = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(sort_key, str) or not isinstance(doctor_id, int):
+        raise InvalidCursor(cursor)
+    return sort_key, doctor_id
+
+
+def search_doctor_directory(
+    specialty_id=None,
+    clinic_id=None,
+    prefix: str = '',
+    cursor: str = None,
+    limit: int = 20,
+) -> dict:
+    """
+    One page of the directory plus its facets.
+
+    The facets come from a single aggregate over (specialty, clinic) pairs:
+    specialty counts honour the clinic filter and clinic counts honour the
+    specialty filter, so each facet shows what selecting it would return.
+    The page itself uses keyset pagination on `(sort_key, doctor)`.
+    """
+    base = DoctorDirectoryEntry.objects.all()
+    prefix = normalize_text(prefix)
+    if prefix:
+        base = base.filter(
+            Q(first_name_key__startswith=prefix) |
+            Q(last_name_key__startswith=prefix) |
+            Q(sort_key__startswith=prefix)
+        )
+
+    specialties, clinics, total = {}, {}, 0
+    pairs = (
+        base.values('specialty_id', 'clinic_id', 'clinic_name')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    for row in pairs:
+        specialty_matches = specialty_id is None or row['specialty_id'] == specialty_id
+        clinic_matches = clinic_id is None or row['clinic_id'] == clinic_id
+        if clinic_matches:
+            specialties[row['specialty_id']] = (
+                specialties.get(row['specialty_id'], 0) + row['total']
+            )
+        if specialty_matches:
+            facet = clinics.setdefault(
+                row['clinic_id'],
+                {'clinic': row['clinic_id'], 'name': row['clinic_name'], 'count': 0}
+            )
+            facet['count'] += row['total']
+        if specialty_matches and clinic_matches:
+            total += row['total']
+
+    page = base
+    if specialty_id is not None:
+        page = page.filter(specialty_id=specialty_id)
+    if clinic_id is not None:
+        page = page.filter(clinic_id=clinic_id)
+    if cursor:
+        (sort_key, doctor_id) = decode_cursor(cursor)
+        page = page.filter(
+            Q(sort_key__gt=sort_key) |
+            Q(sort_key=sort_key, doctor_id__gt=doctor_id)
+        )
+    entries = list(page.order_by('sort_key', 'doctor_id')[:limit + 1])
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1])
+
+    return {
+        'count': total,
+        'next': next_cursor,
+        'results': entries,
+        'facets': {
+            'specialty': [
+                {'specialty': key, 'count': count}
+                for key, count in sorted(specialties.items(), key=lambda item: -item[1])
+            ],
+            'clinic': sorted(clinics.values(), key=lambda item: -item['count']),
+        },
+    }
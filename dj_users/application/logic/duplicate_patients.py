@@ -0,0 +1,234 @@
+from itertools import combinations, groupby
+
+from django.db.models import Max
+from django.utils import timezone
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.utils.minhash import MinHasher, jaccard, shingles
+from dj_users.application.utils.settings import get_setting
+from dj_users.application.utils.text import normalize_text, soundex
+from dj_users.infrastructure.models import (
+    CustomUser,
+    DuplicateCandidate,
+    DuplicateScanRun,
+    PatientBlockingKey,
+)
+
+PHONE_SUFFIX_LENGTH = 7
+# Blocks up to this size are compared pair by pair, larger ones through LSH
+EXACT_BLOCK_SIZE = 32
+
+_hasher = MinHasher(num_perm=64, bands=16)
+
+
+def _patients():
+    return CustomUser.objects.filter(user_type=UserRole.PATIENT).exclude(
+        universal_state=UniversalState.TERMINATED
+    )
+
+
+def _phone_suffix(phone_number: str) -> str:
+    digits = ''.join(char for char in phone_number or '' if char.isdigit())
+    return digits[-PHONE_SUFFIX_LENGTH:] if len(digits) >= PHONE_SUFFIX_LENGTH else ''
+
+
+def blocking_keys(first_name, last_name, birth_date, phone_number) -> set:
+    """
+    Keys under which a patient is grouped with possible duplicates. Two
+    patients are only compared when they share at least one key.
+    """
+    first, last = soundex(first_name), soundex(last_name)
+    phone = _phone_suffix(phone_number)
+    keys = set()
+    if birth_date:
+        if last:
+            keys.add(f'bl:{birth_date.isoformat()}:{last}')
+        if first:
+            keys.add(f'bf:{birth_date.isoformat()}:{first}')
+    if first and last:
+        year = birth_date.year if birth_date else ''
+        keys.add(f'ny:{first}{last}:{year}')
+    if phone:
+        keys.add(f'p:{phone}')
+    return keys
+
+
+def index_patients(queryset, chunk_size: int = 1000) -> int:
+    """(Re)computes the blocking keys of the users in `queryset`, in pk chunks."""
+    total = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'first_name', 'last_name', 'birth_date', 'phone_number')
+            [:chunk_size]
+        )
+        if not rows:
+            return total
+
+        ids = [row[0] for row in rows]
+        PatientBlockingKey.objects.filter(user_id__in=ids).delete()
+        PatientBlockingKey.objects.bulk_create(
+            [
+                PatientBlockingKey(user_id=pk, key=key)
+                for (pk, *fields) in rows
+                for key in blocking_keys(*fields)
+            ],
+            ignore_conflicts=True,
+        )
+        total += len(rows)
+        last_pk = ids[-1]
+
+
+def _features(user_ids) -> dict:
+    features = {}
+    rows = _patients().filter(pk__in=user_ids).values_list(
+        'pk', 'first_name', 'last_name', 'birth_date', 'phone_number'
+    )
+    for (pk, first_name, last_name, birth_date, phone_number) in rows:
+        name = normalize_text(f'{first_name} {last_name}')
+        features[pk] = (shingles(name), birth_date, _phone_suffix(phone_number))
+    return features
+
+
+def score_pair(a, b) -> float:
+    """Weighted similarity of two patients' features, between 0 and 1."""
+    (names_a, birth_a, phone_a), (names_b, birth_b, phone_b) = a, b
+    score = 0.6 * jaccard(names_a, names_b)
+    if birth_a and birth_a == birth_b:
+        score += 0.25
+    if phone_a and phone_a == phone_b:
+        score += 0.15
+    return score
+
+
+def _block_pairs(members, features):
+    if len(members) <= EXACT_BLOCK_SIZE:
+        return combinations(members, 2)
+    signatures = {pk: _hasher.signature(features[pk][0]) for pk in members}
+    return _hasher.candidate_pairs(signatures)
+
+
+def _score_blocks(blocks, new_ids=None) -> int:
+    """
+    Scores the pairs inside each block and writes the ones above the
+    threshold, grouped in clusters, to `DuplicateCandidate`. With `new_ids`
+    only pairs involving at least one of those users are considered.
+    """
+    features = _features({pk for members in blocks for pk in members})
+    threshold = get_setting('DUPLICATE_SCORE_THRESHOLD')
+
+    scores = {}
+    for members in blocks:
+        members = sorted(pk for pk in members if pk in features)
+        for (a, b) in _block_pairs(members, features):
+            if (a, b) in scores:
+                continue
+            if new_ids is not None and a not in new_ids and b not in new_ids:
+                continue
+            scores[(a, b)] = score_pair(features[a], features[b])
+
+    matches = {pair: score for (pair, score) in scores.items() if score >= threshold}
+    if not matches:
+        return 0
+
+    # Union-find so every pair of a group gets the group's lowest id
+    parent = {}
+
+    def root(pk):
+        while parent.get(pk, pk) != pk:
+            pk = parent[pk]
+        return pk
+
+    for (a, b) in matches:
+        (ra, rb) = (root(a), root(b))
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    DuplicateCandidate.objects.bulk_create(
+        [
+            DuplicateCandidate(user_id=a, duplicate_id=b, cluster=root(a), score=round(score, 4))
+            for ((a, b), score) in matches.items()
+        ],
+        ignore_conflicts=True,
+    )
+    return len(matches)
+
+
+def _stream_blocks(rows, max_block_size, batch_users):
+    """
+    Groups `(key, user_id)` rows sorted by key into blocks and yields them in
+    batches of about `batch_users` users. Singletons and oversized blocks
+    (too common to be informative) are skipped.
+    """
+    batch, size = [], 0
+    for (_, group) in groupby(rows, key=lambda row: row[0]):
+        members = [user_id for (_, user_id) in group]
+        if len(members) < 2 or len(members) > max_block_size:
+            continue
+        batch.append(members)
+        size += len(members)
+        if size >= batch_users:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def find_duplicate_patients(full: bool = False, chunk_size: int = 1000) -> DuplicateScanRun:
+    """
+    Detects probable duplicate patients and stores them for review.
+
+    Patients are grouped by blocking keys (birth date plus surname or name
+    phonetics, phone suffix) and only pairs within a block are scored, with
+    MinHash/LSH pruning the pairs of large blocks. A full run re-indexes every
+    patient and streams the key index in key order; an incremental run only
+    indexes the patients registered since the last run and looks up the
+    blocks they fall in. Pairs already stored (including dismissed ones) are
+    not created again.
+    """
+    previous = (
+        DuplicateScanRun.objects.filter(finished_at__isnull=False)
+        .order_by('-finished_at')
+        .first()
+    )
+    full = full or previous is None
+    since = 0 if full else previous.last_user_id
+    upper = _patients().aggregate(last=Max('pk'))['last'] or since
+
+    run = DuplicateScanRun.objects.create(full=full, last_user_id=upper)
+    max_block_size = get_setting('DUPLICATE_MAX_BLOCK_SIZE')
+    batch_users = get_setting('DUPLICATE_BATCH_SIZE')
+    new_users = _patients().filter(pk__gt=since, pk__lte=upper)
+
+    if full:
+        PatientBlockingKey.objects.all().delete()
+        run.users_scanned = index_patients(new_users, chunk_size=chunk_size)
+        rows = (
+            PatientBlockingKey.objects.order_by('key', 'user_id')
+            .values_list('key', 'user_id')
+            .iterator(chunk_size=batch_users)
+        )
+        for blocks in _stream_blocks(rows, max_block_size, batch_users):
+            run.candidates_found += _score_blocks(blocks)
+    else:
+        run.users_scanned = index_patients(new_users, chunk_size=chunk_size)
+        new_ids = set(new_users.values_list('pk', flat=True))
+        keys = sorted(set(
+            PatientBlockingKey.objects.filter(user__in=new_users).values_list('key', flat=True)
+        ))
+        for start in range(0, len(keys), chunk_size):
+            rows = (
+                PatientBlockingKey.objects.filter(key__in=keys[start:start + chunk_size])
+                .order_by('key', 'user_id')
+                .values_list('key', 'user_id')
+            )
+            for blocks in _stream_blocks(rows, max_block_size, batch_users):
+                run.candidates_found += _score_blocks(blocks, new_ids=new_ids)
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=['users_scanned', 'candidates_found', 'finished_at'])
+    return run
@@ -0,0 +1,79 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Prefetch, Q
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.utils import geohash
+from dj_users.infrastructure.models import Clinic, DoctorProfile
+
+MAX_PRECISION = 7
+
+
+def _candidates(latitude: float, longitude: float, precision: int) -> list:
+    cells = geohash.neighborhood(latitude, longitude, precision)
+    return list(
+        Clinic.objects.filter(universal_state=UniversalState.ACTIVE)
+        .filter(reduce(or_, (Q(geohash__startswith=cell) for cell in cells)))
+        .values_list('pk', 'latitude', 'longitude')
+    )
+
+
+def _with_distances(rows, latitude, longitude) -> list:
+    return sorted(
+        (geohash.haversine_km(latitude, longitude, lat, lon), pk)
+        for (pk, lat, lon) in rows
+    )
+
+
+def find_nearby_clinics(latitude: float, longitude: float, radius_km: float = None, k: int = 10):
+    """
+    Clinics sorted by distance to a point, with their listed doctors.
+
+    Candidates come from prefix lookups on the indexed `geohash` column for
+    the 3x3 block of cells around the point, so only nearby rows are read.
+    With a radius the cell size is the smallest one covering it. Without a
+    radius the search widens one precision level at a time until `k`
+    clinics lie within the distance the block is guaranteed to cover.
+
+    Returns:
+    list: `Clinic` instances with a `distance_km` attribute.
+    """
+    found = None
+    for precision in range(MAX_PRECISION, 0, -1):
+        covered = geohash.covered_radius_km(latitude, precision)
+        if radius_km is not None and covered < radius_km:
+            continue
+
+        rows = _with_distances(_candidates(latitude, longitude, precision), latitude, longitude)
+        if radius_km is not None or sum(1 for d, _ in rows if d <= covered) >= k:
+            found = rows
+            break
+
+    if found is None:
+        # Wider than a precision 1 block: fall back to every geocoded clinic
+        found = _with_distances(
+            Clinic.objects.filter(universal_state=UniversalState.ACTIVE)
+            .exclude(geohash='')
+            .values_list('pk', 'latitude', 'longitude'),
+            latitude,
+            longitude,
+        )
+
+    if radius_km is not None:
+        found = [(distance, pk) for distance, pk in found if distance <= radius_km]
+    found = found[:k]
+
+    distances = {pk: distance for distance, pk in found}
+    clinics = Clinic.objects.filter(pk__in=distances).prefetch_related(
+        Prefetch(
+            'doctors',
+            queryset=DoctorProfile.objects.filter(
+                directory_entry__isnull=False
+            ).select_related('directory_entry'),
+        )
+    )
+    for clinic in clinics:
+        clinic.distance_km = round(distances[clinic.pk], 3)
+    return sorted(clinics, key=lambda clinic: clinic.distance_km)
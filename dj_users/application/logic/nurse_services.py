@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models import Count
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.utils.text import split_services
+from dj_users.infrastructure.models import NurseProfile, NurseService
+
+
+def get_or_create_services(services: dict) -> list:
+    """
+    Returns the `NurseService` rows for a `{slug: name}` mapping, creating the
+    missing ones. Concurrent creations of the same slug are ignored.
+    """
+    if not services:
+        return []
+    existing = {
+        service.slug: service
+        for service in NurseService.objects.filter(slug__in=services)
+    }
+    missing = [
+        NurseService(slug=slug, name=name)
+        for (slug, name) in services.items()
+        if slug not in existing
+    ]
+    if missing:
+        NurseService.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {
+            service.slug: service
+            for service in NurseService.objects.filter(slug__in=services)
+        }
+    return list(existing.values())
+
+
+def sync_nurse_services(profile: NurseProfile):
+    """
+    Mirrors the free-text `available_services` of a nurse into the `services`
+    relation. Only the rows that changed are written.
+    """
+    services = split_services(profile.available_services)
+    current = set(profile.services.values_list('slug', flat=True))
+    if current == set(services):
+        return
+
+    with transaction.atomic():
+        profile.services.set(get_or_create_services(services))
+
+
+def find_nurses_by_services(slugs, after: int = None, limit: int = 20):
+    """
+    Active nurses offering every service in `slugs`, ordered by id.
+
+    The intersection is resolved on the through table alone: rows matching any
+    of the slugs are grouped per nurse and only nurses with one row per slug
+    are kept, so the lookup is served by its (nurse, service) index.
+
+    Returns:
+    list: `NurseProfile` instances, at most `limit`.
+    """
+    slugs = set(slugs)
+    queryset = NurseProfile.objects.filter(
+        universal_state=UniversalState.ACTIVE,
+        user__is_active=True,
+    )
+    if slugs:
+        Through = NurseProfile.services.through
+        matches = (
+            Through.objects.filter(nurseservice__slug__in=slugs)
+            .values('nurseprofile_id')
+            .annotate(matched=Count('nurseservice_id'))
+            .filter(matched=len(slugs))
+            .values('nurseprofile_id')
+        )
+        queryset = queryset.filter(pk__in=matches)
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+
+    return list(
+        queryset.select_related('user')
+        .prefetch_related('services')
+        .order_by('pk')[:limit]
+    )
@@ -4,7 +4,11 @@ from django.contrib.auth import get_user_model
 from rest_framework.exceptions import ValidationError
 
 from dj_users.application.constants.messages.validation_messages import ValidationMessages
+from dj_users.application.domain.change_events import ChangeAction
 from dj_users.application.domain.roles import UserRole
+from dj_users.application.logic.change_events import record_change
+from dj_users.application.logic.confirmation_emails import enqueue_confirmation_email
+from dj_users.application.logic.signup_rollups import record_signup
 from dj_users.infrastructure.models import (
     CustomUser,
     DoctorProfile,
@@ -60,8 +64,13 @@ def register_user(validated_data: dict) -> CustomUser:
                 ValidationMessages.Registration.ROL_CREATION_NO_VALID
             )
 
+        record_change(user, ChangeAction.CREATED)
         profile_model = profile_model_map.get(role)
         if profile_model:
-            profile_model.objects.create(user=user)
+            profile = profile_model.objects.create(user=user)
+            record_change(profile, ChangeAction.CREATED)
+
+        enqueue_confirmation_email(user)
+        transaction.on_commit(lambda: record_signup(user))
 
     return user
@@ -0,0 +1,205 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import CharField, ProtectedError, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.email_confirmation import ConfirmationEmailStatus
+from dj_users.application.domain.retention import RetentionMode
+from dj_users.application.logic.change_events import record_user_changes
+from dj_users.application.logic.doctor_directory import sync_doctor_directory
+from dj_users.application.logic.token_revocation import revoke_user_tokens
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import (
+    Clinic,
+    ConfirmationEmail,
+    CustomUser,
+    DoctorProfile,
+    NurseProfile,
+    PatientBlockingKey,
+    PatientProfile,
+)
+
+logger = logging.getLogger(__name__)
+
+ANONYMIZED_FIELDS = (
+    'username', 'email', 'first_name', 'last_name', 'phone_number', 'birth_date', 'image',
+    'is_active',
+)
+
+
+def _expired_users():
+    cutoff = timezone.now() - timedelta(days=get_setting('RETENTION_GRACE_DAYS'))
+    return CustomUser.objects.filter(
+        universal_state=UniversalState.TERMINATED,
+        anonymized_at__isnull=True,
+        updated_at__lt=cutoff,
+    )
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            logger.exception('Could not delete the image %s of a purged user', name)
+
+
+def _anonymize_users(user_ids):
+    if not user_ids:
+        return
+    now = timezone.now()
+    pk_text = Cast('pk', CharField())
+
+    CustomUser.objects.filter(pk__in=user_ids).update(
+        username=Concat(Value('deleted-'), pk_text),
+        email=Concat(Value('deleted-'), pk_text, Value('@invalid.invalid')),
+        first_name='',
+        last_name='',
+        phone_number='',
+        birth_date=None,
+        image=None,
+        password=make_password(None),
+        is_active=False,
+        is_email_confirmed=False,
+        anonymized_at=now,
+        updated_at=now,
+    )
+    # Profiles are kept (other apps may reference them) but emptied
+    DoctorProfile.objects.filter(user_id__in=user_ids).update(
+        professional_license='',
+        professional_license_specialty=None,
+        verificated=False,
+        clinic=None,
+        universal_state=UniversalState.TERMINATED,
+    )
+    PatientProfile.objects.filter(user_id__in=user_ids).update(
+        blood_type='',
+        universal_state=UniversalState.TERMINATED,
+    )
+    NurseProfile.services.through.objects.filter(nurseprofile__user_id__in=user_ids).delete()
+    NurseProfile.objects.filter(user_id__in=user_ids).update(
+        available_services='',
+        universal_state=UniversalState.TERMINATED,
+    )
+    PatientBlockingKey.objects.filter(user_id__in=user_ids).delete()
+    ConfirmationEmail.objects.filter(
+        user_id__in=user_ids,
+        status=ConfirmationEmailStatus.PENDING,
+    ).update(status=ConfirmationEmailStatus.CANCELLED)
+    # Bumped in this transaction, the cached generations follow on commit
+    revoke_user_tokens(user_ids)
+
+
+def _delete_users(user_ids) -> list:
+    """Deletes `user_ids`, skipping the users other rows still protect."""
+    try:
+        with transaction.atomic():
+            CustomUser.objects.filter(pk__in=user_ids).delete()
+        return list(user_ids)
+    except ProtectedError:
+        pass
+
+    deleted = []
+    for pk in user_ids:
+        try:
+            with transaction.atomic():
+                CustomUser.objects.filter(pk=pk).delete()
+            deleted.append(pk)
+        except ProtectedError:
+            logger.info('User %s is protected by related rows, anonymizing instead', pk)
+    return deleted
+
+
+def _purge_chunk(user_ids, mode, new_owner) -> tuple:
+    with transaction.atomic():
+        users = list(
+            _expired_users().filter(pk__in=user_ids)
+            .select_for_update(skip_locked=True)
+            .only('pk', 'image')
+        )
+        user_ids = [user.pk for user in users]
+        if not user_ids:
+            return (0, 0)
+
+        images = [user.image.name for user in users if user.image]
+        doctor_ids = list(
+            DoctorProfile.objects.filter(user_id__in=user_ids).values_list('pk', flat=True)
+        )
+        if new_owner is not None:
+            Clinic.objects.filter(owner_id__in=user_ids).update(owner=new_owner)
+
+        deleted = []
+        if mode == RetentionMode.DELETE:
+            # Deleting the owner would cascade to clinics that still have doctors
+            staffed_owners = set(
+                Clinic.objects.filter(owner_id__in=user_ids, doctors__isnull=False)
+                .values_list('owner_id', flat=True)
+            )
+            deleted = _delete_users([pk for pk in user_ids if pk not in staffed_owners])
+
+        anonymized = [pk for pk in user_ids if pk not in set(deleted)]
+        _anonymize_users(anonymized)
+        record_user_changes(deleted, ChangeAction.DELETED)
+        record_user_changes(anonymized, ChangeAction.UPDATED, ANONYMIZED_FIELDS)
+        sync_doctor_directory(doctor_ids)
+        transaction.on_commit(lambda: _delete_files(images))
+    return (len(anonymized), len(deleted))
+
+
+def purge_terminated_users(mode: str = None, chunk_size: int = None, pause: float = None) -> dict:
+    """
+    Removes the personal data of users TERMINATED for longer than
+    `DJ_USERS_RETENTION_GRACE_DAYS` (counted from `updated_at`).
+
+    Users are processed in primary key chunks, each in its own short
+    transaction, with a pause in between so the purge can run alongside
+    normal traffic. Rows locked by a concurrent request are skipped and
+    retried on the next run.
+
+    In `anonymize` mode the user row and profiles are kept with their
+    personal fields emptied. In `delete` mode users are deleted with their
+    profiles, except when related rows protect them or they own a clinic
+    that still has doctors; those are anonymized instead. Clinics are
+    handed over to `DJ_USERS_RETENTION_CLINIC_OWNER` when configured, and
+    profile images are removed from storage after commit.
+
+    Returns:
+    dict: Number of users anonymized and deleted.
+    """
+    mode = mode or get_setting('RETENTION_MODE')
+    if mode not in RetentionMode.values:
+        raise ValueError(f'Unknown retention mode: {mode}')
+    chunk_size = chunk_size or get_setting('RETENTION_CHUNK_SIZE')
+    pause = get_setting('RETENTION_CHUNK_PAUSE_SECONDS') if pause is None else pause
+
+    new_owner = None
+    owner_username = get_setting('RETENTION_CLINIC_OWNER')
+    if owner_username:
+        new_owner = CustomUser.objects.get(username=owner_username)
+
+    result = {'anonymized': 0, 'deleted': 0}
+    last_pk = 0
+    while True:
+        user_ids = list(
+            _expired_users().filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return result
+        last_pk = user_ids[-1]
+
+        (anonymized, deleted) = _purge_chunk(user_ids, mode, new_owner)
+        result['anonymized'] += anonymized
+        result['deleted'] += deleted
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,151 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from dj_users.application.domain.stats import RollupGranularity, SeriesGranularity
+from dj_users.infrastructure.models import CustomUser, SignupRollup
+
+TRUNCATE_FUNCTIONS = {
+    RollupGranularity.HOUR: TruncHour,
+    RollupGranularity.DAY: TruncDay,
+    SeriesGranularity.WEEK: TruncWeek,
+    SeriesGranularity.MONTH: TruncMonth,
+}
+
+
+def _bucket_start(moment: datetime, granularity: str) -> datetime:
+    moment = moment.astimezone(dt_timezone.utc)
+    if granularity == RollupGranularity.HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record_signup(user: CustomUser) -> None:
+    """
+    Adds `user` to its hourly and daily rollup buckets. Run it once the
+    registration has committed: every signup of the hour updates the same
+    rows, so holding their locks for a whole registration would serialize
+    them. A signup lost between the commit and this call is picked up by
+    `rebuild_signup_rollups`.
+    """
+    for granularity in RollupGranularity.values:
+        lookup = {
+            'granularity': granularity,
+            'bucket_start': _bucket_start(user.date_joined, granularity),
+            'user_type': user.user_type,
+        }
+        if SignupRollup.objects.filter(**lookup).update(count=F('count') + 1):
+            continue
+        try:
+            with transaction.atomic():
+                SignupRollup.objects.create(count=1, **lookup)
+        except IntegrityError:
+            # Another registration created the bucket first
+            SignupRollup.objects.filter(**lookup).update(count=F('count') + 1)
+
+
+def rebuild_signup_rollups(start: datetime, end: datetime) -> int:
+    """
+    Recomputes the rollups of the whole days covering `[start, end)` from
+    `CustomUser.date_joined`. Used for backfill and to pick up users created
+    outside `register_user` (admin, shell, imports).
+
+    Returns:
+    int: Number of rollup rows written.
+    """
+    start = _bucket_start(start, RollupGranularity.DAY)
+    day_end = _bucket_start(end, RollupGranularity.DAY)
+    if day_end < end:
+        day_end += timedelta(days=1)
+    end = day_end
+
+    rows = []
+    for granularity in RollupGranularity.values:
+        truncate = TRUNCATE_FUNCTIONS[granularity]
+        counts = (
+            CustomUser.objects
+            .filter(date_joined__gte=start, date_joined__lt=end)
+            .annotate(bucket=truncate('date_joined', tzinfo=dt_timezone.utc))
+            .values('bucket', 'user_type')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        rows.extend(
+            SignupRollup(
+                granularity=granularity,
+                bucket_start=item['bucket'],
+                user_type=item['user_type'],
+                count=item['total'],
+            )
+            for item in counts
+        )
+
+    with transaction.atomic():
+        SignupRollup.objects.filter(bucket_start__gte=start, bucket_start__lt=end).delete()
+        SignupRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def backfill_signup_rollups(start: datetime = None, chunk_days: int = 30) -> int:
+    """
+    Rebuilds the rollups from `start` (default: the first `date_joined`)
+    until now, `chunk_days` days per transaction. Run once after installing
+    the rollups, since the periodic task only corrects the last days.
+
+    Returns:
+    int: Number of rollup rows written.
+    """
+    if start is None:
+        start = CustomUser.objects.aggregate(first=Min('date_joined'))['first']
+        if start is None:
+            return 0
+
+    end = timezone.now()
+    written = 0
+    while start < end:
+        chunk_end = min(start + timedelta(days=chunk_days), end)
+        written += rebuild_signup_rollups(start, chunk_end)
+        start = chunk_end
+    return written
+
+
+def get_signup_series(start, end, granularity: str, user_types=None) -> list:
+    """
+    Signups per bucket and role between the dates `start` and `end`
+    (inclusive), read from the rollups only. Weekly and monthly series are
+    summed from the daily rollups.
+    """
+    start = datetime.combine(start, time.min, tzinfo=dt_timezone.utc)
+    end = datetime.combine(end, time.min, tzinfo=dt_timezone.utc) + timedelta(days=1)
+
+    source = RollupGranularity.HOUR if granularity == SeriesGranularity.HOUR else (
+        RollupGranularity.DAY
+    )
+    queryset = SignupRollup.objects.filter(
+        granularity=source,
+        bucket_start__gte=start,
+        bucket_start__lt=end,
+    )
+    if user_types is not None:
+        queryset = queryset.filter(user_type__in=user_types)
+
+    if granularity in (SeriesGranularity.WEEK, SeriesGranularity.MONTH):
+        truncate = TRUNCATE_FUNCTIONS[granularity]
+        queryset = queryset.annotate(
+            bucket=truncate('bucket_start', tzinfo=dt_timezone.utc)
+        )
+    else:
+        queryset = queryset.annotate(bucket=F('bucket_start'))
+
+    return [
+        {'bucket': item['bucket'], 'user_type': item['user_type'], 'count': item['total']}
+        for item in (
+            queryset
+            .values('bucket', 'user_type')
+            .annotate(total=Sum('count'))
+            .order_by('bucket', 'user_type')
+        )
+    ]
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import CustomUser
+
+
+def _cache_key(user_id) -> str:
+    return f'dj_users:token_generation:{user_id}'
+
+
+def get_token_generation(user_id):
+    """
+    Returns the current token generation of a user with at most one cache
+    lookup; the database is only read on a cache miss. Returns `None` for
+    unknown users.
+    """
+    key = _cache_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = CustomUser.objects.filter(pk=user_id).values_list(
+            'token_generation', flat=True
+        ).first()
+        if generation is not None:
+            cache.set(key, generation, get_setting('TOKEN_GENERATION_CACHE_TIMEOUT'))
+    return generation
+
+
+def revoke_user_tokens(user_ids) -> None:
+    """
+    Invalidates every token issued to `user_ids` by bumping their token
+    generation. The cached values are refreshed once the transaction
+    commits, so a rollback can't leave bumped generations in the cache.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    CustomUser.objects.filter(pk__in=user_ids).update(
+        token_generation=F('token_generation') + 1
+    )
+    transaction.on_commit(lambda: _cache_generations(user_ids))
+
+
+def _cache_generations(user_ids) -> None:
+    cache.set_many(
+        {
+            _cache_key(pk): generation
+            for pk, generation in CustomUser.objects.filter(
+                pk__in=user_ids
+            ).values_list('pk', 'token_generation')
+        },
+        get_setting('TOKEN_GENERATION_CACHE_TIMEOUT')
+    )
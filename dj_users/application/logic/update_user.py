@@ -1,3 +1,7 @@
+from django.db import transaction
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.logic.change_events import record_change
 from dj_users.infrastructure.models import CustomUser
 
 
@@ -16,12 +20,17 @@ def update_user(user: CustomUser, data: dict) -> CustomUser:
     CustomUser: Updated user instance.
     """
     image = data.pop('image', None)
+    changed = set()
     if image is not None:
         user.image = image
+        changed.add('image')
 
     for field, value in data.items():
         if hasattr(user, field):
             setattr(user, field, value)
+            changed.add(field)
 
-    user.save()
+    with transaction.atomic():
+        user.save()
+        record_change(user, ChangeAction.UPDATED, changed)
     return user
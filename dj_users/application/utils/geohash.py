@@ -0,0 +1,66 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude: float, longitude: float, precision: int = 12) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+
+    while len(geohash) < precision:
+        (value, value_range) = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(geohash)
+
+
+def cell_size(precision: int):
+    """Returns the `(height, width)` of a cell in degrees."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covered_radius_km(latitude: float, precision: int) -> float:
+    """
+    Distance from any point of a cell that is guaranteed to fall inside
+    the 3x3 block of cells around it.
+    """
+    (height, width) = cell_size(precision)
+    worst_latitude = min(90.0, abs(latitude) + height)
+    return min(
+        height * KM_PER_DEGREE,
+        width * KM_PER_DEGREE * math.cos(math.radians(worst_latitude)),
+    )
+
+
+def neighborhood(latitude: float, longitude: float, precision: int) -> set:
+    """The cell containing the point plus its eight neighbours."""
+    (height, width) = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        lat = max(-90.0, min(90.0, latitude + lat_step * height))
+        for lon_step in (-1, 0, 1):
+            lon = (longitude + lon_step * width + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lon, precision))
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,67 @@
+"""
+MinHash signatures and LSH banding to find similar strings without
+comparing every pair.
+
+Strings are turned into sets of character shingles; the probability that two
+signatures agree on a position equals the Jaccard similarity of their sets.
+Signatures are split into bands and only strings sharing a whole band are
+returned as candidates.
+"""
+import hashlib
+import random
+from collections import defaultdict
+from itertools import combinations
+
+_PRIME = (1 << 61) - 1
+
+
+def shingles(value: str, size: int = 3) -> set:
+    """Character shingles of `value`, padded so short strings still yield some."""
+    value = f' {value} '
+    if len(value) <= size:
+        return {value}
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._perms = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens: set) -> tuple:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+            for token in tokens
+        ] or [0]
+        return tuple(
+            min((a * value + b) % _PRIME for value in hashes)
+            for (a, b) in self._perms
+        )
+
+    def candidate_pairs(self, signatures: dict) -> set:
+        """Pairs of keys of `signatures` that share at least one band."""
+        pairs = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets = defaultdict(list)
+            for (key, signature) in signatures.items():
+                buckets[signature[start:start + self.rows]].append(key)
+            for keys in buckets.values():
+                if len(keys) > 1:
+                    pairs.update(combinations(sorted(keys), 2))
+        return pairs
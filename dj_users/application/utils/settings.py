@@ -0,0 +1,108 @@
+from django.conf import settings
+
+# Defaults for the `DJ_USERS_*` settings a project can override.
+DEFAULTS = {
+    # Response compression (dj_users.presentation.middleware)
+    'COMPRESSION_MIN_SIZE': 1024,
+    'COMPRESSION_BROTLI_QUALITY': 4,
+    # Bulk endpoints (UserViewSet.bulk_retrieve / bulk_update)
+    'BULK_RETRIEVE_MAX_IDS': 200,
+    'BULK_UPDATE_MAX_ITEMS': 1000,
+    'BULK_UPDATE_BATCH_SIZE': 500,
+    # Email confirmation (application.logic.confirm_email)
+    'EMAIL_CONFIRMATION_TTL_HOURS': 72,
+    'EMAIL_CONFIRMATION_URL': '/users/api/v1/confirm-email/{token}/',
+    # Confirmation email outbox (application.logic.confirmation_emails)
+    'EMAIL_DISPATCH_ON_COMMIT': False,
+    'EMAIL_DISPATCH_BATCH_SIZE': 200,
+    'EMAIL_DISPATCH_MAX_ATTEMPTS': 5,
+    'EMAIL_DISPATCH_RETRY_BASE_SECONDS': 60,
+    'EMAIL_DISPATCH_RETRY_MAX_SECONDS': 3600,
+    'EMAIL_DISPATCH_LEASE_SECONDS': 600,
+    # Buffered last_login writes (infrastructure.last_login_buffer). When
+    # enabled set SIMPLE_JWT['UPDATE_LAST_LOGIN'] = False.
+    'LAST_LOGIN_BUFFER': False,
+    'LAST_LOGIN_FLUSH_INTERVAL': 30,
+    'LAST_LOGIN_FLUSH_BATCH_SIZE': 500,
+    # Token endpoint load shedding (infrastructure.login_throttle). Opt-in:
+    # size the IP limits for clients sharing a NAT before enabling it.
+    'LOGIN_THROTTLE_ENABLED': False,
+    'LOGIN_THROTTLE_USERNAME_BURST': 10,
+    'LOGIN_THROTTLE_USERNAME_PER_MINUTE': 10,
+    'LOGIN_THROTTLE_IP_BURST': 30,
+    'LOGIN_THROTTLE_IP_PER_MINUTE': 60,
+    'LOGIN_HASH_CONCURRENCY': 4,
+    'LOGIN_HASH_WAIT_SECONDS': 2,
+    # Stateless refresh (application.logic.token_revocation)
+    'STATELESS_REFRESH': False,
+    'TOKEN_GENERATION_CACHE_TIMEOUT': 300,
+    # Signup statistics (UserViewSet.signup_stats), hourly series span at most these days
+    'SIGNUP_STATS_MAX_HOURLY_DAYS': 31,
+    # Public doctor directory (application.logic.doctor_directory)
+    'DOCTOR_DIRECTORY_CACHE_SECONDS': 60,
+    # Clinic geocoding and nearby search (infrastructure.geocoding)
+    'GEOCODER': 'dj_users.infrastructure.geocoding.FileGeocoder',
+    'GEOCODER_FILE': None,
+    'NEARBY_CLINICS_MAX_RESULTS': 50,
+    # Nurse search by services (application.logic.nurse_services)
+    'NURSE_SEARCH_MAX_SERVICES': 10,
+    'NURSE_SEARCH_MAX_RESULTS': 100,
+    # Duplicate patient detection (application.logic.duplicate_patients)
+    'DUPLICATE_SCORE_THRESHOLD': 0.7,
+    'DUPLICATE_MAX_BLOCK_SIZE': 1000,
+    'DUPLICATE_BATCH_SIZE': 5000,
+    # Name autocomplete (infrastructure.typeahead)
+    'TYPEAHEAD_BUILD_SECONDS': 60,
+    'TYPEAHEAD_MAX_AGE_SECONDS': 900,
+    'TYPEAHEAD_OVERLAY_LIMIT': 10000,
+    'AUTOCOMPLETE_MAX_RESULTS': 25,
+    # Username/email availability (infrastructure.availability)
+    'AVAILABILITY_ERROR_RATE': 0.01,
+    'AVAILABILITY_MIN_CAPACITY': 100000,
+    'AVAILABILITY_MAX_AGE_SECONDS': 3600,
+    'AVAILABILITY_CATCH_UP_SECONDS': 5,
+    'AVAILABILITY_THROTTLE_PER_MINUTE': 120,
+    # Retention of TERMINATED users (application.logic.retention)
+    'RETENTION_GRACE_DAYS': 30,
+    'RETENTION_MODE': 'anonymize',
+    'RETENTION_CHUNK_SIZE': 200,
+    'RETENTION_CHUNK_PAUSE_SECONDS': 0.5,
+    # Username that inherits the clinics of purged users, None to keep them
+    'RETENTION_CLINIC_OWNER': None,
+    # Cold storage of inactive users (application.logic.archive_users)
+    'ARCHIVE_INACTIVE_DAYS': 730,
+    'ARCHIVE_CHUNK_SIZE': 200,
+    'ARCHIVE_CHUNK_PAUSE_SECONDS': 0.5,
+    # Change feed and outbox relay (application.logic.change_events)
+    # Dotted path of a callable receiving a list of event dicts, None disables the relay
+    'CHANGE_RELAY': None,
+    'CHANGE_RELAY_BATCH_SIZE': 500,
+    'CHANGE_FEED_SETTLE_SECONDS': 2,
+    'CHANGE_FEED_MAX_RESULTS': 1000,
+    'CHANGE_EVENT_RETENTION_DAYS': 30,
+    # Worker start-up (dj_users.warmup): build the typeahead index and
+    # availability filters as soon as a worker is forked
+    'WARMUP_INDEXES': False,
+    # Per-request profiling for staff (infrastructure.request_profiler)
+    'PROFILING_ENABLED': True,
+    'PROFILING_HEADER': 'X-Profile-Token',
+    'PROFILING_QUERY_PARAM': '_profile',
+    'PROFILING_TOKEN_MAX_AGE_SECONDS': 3600,
+    'PROFILING_BUFFER_SIZE': 50,
+    'PROFILING_RETENTION_SECONDS': 86400,
+    'PROFILING_MAX_QUERIES': 500,
+    'PROFILING_TOP_FUNCTIONS': 60,
+    # Slow query capture (infrastructure.slow_queries, enabled by adding
+    # dj_users.presentation.middleware.SlowQueryMiddleware)
+    'SLOW_QUERY_THRESHOLD_MS': 200,
+    'SLOW_QUERY_EXPLAIN': True,
+    # EXPLAIN ANALYZE runs the query a second time, PostgreSQL only
+    'SLOW_QUERY_EXPLAIN_ANALYZE': False,
+    'SLOW_QUERY_FLUSH_INTERVAL': 60,
+    'SLOW_QUERY_MAX_PENDING': 1000,
+}
+
+
+def get_setting(name: str):
+    """Returns `settings.DJ_USERS_<name>` or its default value."""
+    return getattr(settings, f'DJ_USERS_{name}', DEFAULTS[name])
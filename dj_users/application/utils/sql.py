@@ -0,0 +1,29 @@
+import hashlib
+import re
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r'%\(\w+\)s|%s|\$\d+|\?')
+_NUMBERS = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ROWS = re.compile(r'\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Replaces literals and placeholders with `?` and collapses value lists, so
+    the statements of one query shape normalize to the same text:
+    `WHERE id IN (%s, %s, %s)` becomes `WHERE id IN (?...)`.
+    """
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _LISTS.sub('(?...)', sql)
+    sql = _ROWS.sub('(?...)...', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def sql_fingerprint(normalized_sql: str) -> str:
+    return hashlib.blake2b(normalized_sql.encode(), digest_size=16).hexdigest()
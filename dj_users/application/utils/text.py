@@ -0,0 +1,56 @@
+import re
+import unicodedata
+
+from django.utils.text import slugify
+
+_SPACES = re.compile(r'\s+')
+_SERVICE_SEPARATORS = re.compile(r'[,;\n\r|/]+')
+
+
+def normalize_text(value: str) -> str:
+    """Lowercases, strips accents and collapses whitespace: ' Núñez  ' -> 'nunez'."""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return _SPACES.sub(' ', value).strip().lower()
+
+
+def split_services(text: str) -> dict:
+    """
+    Parses a free-text list of services ("Curaciones, inyecciones; sondas")
+    into `{slug: name}`, keeping the first spelling of each service.
+    """
+    services = {}
+    for chunk in _SERVICE_SEPARATORS.split(text or ''):
+        name = _SPACES.sub(' ', chunk).strip(' .-')
+        slug = slugify(normalize_text(name))[:100]
+        if slug and slug not in services:
+            services[slug] = name[:100]
+    return services
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def soundex(value: str) -> str:
+    """Phonetic key of the first word of `value`: 'Gonzalez' -> 'g524'."""
+    word = ''.join(char for char in normalize_text(value).split(' ')[0] if char.isalpha())
+    if not word:
+        return ''
+    key = word[0]
+    previous = _SOUNDEX_CODES.get(word[0], '')
+    for char in word[1:]:
+        code = _SOUNDEX_CODES.get(char, '')
+        if code and code != previous:
+            key += code
+        if char not in 'hw':
+            previous = code
+    return (key + '000')[:4]
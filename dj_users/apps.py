@@ -10,3 +10,4 @@ class DjUsersConfig(AppConfig):
 
     def ready(self):
         import dj_users.models  # noqa
+        import dj_users.signals  # noqa
@@ -0,0 +1,157 @@
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from itertools import chain
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from dj_users.application.utils.bloom import BloomFilter
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import ArchivedUser, CustomUser
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('username', 'email')
+# Catch-ups re-read this much before their watermark, so rows written by
+# transactions still open at the previous catch-up are not missed
+CATCH_UP_OVERLAP = timedelta(minutes=5)
+
+
+def availability_key(value: str) -> str:
+    return (value or '').strip().lower()
+
+
+class AvailabilityFilter:
+    """
+    Per-process Bloom filters over the normalized usernames and emails of
+    active and archived users.
+
+    `might_exist` answering False means the value is definitely free, so no
+    write may be missed. The filters are built in a background thread on
+    first use and fed by the `CustomUser` post_save receiver in this
+    process. At most every `DJ_USERS_AVAILABILITY_CATCH_UP_SECONDS` they
+    also add the users created or updated in other processes (or with
+    `queryset.update()`, which sets `updated_at`) since an `updated_at`
+    watermark. The periodic rebuild drops the values no longer used and also
+    runs when the filters fill past their capacity. Availability is
+    advisory: the registration and update serializers still validate with
+    the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._filters = None
+        self._since = None
+        self._building = False
+        self._next_build = 0
+        self._next_catch_up = 0
+
+    def start(self):
+        """Starts building the filters if they are missing, stale or saturated."""
+        with self._lock:
+            self._reset_after_fork()
+            filters = self._filters
+            stale = time.monotonic() >= self._next_build or (
+                filters is not None and any(bloom.saturated for bloom in filters.values())
+            )
+            if self._building or not stale:
+                return
+            self._building = True
+        threading.Thread(
+            target=self._build,
+            name='dj_users-availability-build',
+            daemon=True,
+        ).start()
+
+    def might_exist(self, field: str, value: str):
+        """False if `value` is definitely unused, True if it may be, None if not built."""
+        self.start()
+        if self._filters is None:
+            return None
+        self._catch_up()
+        return availability_key(value) in self._filters[field]
+
+    def add(self, **values):
+        """Records the `username=`/`email=` values of a new or renamed user."""
+        with self._lock:
+            self._reset_after_fork()
+            if self._filters is None:
+                return
+            for (field, value) in values.items():
+                if value:
+                    self._filters[field].add(availability_key(value))
+
+    def _catch_up(self):
+        with self._lock:
+            if time.monotonic() < self._next_catch_up:
+                return
+            self._next_catch_up = (
+                time.monotonic() + get_setting('AVAILABILITY_CATCH_UP_SECONDS')
+            )
+            since = self._since
+
+        started = timezone.now()
+        rows = list(
+            CustomUser.objects.filter(updated_at__gte=since - CATCH_UP_OVERLAP)
+            .order_by()
+            .values_list(*FIELDS)
+        )
+        with self._lock:
+            if self._filters is None:
+                return
+            for (username, email) in rows:
+                self._filters['username'].add(availability_key(username))
+                self._filters['email'].add(availability_key(email))
+            self._since = max(self._since, started)
+
+    def _reset_after_fork(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._filters = None
+        self._since = None
+        self._building = False
+        self._next_build = 0
+        self._next_catch_up = 0
+
+    def _build(self):
+        filters = None
+        try:
+            # Rows written while scanning are caught up from here
+            started = timezone.now()
+            total = CustomUser.objects.count() + ArchivedUser.objects.count()
+            # Headroom so new registrations don't saturate it before the next rebuild
+            capacity = max(total * 2, get_setting('AVAILABILITY_MIN_CAPACITY'))
+            error_rate = get_setting('AVAILABILITY_ERROR_RATE')
+            filters = {field: BloomFilter(capacity, error_rate) for field in FIELDS}
+
+            rows = CustomUser.objects.order_by().values_list(*FIELDS).iterator(
+                chunk_size=5000
+            )
+            archived = ArchivedUser.objects.order_by().values_list(*FIELDS).iterator(
+                chunk_size=5000
+            )
+            for (username, email) in chain(rows, archived):
+                filters['username'].add(availability_key(username))
+                filters['email'].add(availability_key(email))
+        except Exception:
+            filters = None
+            logger.exception('Could not build the availability filters')
+        finally:
+            with self._lock:
+                self._building = False
+                self._next_build = (
+                    time.monotonic() + get_setting('AVAILABILITY_MAX_AGE_SECONDS')
+                )
+                if filters is not None:
+                    self._filters = filters
+                    self._since = started
+                    self._next_catch_up = 0
+            close_old_connections()
+
+
+availability_filter = AvailabilityFilter()
@@ -0,0 +1,47 @@
+import json
+from functools import lru_cache
+
+from django.utils.module_loading import import_string
+
+from dj_users.application.utils.settings import get_setting
+from dj_users.application.utils.text import normalize_text
+
+
+class BaseGeocoder:
+    """Resolves a free-text address into `(latitude, longitude)` or `None`."""
+
+    def geocode(self, address: str):
+        raise NotImplementedError
+
+
+class FileGeocoder(BaseGeocoder):
+    """
+    Offline geocoder reading a JSON file of `{"address": [lat, lon]}`.
+    Addresses are compared normalized (case, accents and spacing). Meant for
+    tests and for loading coordinates produced by an external batch job.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or get_setting('GEOCODER_FILE')
+        self._locations = None
+
+    @property
+    def locations(self) -> dict:
+        if self._locations is None:
+            self._locations = {}
+            if self.path:
+                with open(self.path, encoding='utf-8') as file:
+                    for address, (latitude, longitude) in json.load(file).items():
+                        self._locations[normalize_text(address)] = (
+                            float(latitude), float(longitude)
+                        )
+        return self._locations
+
+    def geocode(self, address: str):
+        return self.locations.get(normalize_text(address))
+
+
+@lru_cache(maxsize=1)
+def get_geocoder() -> BaseGeocoder:
+    """Instantiates the geocoder class configured in `DJ_USERS_GEOCODER`."""
+    return import_string(get_setting('GEOCODER'))()
@@ -0,0 +1,107 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections, models
+from django.db.models import Case, Value, When
+
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Per-process write-behind buffer for `CustomUser.last_login`.
+
+    Logins are recorded in memory and written with one
+    `UPDATE ... SET last_login = CASE id WHEN ... END WHERE id IN (...)`
+    per `DJ_USERS_LAST_LOGIN_FLUSH_BATCH_SIZE` users. A daemon thread
+    flushes every `DJ_USERS_LAST_LOGIN_FLUSH_INTERVAL` seconds, which bounds
+    how stale `last_login` (and ordering by it) can be; the thread is also
+    woken up when the buffer reaches the batch size, and the buffer is
+    flushed at interpreter exit. Logins never write to the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pid = None
+        self._flusher = None
+        self._wake = threading.Event()
+
+    def record(self, user_id, when):
+        with self._lock:
+            self._ensure_flusher()
+            previous = self._pending.get(user_id)
+            if previous is None or when > previous:
+                self._pending[user_id] = when
+            if len(self._pending) >= get_setting('LAST_LOGIN_FLUSH_BATCH_SIZE'):
+                self._wake.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        batch_size = get_setting('LAST_LOGIN_FLUSH_BATCH_SIZE')
+        items = list(pending.items())
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            try:
+                CustomUser.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+                    last_login=Case(
+                        *[When(pk=pk, then=Value(when)) for pk, when in chunk],
+                        output_field=models.DateTimeField(),
+                    )
+                )
+            except Exception:
+                # Put back what wasn't written; newer logins recorded meanwhile win
+                with self._lock:
+                    for pk, when in items[start:]:
+                        self._pending.setdefault(pk, when)
+                raise
+        return len(items)
+
+    def _ensure_flusher(self):
+        # Forked workers (gunicorn --preload, celery prefork) don't inherit
+        # the parent's thread, so start one per process.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._run,
+            name='dj_users-last-login-flusher',
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(get_setting('LAST_LOGIN_FLUSH_INTERVAL'))
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush buffered last_login values')
+                # The entries were kept; don't let a full buffer retry in a loop
+                time.sleep(get_setting('LAST_LOGIN_FLUSH_INTERVAL'))
+            finally:
+                close_old_connections()
+
+
+last_login_buffer = LastLoginBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        last_login_buffer.flush()
+    except Exception:
+        logger.exception('Could not flush buffered last_login values at exit')
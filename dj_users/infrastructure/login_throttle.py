@@ -0,0 +1,132 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from dj_users.application.utils.settings import get_setting
+
+
+class TokenBucket:
+    """
+    In-process token buckets keyed by string, bounded to `max_keys` entries
+    (least recently used keys are dropped first).
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.max_keys = max_keys
+
+    def consume(self, key: str, capacity: float, refill_per_second: float):
+        """Returns `(allowed, retry_after_seconds)`."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0
+        return False, math.ceil((1 - tokens) / refill_per_second)
+
+
+class LoginMetrics:
+    """Per-process counters for the login throttle."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+class LoginThrottle:
+    """
+    Load shedding for the token endpoint, applied before the password hasher
+    runs:
+
+    * a token bucket per username and per client IP, checked in process
+      first and then against a shared fixed-window counter in the cache so
+      limits hold across workers;
+    * a cap on simultaneous password hash operations per worker.
+    """
+
+    def __init__(self):
+        self.buckets = TokenBucket()
+        self.metrics = LoginMetrics()
+        self._hash_slots = None
+        self._hash_slots_lock = threading.Lock()
+
+    def check(self, username: str, ident: str):
+        """Returns `None` when the attempt is admitted, else `(scope, retry_after)`."""
+        keys = [('ip', ident)]
+        username = username.strip().lower() if username else ''
+        if username:
+            # Hashed: usernames can be long or hold characters (spaces,
+            # control characters) memcached rejects in keys, and shouldn't
+            # end up in the cache as plain text
+            keys.insert(0, ('username', hashlib.sha256(username.encode()).hexdigest()))
+
+        for scope, value in keys:
+            capacity = get_setting(f'LOGIN_THROTTLE_{scope.upper()}_BURST')
+            per_minute = get_setting(f'LOGIN_THROTTLE_{scope.upper()}_PER_MINUTE')
+            key = f'{scope}:{value}'
+
+            allowed, retry_after = self.buckets.consume(key, capacity, per_minute / 60)
+            if allowed:
+                allowed, retry_after = self._consume_shared(key, capacity + per_minute)
+            if not allowed:
+                self.metrics.incr(f'rejected_{scope}')
+                return scope, retry_after
+
+        self.metrics.incr('admitted')
+        return None
+
+    def _consume_shared(self, key: str, limit: int):
+        window = 60
+        cache_key = f'dj_users:login_throttle:{key}:{int(time.time() // window)}'
+        cache.add(cache_key, 0, timeout=window * 2)
+        try:
+            count = cache.incr(cache_key)
+        except ValueError:
+            # The key expired between add() and incr()
+            return True, 0
+        if count > limit:
+            return False, window - int(time.time() % window)
+        return True, 0
+
+    @property
+    def hash_slots(self) -> threading.BoundedSemaphore:
+        if self._hash_slots is None:
+            with self._hash_slots_lock:
+                if self._hash_slots is None:
+                    self._hash_slots = threading.BoundedSemaphore(
+                        get_setting('LOGIN_HASH_CONCURRENCY')
+                    )
+        return self._hash_slots
+
+    def acquire_hash_slot(self) -> bool:
+        acquired = self.hash_slots.acquire(timeout=get_setting('LOGIN_HASH_WAIT_SECONDS'))
+        if not acquired:
+            self.metrics.incr('rejected_concurrency')
+        return acquired
+
+    def release_hash_slot(self):
+        self.hash_slots.release()
+
+
+login_throttle = LoginThrottle()
@@ -2,10 +2,15 @@ import uuid
 
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from dj_users.application.constants.blood_types import BLOOD_TYPES
+from dj_users.application.domain.change_events import ChangeAction, ChangeEntity
+from dj_users.application.domain.duplicates import DuplicateStatus
+from dj_users.application.domain.email_confirmation import ConfirmationEmailStatus
 from dj_users.application.domain.roles import UserRole
+from dj_users.application.domain.stats import RollupGranularity
 
 from dj_core_utils.db.models import CoreBaseModel
 
@@ -19,8 +24,13 @@ class CustomUser(AbstractUser, CoreBaseModel):
     phone_number = models.CharField(max_length=20, blank=True)
     email = models.EmailField(unique=True)
     agenda_token = models.UUIDField(default=uuid.uuid4, unique=True)
-    confirmation_token = models.UUIDField(default=uuid.uuid4)
+    confirmation_token = models.UUIDField(default=uuid.uuid4, unique=True)
+    confirmation_token_created_at = models.DateTimeField(default=timezone.now)
     is_email_confirmed = models.BooleanField(default=False)
+    # Bumped to revoke every refresh/access token issued before
+    token_generation = models.PositiveIntegerField(default=0)
+    # Set by the retention purge once the personal data was removed
+    anonymized_at = models.DateTimeField(null=True, blank=True)
     birth_date = models.DateField(null=True, blank=True)
     user_type = models.CharField(
         max_length=20,
@@ -32,6 +42,10 @@ class CustomUser(AbstractUser, CoreBaseModel):
         app_label = 'dj_users'
         verbose_name = _('Usuario')
         verbose_name_plural = _('Usuarios')
+        indexes = [
+            # Catch-up of the availability filters (infrastructure.availability)
+            models.Index(fields=['updated_at'], name='dj_users_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f'{self.username}'
@@ -42,6 +56,10 @@ class Clinic(CoreBaseModel):
     owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     address = models.CharField(max_length=255, blank=True)
     phone = models.CharField(max_length=20, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude on save, indexed for prefix lookups
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
 
     class Meta:
         app_label = 'dj_users'
@@ -103,12 +121,32 @@ class PatientProfile(CoreBaseModel):
         return _('Paciente: %(username)s') % {'username': self.user.username}
 
 
+class NurseService(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Servicio de enfermería')
+        verbose_name_plural = _('Servicios de enfermería')
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class NurseProfile(CoreBaseModel):
     user = models.OneToOneField(
         CustomUser,
         on_delete=models.CASCADE,
         related_name='nurse_data')
     available_services = models.TextField(blank=True)
+    # Normalized from `available_services`, see `sync_nurse_services`
+    services = models.ManyToManyField(
+        NurseService,
+        related_name='nurses',
+        blank=True
+    )
 
     class Meta:
         app_label = 'dj_users'
@@ -117,3 +155,293 @@ class NurseProfile(CoreBaseModel):
 
     def __str__(self):
         return _('Enfermero: %(username)s') % {'username': self.user.username}
+
+
+class ConfirmationEmail(models.Model):
+    """Outbox row for a pending confirmation email, sent in batches by Celery."""
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='confirmation_emails'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=ConfirmationEmailStatus.choices,
+        default=ConfirmationEmailStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Correo de confirmación')
+        verbose_name_plural = _('Correos de confirmación')
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='dj_users_confmail_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} ({self.status})'
+
+
+class SignupRollup(models.Model):
+    """Signups per role and hour/day bucket, maintained incrementally."""
+    granularity = models.CharField(max_length=5, choices=RollupGranularity.choices)
+    bucket_start = models.DateTimeField()
+    user_type = models.CharField(max_length=20, choices=UserRole.choices)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Resumen de registros')
+        verbose_name_plural = _('Resúmenes de registros')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket_start', 'user_type'],
+                name='dj_users_signup_rollup_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.granularity} {self.bucket_start:%Y-%m-%d %H:%M} {self.user_type}'
+
+
+class DoctorDirectoryEntry(models.Model):
+    """
+    Denormalized, public read table of verified and active doctors, kept in
+    sync by signals on `DoctorProfile`, `CustomUser` and `Clinic`.
+    """
+    doctor = models.OneToOneField(
+        DoctorProfile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='directory_entry'
+    )
+    full_name = models.CharField(max_length=301)
+    # Normalized names, indexed for prefix (LIKE 'x%') lookups
+    first_name_key = models.CharField(max_length=150, db_index=True)
+    last_name_key = models.CharField(max_length=150, db_index=True)
+    # "<last> <first>", also the keyset pagination order
+    sort_key = models.CharField(max_length=301, db_index=True)
+    specialty = models.ForeignKey(
+        "dj_catalogs.Specialty",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    clinic_name = models.CharField(max_length=100, blank=True)
+    image = models.CharField(max_length=100, blank=True)
+    agenda_token = models.UUIDField()
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Entrada del directorio de médicos')
+        verbose_name_plural = _('Directorio de médicos')
+        indexes = [
+            models.Index(fields=['sort_key', 'doctor'], name='dj_users_dirent_sort_idx'),
+            models.Index(
+                fields=['specialty', 'sort_key', 'doctor'],
+                name='dj_users_dirent_spec_idx'
+            ),
+            models.Index(
+                fields=['clinic', 'sort_key', 'doctor'],
+                name='dj_users_dirent_clinic_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.full_name
+
+
+class PatientBlockingKey(models.Model):
+    """
+    Blocking keys of a patient (birth date, phone suffix and name phonetics),
+    only patients sharing a key are compared by `find_duplicate_patients`.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    key = models.CharField(max_length=64)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Clave de agrupación de paciente')
+        verbose_name_plural = _('Claves de agrupación de pacientes')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='dj_users_blockkey_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['key', 'user'], name='dj_users_blockkey_key_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.key}'
+
+
+class DuplicateCandidate(models.Model):
+    """Pair of patients that probably are the same person, pending review."""
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='duplicate_candidates'
+    )
+    duplicate = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    # Lowest user id of the pairs linked together in the same scan batch
+    cluster = models.PositiveBigIntegerField(db_index=True)
+    score = models.FloatField()
+    status = models.CharField(
+        max_length=10,
+        choices=DuplicateStatus.choices,
+        default=DuplicateStatus.PENDING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Posible paciente duplicado')
+        verbose_name_plural = _('Posibles pacientes duplicados')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'duplicate'],
+                name='dj_users_duplicate_pair_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'cluster'], name='dj_users_duplicate_review_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} ~ {self.duplicate_id} ({self.score:.2f})'
+
+
+class DuplicateScanRun(models.Model):
+    """A duplicate detection run; incremental runs start after `last_user_id`."""
+    full = models.BooleanField(default=False)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    users_scanned = models.PositiveIntegerField(default=0)
+    candidates_found = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Búsqueda de duplicados')
+        verbose_name_plural = _('Búsquedas de duplicados')
+
+    def __str__(self):
+        return f'{self.started_at:%Y-%m-%d %H:%M} ({self.candidates_found})'
+
+
+class ArchivedUser(models.Model):
+    """
+    Cold storage for long-inactive users: the serialized user and profile
+    rows, removed from the hot tables until the account is used again.
+    Lookup columns mirror the unique fields used to find a user.
+    """
+    user_id = models.BigIntegerField(primary_key=True)
+    username = models.CharField(max_length=150, unique=True)
+    email = models.EmailField(unique=True)
+    agenda_token = models.UUIDField(unique=True)
+    user_type = models.CharField(max_length=20, choices=UserRole.choices)
+    last_login = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+    # `django.core.serializers` "python" format of the user, its profile and
+    # its other restorable rows (`archive_users.USER_ROW_MODELS`), user first
+    data = models.JSONField()
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Usuario archivado')
+        verbose_name_plural = _('Usuarios archivados')
+
+    def __str__(self):
+        return self.username
+
+
+class ChangeEvent(models.Model):
+    """
+    Outbox row describing a change to a user, profile or clinic, written in
+    the transaction of the change. The id is the change feed cursor.
+    """
+    entity = models.CharField(max_length=20, choices=ChangeEntity.choices)
+    entity_id = models.BigIntegerField()
+    action = models.CharField(max_length=20, choices=ChangeAction.choices)
+    # User the change belongs to, also for profile events
+    user_id = models.BigIntegerField(null=True, blank=True)
+    # Names of the changed fields, values are read from the API
+    fields = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    relayed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Evento de cambio')
+        verbose_name_plural = _('Eventos de cambio')
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(relayed_at__isnull=True),
+                name='dj_users_change_pending_idx'
+            ),
+            models.Index(fields=['created_at'], name='dj_users_change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.entity}:{self.entity_id} {self.action}'
+
+
+class SlowQueryStat(models.Model):
+    """
+    Slow queries run by `dj_users` views, aggregated by normalized SQL and
+    originating view. Durations are kept as a histogram over
+    `infrastructure.slow_queries.BUCKETS_MS` so workers can merge them; the
+    percentiles are the upper bounds of the matching buckets.
+    """
+    fingerprint = models.CharField(max_length=32)
+    # `<view>.<action>` (or `<view>.<method>`) that ran the query
+    origin = models.CharField(max_length=200)
+    normalized_sql = models.TextField()
+    # Last EXPLAIN output, it may contain the literal values of that run
+    plan = models.TextField(blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    p50_ms = models.FloatField(default=0)
+    p95_ms = models.FloatField(default=0)
+    p99_ms = models.FloatField(default=0)
+    histogram = models.JSONField(default=list)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        app_label = 'dj_users'
+        verbose_name = _('Consulta lenta')
+        verbose_name_plural = _('Consultas lentas')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint', 'origin'],
+                name='dj_users_slow_query_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.origin} {self.fingerprint}'
@@ -0,0 +1,167 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+from dj_users.application.utils.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'dj_users:profiling:sequence'
+SLOT_KEY = 'dj_users:profiling:slot:{}'
+SIGNING_SALT = 'dj_users.request_profiler'
+
+
+# ======================================================================
+# Profiling tokens
+# ======================================================================
+
+
+def make_profiling_token(user) -> str:
+    """Signed token that lets `user` profile its own requests for a while."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(str(user.pk))
+
+
+def check_profiling_token(user, token: str) -> bool:
+    if not token or not getattr(user, 'is_staff', False):
+        return False
+    try:
+        value = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token,
+            max_age=get_setting('PROFILING_TOKEN_MAX_AGE_SECONDS'),
+        )
+    except signing.BadSignature:
+        return False
+    return value == str(user.pk)
+
+
+# ======================================================================
+# Capture
+# ======================================================================
+
+
+class QueryRecorder:
+    """`execute_wrapper` recording the SQL (without params) and its duration."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += duration_ms
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'many': many,
+                    'duration_ms': round(duration_ms, 3),
+                })
+
+
+class RequestProfile:
+    """cProfile trace plus SQL timings of a single request."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.recorder = QueryRecorder(get_setting('PROFILING_MAX_QUERIES'))
+        self._connections = []
+        self._started = None
+        self._profiling = False
+
+    def start(self):
+        self._connections = connections.all()
+        for connection in self._connections:
+            connection.execute_wrappers.append(self.recorder)
+        self._started = time.perf_counter()
+        try:
+            self.profiler.enable()
+            self._profiling = True
+        except ValueError:
+            # Another profiler is already active in this thread
+            logger.warning('Could not start cProfile, recording SQL only')
+
+    def stop(self) -> float:
+        if self._profiling:
+            self.profiler.disable()
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        for connection in self._connections:
+            if self.recorder in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self.recorder)
+        return duration_ms
+
+    def stats(self) -> str:
+        if not self._profiling:
+            return ''
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(
+            get_setting('PROFILING_TOP_FUNCTIONS')
+        )
+        return stream.getvalue()
+
+    def finish(self, **details) -> int:
+        """Stops the capture and stores it with `details` (path, view, ...)."""
+        duration_ms = self.stop()
+        return store_profile({
+            **details,
+            'created_at': timezone.now().isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'sql_count': self.recorder.count,
+            'sql_ms': round(self.recorder.total_ms, 3),
+            'queries': self.recorder.queries,
+            'profile': self.stats(),
+        })
+
+
+# ======================================================================
+# Ring buffer
+# ======================================================================
+
+
+def store_profile(entry: dict) -> int:
+    """
+    Stores `entry` in a ring buffer of `DJ_USERS_PROFILING_BUFFER_SIZE` cache
+    slots shared by every worker, overwriting the oldest one.
+
+    Returns:
+    int: Id of the stored profile.
+    """
+    cache.add(SEQUENCE_KEY, 0, None)
+    try:
+        profile_id = cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        # Evicted between add() and incr()
+        profile_id = time.time_ns()
+    entry['id'] = profile_id
+    cache.set(
+        SLOT_KEY.format(profile_id % get_setting('PROFILING_BUFFER_SIZE')),
+        entry,
+        get_setting('PROFILING_RETENTION_SECONDS'),
+    )
+    return profile_id
+
+
+def list_profiles() -> list:
+    """Stored profiles, newest first."""
+    keys = [SLOT_KEY.format(slot) for slot in range(get_setting('PROFILING_BUFFER_SIZE'))]
+    return sorted(cache.get_many(keys).values(), key=lambda entry: entry['id'], reverse=True)
+
+
+def get_profile(profile_id: int):
+    entry = cache.get(SLOT_KEY.format(profile_id % get_setting('PROFILING_BUFFER_SIZE')))
+    if entry is None or entry['id'] != profile_id:
+        return None
+    return entry
@@ -0,0 +1,201 @@
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from dj_users.application.utils.settings import get_setting
+from dj_users.application.utils.sql import normalize_sql, sql_fingerprint
+from dj_users.infrastructure.models import SlowQueryStat
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the duration histogram, plus an overflow bucket
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# `<view>.<action>` of the `dj_users` view being served, set by
+# `SlowQueryMiddleware`. Queries are only timed while it is set.
+current_origin = ContextVar('dj_users_slow_query_origin', default=None)
+
+
+def percentile(histogram: list, max_ms: float, fraction: float) -> float:
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    rank = total * fraction
+    seen = 0
+    for (index, count) in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            bound = BUCKETS_MS[index] if index < len(BUCKETS_MS) else max_ms
+            return float(min(bound, max_ms))
+    return float(max_ms)
+
+
+def merge_histograms(left: list, right: list) -> list:
+    size = len(BUCKETS_MS) + 1
+    left = list(left) + [0] * (size - len(left))
+    return [left[index] + (right[index] if index < len(right) else 0) for index in range(size)]
+
+
+def _is_select(sql: str) -> bool:
+    return sql.lstrip().lstrip('(').upper().startswith('SELECT')
+
+
+class SlowQueryRecorder:
+    """
+    Per-process aggregation of the slow queries run by `dj_users` views.
+
+    Installed as an `execute_wrapper` on every connection; outside of a
+    `dj_users` view it only reads a context variable. Statements slower
+    than `DJ_USERS_SLOW_QUERY_THRESHOLD_MS` are grouped by normalized SQL
+    and origin, and the first SELECT of each group per flush is explained
+    on the same connection (`EXPLAIN QUERY PLAN` on SQLite, `EXPLAIN`, or
+    `EXPLAIN ANALYZE` on PostgreSQL with `DJ_USERS_SLOW_QUERY_EXPLAIN_ANALYZE`).
+    A daemon thread merges the groups into `SlowQueryStat` every
+    `DJ_USERS_SLOW_QUERY_FLUSH_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pid = None
+        self._flusher = None
+
+    def install(self, connection):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __call__(self, execute, sql, params, many, context):
+        origin = current_origin.get()
+        if origin is None:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= get_setting('SLOW_QUERY_THRESHOLD_MS'):
+            self.record(context['connection'], origin, sql, params, many, duration_ms)
+        return result
+
+    def record(self, connection, origin, sql, params, many, duration_ms):
+        normalized = normalize_sql(sql)
+        key = (sql_fingerprint(normalized), origin)
+        with self._lock:
+            self._ensure_flusher()
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= get_setting('SLOW_QUERY_MAX_PENDING'):
+                    return
+                entry = self._pending[key] = {
+                    'normalized_sql': normalized,
+                    'plan': None,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'histogram': [0] * (len(BUCKETS_MS) + 1),
+                    'first_seen': timezone.now(),
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['histogram'][bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+            entry['last_seen'] = timezone.now()
+            explain = entry['plan'] is None and not many and _is_select(sql)
+            if explain:
+                entry['plan'] = ''
+
+        if explain and get_setting('SLOW_QUERY_EXPLAIN'):
+            plan = self.explain(connection, sql, params)
+            with self._lock:
+                if key in self._pending:
+                    self._pending[key]['plan'] = plan
+
+    def explain(self, connection, sql, params) -> str:
+        if not connection.features.supports_explaining_query_execution:
+            return ''
+        options = {}
+        if connection.vendor == 'postgresql' and get_setting('SLOW_QUERY_EXPLAIN_ANALYZE'):
+            options['analyze'] = True
+        # The EXPLAIN itself must not be recorded (and explained) again
+        token = current_origin.set(None)
+        try:
+            prefix = connection.ops.explain_query_prefix(**options)
+            # A savepoint keeps a failing EXPLAIN from breaking the request's transaction
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{prefix} {sql}', params)
+                    rows = cursor.fetchall()
+        except DatabaseError:
+            logger.debug('Could not explain a slow query', exc_info=True)
+            return ''
+        finally:
+            current_origin.reset(token)
+        if connection.vendor == 'sqlite':
+            return '\n'.join(str(row[-1]) for row in rows)
+        return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for ((fingerprint, origin), entry) in pending.items():
+            with transaction.atomic():
+                (stat, _) = SlowQueryStat.objects.select_for_update().get_or_create(
+                    fingerprint=fingerprint,
+                    origin=origin,
+                    defaults={
+                        'normalized_sql': entry['normalized_sql'],
+                        'first_seen': entry['first_seen'],
+                    },
+                )
+                stat.count += entry['count']
+                stat.total_ms += entry['total_ms']
+                stat.max_ms = max(stat.max_ms, entry['max_ms'])
+                stat.histogram = merge_histograms(stat.histogram, entry['histogram'])
+                stat.p50_ms = percentile(stat.histogram, stat.max_ms, 0.5)
+                stat.p95_ms = percentile(stat.histogram, stat.max_ms, 0.95)
+                stat.p99_ms = percentile(stat.histogram, stat.max_ms, 0.99)
+                stat.last_seen = entry['last_seen']
+                if entry['plan']:
+                    stat.plan = entry['plan']
+                stat.save()
+        return len(pending)
+
+    def _ensure_flusher(self):
+        # Forked workers don't inherit the parent's thread, start one per process
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._pending = {}
+        self._flusher = threading.Thread(
+            target=self._run,
+            name='dj_users-slow-query-flusher',
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(get_setting('SLOW_QUERY_FLUSH_INTERVAL'))
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush slow query stats')
+            finally:
+                close_old_connections()
+
+
+slow_query_recorder = SlowQueryRecorder()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        slow_query_recorder.flush()
+    except Exception:
+        logger.exception('Could not flush slow query stats at exit')
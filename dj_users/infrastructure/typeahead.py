@@ -0,0 +1,221 @@
+import logging
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.db import close_old_connections
+
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.utils.settings import get_setting
+from dj_users.application.utils.text import normalize_text
+from dj_users.infrastructure.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+MAX_TOKEN_LENGTH = 24
+ROLE_CODES = {role: code for (code, role) in enumerate(UserRole.values)}
+# Packed entry tail: user id and role code, after a NUL separating the token
+_ENTRY = struct.Struct('>qb')
+
+
+def user_tokens(first_name: str, last_name: str, username: str) -> set:
+    """Normalized words of a user's names, the keys of the typeahead index."""
+    tokens = set()
+    for value in (first_name, last_name, username):
+        for word in normalize_text(value).split(' '):
+            if word:
+                tokens.add(word[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+class PrefixArrays:
+    """
+    Immutable sorted `(token, user_id, role)` entries packed in flat arrays:
+    the tokens concatenated in one bytes object with an offsets array, plus
+    parallel id and role arrays. About 13 bytes of overhead per entry, so a
+    million users with three names each stay around 60 MB.
+    """
+
+    def __init__(self, packed: list):
+        packed.sort()
+        blob = bytearray()
+        self._offsets = array('I', [0])
+        self._ids = array('q')
+        self._roles = array('b')
+        for entry in packed:
+            (user_id, role) = _ENTRY.unpack(entry[-_ENTRY.size:])
+            blob += entry[:-_ENTRY.size - 1]
+            self._offsets.append(len(blob))
+            self._ids.append(user_id)
+            self._roles.append(role)
+        self._blob = bytes(blob)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _key(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+    def scan(self, prefix: bytes):
+        """Yields `(user_id, role)` of the entries whose token starts with `prefix`."""
+        index = bisect_left(range(len(self)), prefix, key=self._key)
+        while index < len(self) and self._key(index).startswith(prefix):
+            yield (self._ids[index], self._roles[index])
+            index += 1
+
+
+def pack_entries(user_id: int, role: str, tokens) -> list:
+    tail = _ENTRY.pack(user_id, ROLE_CODES.get(role, -1))
+    return [token.encode() + b'\0' + tail for token in tokens]
+
+
+class TypeaheadIndex:
+    """
+    Per-process prefix index over the normalized names of every user.
+
+    The base index is built in a background thread on first use and rebuilt
+    every `DJ_USERS_TYPEAHEAD_MAX_AGE_SECONDS`; a build that takes longer
+    than `DJ_USERS_TYPEAHEAD_BUILD_SECONDS` is abandoned. Changes seen
+    through `CustomUser` signals go to a small overlay that shadows the base
+    entries of the same user until the next rebuild, which is also triggered
+    when the overlay grows past `DJ_USERS_TYPEAHEAD_OVERLAY_LIMIT`.
+    `search` returns None while no base index is available, callers fall
+    back to the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._base = None
+        self._overlay = {}
+        self._building = False
+        self._next_build = 0
+
+    def start(self):
+        """Starts building the index if it is missing or stale."""
+        with self._lock:
+            self._reset_after_fork()
+            stale = (
+                time.monotonic() >= self._next_build or
+                len(self._overlay) > get_setting('TYPEAHEAD_OVERLAY_LIMIT')
+            )
+            if self._building or not stale:
+                return
+            self._building = True
+        threading.Thread(
+            target=self._build,
+            name='dj_users-typeahead-build',
+            daemon=True,
+        ).start()
+
+    def search(self, words, roles=None, limit: int = None):
+        """
+        Ids of users with a name word starting with each of `words` (already
+        normalized), restricted to `roles` when given. None while the index
+        is not built.
+
+        The longest word is scanned in index order and its matches are kept
+        if they are in the matches of every other word, so `limit` counts
+        only users matching the whole query.
+        """
+        self.start()
+        base = self._base
+        if base is None:
+            return None
+
+        # Tokens are stored truncated
+        words = sorted({word[:MAX_TOKEN_LENGTH] for word in words}, key=len, reverse=True)
+        allowed = None if roles is None else {ROLE_CODES[role] for role in roles}
+        with self._lock:
+            overlay = list(self._overlay.items())
+
+        ids = []
+        shadowed = set()
+        for (user_id, (tokens, role, _)) in overlay:
+            shadowed.add(user_id)
+            if allowed is not None and ROLE_CODES.get(role) not in allowed:
+                continue
+            if all(any(token.startswith(word) for token in tokens) for word in words):
+                ids.append(user_id)
+
+        others = [
+            {user_id for (user_id, _) in base.scan(word.encode())}
+            for word in words[1:]
+        ]
+        seen = set(ids)
+        for (user_id, role) in base.scan(words[0].encode()):
+            if limit is not None and len(ids) >= limit:
+                break
+            if user_id in shadowed or user_id in seen:
+                continue
+            if allowed is not None and role not in allowed:
+                continue
+            if not all(user_id in matches for matches in others):
+                continue
+            seen.add(user_id)
+            ids.append(user_id)
+        return ids[:limit]
+
+    def update(self, user):
+        self._record(user.pk, user_tokens(user.first_name, user.last_name, user.username),
+                     user.user_type)
+
+    def remove(self, user_id):
+        self._record(user_id, set(), None)
+
+    def _record(self, user_id, tokens, role):
+        with self._lock:
+            self._reset_after_fork()
+            # Nothing to shadow until this process has started an index
+            if self._base is None and not self._building:
+                return
+            self._overlay[user_id] = (tokens, role, time.monotonic())
+
+    def _reset_after_fork(self):
+        # Forked workers don't inherit the build thread, start from scratch
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._base = None
+        self._overlay = {}
+        self._building = False
+        self._next_build = 0
+
+    def _build(self):
+        started = time.monotonic()
+        budget = get_setting('TYPEAHEAD_BUILD_SECONDS')
+        base = None
+        try:
+            packed = []
+            rows = CustomUser.objects.order_by().values_list(
+                'pk', 'first_name', 'last_name', 'username', 'user_type'
+            ).iterator(chunk_size=5000)
+            for (pk, first_name, last_name, username, user_type) in rows:
+                packed.extend(pack_entries(
+                    pk, user_type, user_tokens(first_name, last_name, username)
+                ))
+                if time.monotonic() - started > budget:
+                    logger.warning('Typeahead index build exceeded %s seconds, aborted', budget)
+                    return
+            base = PrefixArrays(packed)
+        except Exception:
+            logger.exception('Could not build the typeahead index')
+        finally:
+            with self._lock:
+                self._building = False
+                self._next_build = time.monotonic() + get_setting('TYPEAHEAD_MAX_AGE_SECONDS')
+                if base is not None:
+                    self._base = base
+                    # Changes recorded before the snapshot was read are in it
+                    self._overlay = {
+                        user_id: entry
+                        for (user_id, entry) in self._overlay.items()
+                        if entry[2] >= started
+                    }
+            close_old_connections()
+
+
+typeahead_index = TypeaheadIndex()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.application.logic.archive_users import archive_inactive_users
+
+
+class Command(BaseCommand):
+    help = 'Moves users inactive past the configured threshold to the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--pause', type=float, help='Seconds to sleep between chunks.')
+
+    def handle(self, *args, **options):
+        total = archive_inactive_users(chunk_size=options['chunk_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'{total} users archived.'))
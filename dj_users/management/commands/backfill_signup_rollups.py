@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.application.logic.signup_rollups import backfill_signup_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the signup rollups from the first registered user until now.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        total = backfill_signup_rollups(chunk_days=options['chunk_days'])
+        self.stdout.write(self.style.SUCCESS(f'{total} signup rollup rows written.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.application.logic.duplicate_patients import find_duplicate_patients
+
+
+class Command(BaseCommand):
+    help = 'Finds probable duplicate patients and stores them for review.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-index and compare every patient instead of the new ones only.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        run = find_duplicate_patients(full=options['full'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.users_scanned} patients scanned, {run.candidates_found} candidate pairs.'
+        ))
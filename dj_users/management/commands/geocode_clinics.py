@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.infrastructure.geocoding import get_geocoder
+from dj_users.infrastructure.models import Clinic
+
+
+class Command(BaseCommand):
+    help = 'Fills Clinic latitude/longitude from their address with the configured geocoder.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Geocode every clinic, not only the ones without coordinates.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        geocoder = get_geocoder()
+        queryset = Clinic.objects.exclude(address='')
+        if not options['all']:
+            queryset = queryset.filter(latitude__isnull=True)
+
+        last_pk, found, missing = 0, 0, 0
+        while True:
+            clinics = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:options['chunk_size']])
+            if not clinics:
+                break
+            for clinic in clinics:
+                location = geocoder.geocode(clinic.address)
+                if location is None:
+                    missing += 1
+                    continue
+                (clinic.latitude, clinic.longitude) = location
+                # save() keeps the geohash and the signals in sync
+                clinic.save(update_fields=['latitude', 'longitude', 'geohash', 'updated_at'])
+                found += 1
+            last_pk = clinics[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f'{found} clinics geocoded, {missing} not found.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.application.domain.retention import RetentionMode
+from dj_users.application.logic.retention import purge_terminated_users
+
+
+class Command(BaseCommand):
+    help = 'Anonymizes or deletes users TERMINATED for longer than the retention grace period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=RetentionMode.values)
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--pause', type=float, help='Seconds to sleep between chunks.')
+
+    def handle(self, *args, **options):
+        result = purge_terminated_users(
+            mode=options['mode'],
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['anonymized']} users anonymized, {result['deleted']} deleted."
+        ))
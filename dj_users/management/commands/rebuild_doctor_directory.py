@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dj_users.application.logic.doctor_directory import rebuild_doctor_directory
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the public doctor directory read table from DoctorProfile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_doctor_directory(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} doctor profiles synced.'))
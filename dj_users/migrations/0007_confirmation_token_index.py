@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 10:00
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def backfill_token_created_at(apps, schema_editor):
+    # AddField stamps every existing row with the migration time, which would
+    # give old unconfirmed tokens a fresh expiry window
+    CustomUser = apps.get_model("dj_users", "CustomUser")
+    CustomUser.objects.update(confirmation_token_created_at=models.F("date_joined"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0006_doctor_profile"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customuser",
+            name="confirmation_token",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="confirmation_token_created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_token_created_at, migrations.RunPython.noop),
+    ]
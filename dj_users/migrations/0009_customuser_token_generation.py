@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0008_confirmation_email_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="token_generation",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0009_customuser_token_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SignupRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("hour", "Hora"), ("day", "Día")], max_length=5
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                (
+                    "user_type",
+                    models.CharField(
+                        choices=[
+                            ("patient", "Paciente"),
+                            ("doctor", "Médico"),
+                            ("nurse", "Enfermero/a"),
+                            ("admin", "Administrador"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Resumen de registros",
+                "verbose_name_plural": "Resúmenes de registros",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("granularity", "bucket_start", "user_type"),
+                        name="dj_users_signup_rollup_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 5.2 on 2026-10-19 12:00
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SPACES = re.compile(r"\s+")
+
+
+# Frozen copy of `dj_users.application.utils.text.normalize_text` as of this
+# migration, so later changes to the directory keys don't change the backfill
+def normalize_text(value):
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return SPACES.sub(" ", value).strip().lower()
+
+
+def populate_directory(apps, schema_editor):
+    DoctorProfile = apps.get_model("dj_users", "DoctorProfile")
+    DoctorDirectoryEntry = apps.get_model("dj_users", "DoctorDirectoryEntry")
+
+    last_pk = 0
+    while True:
+        profiles = list(
+            DoctorProfile.objects.filter(
+                pk__gt=last_pk,
+                verificated=True,
+                universal_state="active",
+                user__is_active=True,
+                user__universal_state="active",
+            )
+            .select_related("user", "clinic")
+            .order_by("pk")[:1000]
+        )
+        if not profiles:
+            return
+
+        entries = []
+        for profile in profiles:
+            user = profile.user
+            first_name_key = normalize_text(user.first_name)
+            last_name_key = normalize_text(user.last_name)
+            full_name = f"{user.first_name} {user.last_name}".strip()
+            entries.append(
+                DoctorDirectoryEntry(
+                    doctor_id=profile.pk,
+                    full_name=full_name or user.username,
+                    first_name_key=first_name_key,
+                    last_name_key=last_name_key,
+                    sort_key=f"{last_name_key} {first_name_key}".strip(),
+                    specialty_id=profile.specialty_id,
+                    clinic_id=profile.clinic_id,
+                    clinic_name=profile.clinic.name if profile.clinic else "",
+                    image=user.image.name if user.image else "",
+                    agenda_token=user.agenda_token,
+                )
+            )
+        DoctorDirectoryEntry.objects.bulk_create(entries)
+        last_pk = profiles[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_catalogs", "0001_initial"),
+        ("dj_users", "0010_signup_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DoctorDirectoryEntry",
+            fields=[
+                (
+                    "doctor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="directory_entry",
+                        serialize=False,
+                        to="dj_users.doctorprofile",
+                    ),
+                ),
+                ("full_name", models.CharField(max_length=301)),
+                ("first_name_key", models.CharField(db_index=True, max_length=150)),
+                ("last_name_key", models.CharField(db_index=True, max_length=150)),
+                ("sort_key", models.CharField(db_index=True, max_length=301)),
+                ("clinic_name", models.CharField(blank=True, max_length=100)),
+                ("image", models.CharField(blank=True, max_length=100)),
+                ("agenda_token", models.UUIDField()),
+                (
+                    "clinic",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="dj_users.clinic",
+                    ),
+                ),
+                (
+                    "specialty",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="dj_catalogs.specialty",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Entrada del directorio de médicos",
+                "verbose_name_plural": "Directorio de médicos",
+                "indexes": [
+                    models.Index(
+                        fields=["sort_key", "doctor"], name="dj_users_dirent_sort_idx"
+                    ),
+                    models.Index(
+                        fields=["specialty", "sort_key", "doctor"],
+                        name="dj_users_dirent_spec_idx",
+                    ),
+                    models.Index(
+                        fields=["clinic", "sort_key", "doctor"],
+                        name="dj_users_dirent_clinic_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_directory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2 on 2026-10-19 14:00
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+SPACES = re.compile(r"\s+")
+SERVICE_SEPARATORS = re.compile(r"[,;\n\r|/]+")
+
+
+# Frozen copy of `dj_users.application.utils.text.split_services` as of this
+# migration, so later changes to the parser don't change what it backfills
+def split_services(text):
+    services = {}
+    for chunk in SERVICE_SEPARATORS.split(text or ""):
+        name = SPACES.sub(" ", chunk).strip(" .-")
+        value = unicodedata.normalize("NFKD", name)
+        value = "".join(char for char in value if not unicodedata.combining(char))
+        slug = slugify(SPACES.sub(" ", value).strip().lower())[:100]
+        if slug and slug not in services:
+            services[slug] = name[:100]
+    return services
+
+
+def populate_services(apps, schema_editor):
+    NurseProfile = apps.get_model("dj_users", "NurseProfile")
+    NurseService = apps.get_model("dj_users", "NurseService")
+    Through = NurseProfile.services.through
+
+    catalog = {}
+    last_pk = 0
+    while True:
+        profiles = list(
+            NurseProfile.objects.filter(pk__gt=last_pk)
+            .exclude(available_services="")
+            .order_by("pk")
+            .values_list("pk", "available_services")[:1000]
+        )
+        if not profiles:
+            return
+
+        parsed = [(pk, split_services(text)) for (pk, text) in profiles]
+        new = {}
+        for (_, services) in parsed:
+            for (slug, name) in services.items():
+                if slug not in catalog:
+                    new.setdefault(slug, name)
+        if new:
+            NurseService.objects.bulk_create(
+                [NurseService(slug=slug, name=name) for (slug, name) in new.items()],
+                ignore_conflicts=True,
+            )
+            catalog.update(
+                NurseService.objects.filter(slug__in=new).values_list("slug", "pk")
+            )
+
+        Through.objects.bulk_create(
+            [
+                Through(nurseprofile_id=pk, nurseservice_id=catalog[slug])
+                for (pk, services) in parsed
+                for slug in services
+            ],
+            ignore_conflicts=True,
+        )
+        last_pk = profiles[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0012_clinic_location"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NurseService",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("slug", models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                "verbose_name": "Servicio de enfermería",
+                "verbose_name_plural": "Servicios de enfermería",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="nurseprofile",
+            name="services",
+            field=models.ManyToManyField(
+                blank=True, related_name="nurses", to="dj_users.nurseservice"
+            ),
+        ),
+        migrations.RunPython(populate_services, migrations.RunPython.noop),
+    ]
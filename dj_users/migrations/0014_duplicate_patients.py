@@ -0,0 +1,137 @@
+# Generated by Django 5.2 on 2026-10-19 14:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0013_nurse_services"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DuplicateScanRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("full", models.BooleanField(default=False)),
+                ("started_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("last_user_id", models.PositiveBigIntegerField(default=0)),
+                ("users_scanned", models.PositiveIntegerField(default=0)),
+                ("candidates_found", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Búsqueda de duplicados",
+                "verbose_name_plural": "Búsquedas de duplicados",
+            },
+        ),
+        migrations.CreateModel(
+            name="PatientBlockingKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Clave de agrupación de paciente",
+                "verbose_name_plural": "Claves de agrupación de pacientes",
+                "indexes": [
+                    models.Index(
+                        fields=["key", "user"], name="dj_users_blockkey_key_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "key"), name="dj_users_blockkey_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cluster", models.PositiveBigIntegerField(db_index=True)),
+                ("score", models.FloatField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("confirmed", "Confirmado"),
+                            ("dismissed", "Descartado"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("reviewed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "duplicate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duplicate_candidates",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Posible paciente duplicado",
+                "verbose_name_plural": "Posibles pacientes duplicados",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "cluster"], name="dj_users_duplicate_review_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "duplicate"), name="dj_users_duplicate_pair_unique"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0014_duplicate_patients"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="anonymized_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
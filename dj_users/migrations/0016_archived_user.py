@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-19 15:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0015_customuser_anonymized_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedUser",
+            fields=[
+                ("user_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("username", models.CharField(max_length=150, unique=True)),
+                ("email", models.EmailField(max_length=254, unique=True)),
+                ("agenda_token", models.UUIDField(unique=True)),
+                (
+                    "user_type",
+                    models.CharField(
+                        choices=[
+                            ("patient", "Paciente"),
+                            ("doctor", "Médico"),
+                            ("nurse", "Enfermero/a"),
+                            ("admin", "Administrador"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("last_login", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("data", models.JSONField()),
+            ],
+            options={
+                "verbose_name": "Usuario archivado",
+                "verbose_name_plural": "Usuarios archivados",
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-19 16:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0016_archived_user"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "entity",
+                    models.CharField(
+                        choices=[
+                            ("user", "Usuario"),
+                            ("doctor_profile", "Perfil de médico"),
+                            ("patient_profile", "Perfil de paciente"),
+                            ("nurse_profile", "Perfil de enfermería"),
+                            ("clinic", "Clínica"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("entity_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Creado"),
+                            ("updated", "Actualizado"),
+                            ("deleted", "Eliminado"),
+                            ("state_changed", "Cambio de estado"),
+                            ("password_changed", "Cambio de contraseña"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("fields", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("relayed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Evento de cambio",
+                "verbose_name_plural": "Eventos de cambio",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("relayed_at__isnull", True)),
+                        fields=["id"],
+                        name="dj_users_change_pending_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="dj_users_change_created_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
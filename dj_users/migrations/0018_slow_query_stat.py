@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-19 17:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0017_change_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQueryStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=32)),
+                ("origin", models.CharField(max_length=200)),
+                ("normalized_sql", models.TextField()),
+                ("plan", models.TextField(blank=True)),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("p50_ms", models.FloatField(default=0)),
+                ("p95_ms", models.FloatField(default=0)),
+                ("p99_ms", models.FloatField(default=0)),
+                ("histogram", models.JSONField(default=list)),
+                ("first_seen", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_seen", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name": "Consulta lenta",
+                "verbose_name_plural": "Consultas lentas",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("fingerprint", "origin"),
+                        name="dj_users_slow_query_unique",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dj_users", "0018_slow_query_stat"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["updated_at"], name="dj_users_user_updated_idx"),
+        ),
+    ]
@@ -4,6 +4,16 @@ from dj_users.infrastructure.models import (
     DoctorProfile,
     PatientProfile,
     NurseProfile, 
-    Clinic
+    NurseService,
+    Clinic,
+    ConfirmationEmail,
+    SignupRollup,
+    DoctorDirectoryEntry,
+    PatientBlockingKey,
+    DuplicateCandidate,
+    DuplicateScanRun,
+    ArchivedUser,
+    ChangeEvent,
+    SlowQueryStat,
 )
 
@@ -0,0 +1,133 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.slow_queries import current_origin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'application/json',
+    'text/',
+)
+
+
+def _parse_accept_encoding(header: str) -> dict:
+    """Returns a `{coding: q}` map from an Accept-Encoding header."""
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(header: str):
+    """Picks `br` or `gzip` from the Accept-Encoding header, preferring brotli."""
+    codings = _parse_accept_encoding(header or '')
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    wildcard = codings.get('*', 0.0)
+
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = codings.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _view_class(view_func):
+    return getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Content-negotiated gzip/brotli compression for JSON and text responses
+    larger than `DJ_USERS_COMPRESSION_MIN_SIZE` bytes. Brotli is used when the
+    optional `brotli` package is installed and the client accepts it; gzip is
+    left to Django's `GZipMiddleware`, which pads the output with random
+    bytes against BREACH.
+
+    Responses carrying secrets are never compressed: those setting cookies
+    and those of views with `compress_response = False` (the token views).
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._dj_users_compress = getattr(_view_class(view_func), 'compress_response', True)
+
+    def process_response(self, request, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if response.cookies or not getattr(request, '_dj_users_compress', True):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+        if len(response.content) < get_setting('COMPRESSION_MIN_SIZE'):
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding == 'gzip':
+            return super().process_response(request, response)
+        if encoding != 'br':
+            return response
+
+        compressed = brotli.compress(
+            response.content,
+            quality=get_setting('COMPRESSION_BROTLI_QUALITY'),
+        )
+        # Return the compressed content only if it's actually shorter.
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # The body changed, so a strong ETag is no longer valid for it.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+
+        return response
+
+
+def view_origin(view_func, method: str):
+    """`<view>.<action>` of a `dj_users` view, None for views of other apps."""
+    if not getattr(view_func, '__module__', '').startswith('dj_users.'):
+        return None
+    view_class = _view_class(view_func)
+    if view_class is None:
+        return view_func.__name__
+    # ViewSet routes map the HTTP method to an action
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{view_class.__name__}.{actions.get(method.lower(), method.lower())}'
+
+
+class SlowQueryMiddleware(MiddlewareMixin):
+    """
+    Marks the queries run while serving a `dj_users` view with its origin,
+    so `infrastructure.slow_queries` records the slow ones.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_origin.set(view_origin(view_func, request.method))
+
+    def process_response(self, request, response):
+        current_origin.set(None)
+        return response
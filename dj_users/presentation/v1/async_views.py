@@ -0,0 +1,261 @@
+"""
+Async variants of the self-service endpoints for ASGI deployments.
+
+Plain Django async views instead of DRF views (DRF dispatches synchronously):
+authentication, reads and ETags run on the event loop with the async ORM, so
+a request waiting on the database doesn't hold a thread. Writes go through
+the same serializers and logic as the sync views, offloaded with
+`sync_to_async`, and password hashing runs in the thread pool.
+"""
+import io
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    NotAuthenticated,
+    NotFound,
+    UnsupportedMediaType,
+    ValidationError,
+)
+
+from dj_users.application.constants.messages.response_messages import ResponseMessages
+from dj_users.application.constants.messages.validation_messages import ValidationMessages
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.logic.archive_users import restore_archived_user
+from dj_users.application.logic.change_events import record_change
+from dj_users.application.logic.change_password import save_user_password
+from dj_users.application.logic.update_user import update_user
+from dj_users.infrastructure.models import CustomUser, DoctorProfile
+
+from .authentication import GenerationJWTAuthentication
+from .mixins import (
+    compute_etag,
+    etag_matches,
+    parse_field_list,
+    precondition_holds,
+    sparse_variant,
+    trim_queryset,
+)
+from .renderers import FastJSONParser, FastJSONRenderer
+from .serializers import (
+    AsyncChangePasswordSerializer,
+    PublicDoctorProfileSerializer,
+    UserSerializer,
+    UserUpdateSerializer,
+)
+from .viewsets import ProfileViewSet
+
+# ======================================================================
+# Helpers
+# ======================================================================
+
+
+def json_response(data, status_code=status.HTTP_200_OK, etag=None, headers=None):
+    response = HttpResponse(
+        FastJSONRenderer().render(data),
+        content_type='application/json',
+        status=status_code,
+        headers=headers,
+    )
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+def api_view(*methods, authenticated=True):
+    """
+    Restricts the view to `methods`, authenticates with the access token when
+    `authenticated` and turns DRF `APIException`s into JSON responses.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @require_http_methods(methods)
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if authenticated:
+                    result = await GenerationJWTAuthentication().aauthenticate(request)
+                    if result is None:
+                        raise NotAuthenticated()
+                    (request.user, request.auth) = result
+                return await view(request, *args, **kwargs)
+            except APIException as error:
+                headers = None
+                if error.status_code == status.HTTP_401_UNAUTHORIZED:
+                    headers = {'WWW-Authenticate': 'Bearer realm="api"'}
+                detail = error.detail
+                if not isinstance(detail, (dict, list)):
+                    detail = {'detail': detail}
+                return json_response(detail, error.status_code, headers=headers)
+        return wrapper
+    return decorator
+
+
+def sparse_context(request) -> dict:
+    context = {'request': request}
+    fields = parse_field_list(request.GET.get('fields'))
+    omit = parse_field_list(request.GET.get('omit'))
+    if fields:
+        context['sparse_fields'] = fields
+    if omit:
+        context['sparse_omit'] = omit
+    return context
+
+
+def parse_body(request) -> dict:
+    """JSON request body; multipart uploads must use the sync endpoints."""
+    if request.content_type != 'application/json':
+        raise UnsupportedMediaType(request.content_type)
+    return FastJSONParser().parse(io.BytesIO(request.body)) or {}
+
+
+async def render_instance(request, queryset, serializer_class, required_fields=('updated_at',)):
+    """
+    Loads the single row of `queryset` trimmed to the requested sparse
+    fieldset and answers it with an ETag, or 304 when `If-None-Match`
+    matches. Serializing doesn't query: relations are selected and
+    prefetched upfront.
+    """
+    context = sparse_context(request)
+    serializer = serializer_class(context=context)
+    instance = await trim_queryset(queryset, serializer, required_fields).afirst()
+    if instance is None:
+        raise NotFound()
+
+    etag = compute_etag(instance, sparse_variant(request.GET))
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return json_response(serializer_class(instance, context=context).data, etag=etag)
+
+
+def precondition_failed():
+    return json_response(
+        {'detail': ResponseMessages.Concurrency.PRECONDITION_FAILED},
+        status.HTTP_412_PRECONDITION_FAILED,
+    )
+
+
+# ======================================================================
+# Views
+# ======================================================================
+
+
+@api_view('GET', 'PATCH')
+async def my_user(request):
+    """Async `user/me/`"""
+    if request.method == 'PATCH':
+        return await sync_to_async(_update_my_user)(request)
+    return await render_instance(
+        request,
+        CustomUser.objects.filter(pk=request.user.pk),
+        UserSerializer,
+    )
+
+
+def _update_my_user(request):
+    user = request.user
+    serializer = UserUpdateSerializer(
+        user, data=parse_body(request), partial=True, context={'request': request}
+    )
+    serializer.is_valid(raise_exception=True)
+
+    header = request.headers.get('If-Match')
+    with transaction.atomic():
+        if header and not precondition_holds(user, header):
+            return precondition_failed()
+        updated_user = update_user(user=user, data=serializer.validated_data)
+    data = UserUpdateSerializer(updated_user, context={'request': request}).data
+    return json_response(data, etag=compute_etag(updated_user))
+
+
+@api_view('GET')
+async def my_data(request):
+    """Async `user/my_data/`"""
+    return await render_instance(
+        request,
+        CustomUser.objects.filter(pk=request.user.pk),
+        UserSerializer,
+    )
+
+
+@api_view('POST')
+async def change_password(request):
+    """
+    Async `user/change-password/`. Checking the old password and hashing the
+    new one are CPU bound, so both run in the thread pool instead of blocking
+    the event loop; only the save goes through the sync logic.
+    """
+    user = request.user
+    serializer = AsyncChangePasswordSerializer(
+        data=parse_body(request), context={'request': request}
+    )
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    # `acheck_password` verifies in the thread pool
+    if not await user.acheck_password(data['old_password']):
+        raise ValidationError({
+            'old_password': [ValidationMessages.Password.CURRENT_PASSWORD_INCORRECT]
+        })
+
+    user.password = await sync_to_async(make_password, thread_sensitive=False)(
+        data['new_password']
+    )
+    # Lets `save()` notify the password validators, like `set_password`
+    user._password = data['new_password']
+    await sync_to_async(save_user_password)(user)
+    return json_response({'detail': ResponseMessages.User.PASSWORD_UPDATE_SUCCESSFULLY})
+
+
+@api_view('GET', 'PATCH')
+async def my_profile(request):
+    """Async `profile/me/`"""
+    user = request.user
+    if user.user_type == UserRole.ADMIN:
+        serializer_class = UserUpdateSerializer
+        queryset = CustomUser.objects.filter(pk=user.pk)
+    else:
+        (model, serializer_class) = ProfileViewSet.role_map[user.user_type]
+        queryset = model.objects.filter(user=user)
+
+    if request.method == 'PATCH':
+        return await sync_to_async(_update_my_profile)(request, queryset, serializer_class)
+    return await render_instance(request, queryset, serializer_class)
+
+
+def _update_my_profile(request, queryset, serializer_class):
+    instance = queryset.first()
+    serializer = serializer_class(
+        instance, data=parse_body(request), partial=True, context={'request': request}
+    )
+    serializer.is_valid(raise_exception=True)
+
+    header = request.headers.get('If-Match')
+    with transaction.atomic():
+        if header and not precondition_holds(instance, header):
+            return precondition_failed()
+        serializer.save()
+        record_change(serializer.instance, ChangeAction.UPDATED, serializer.validated_data)
+    return json_response(serializer.data, etag=compute_etag(serializer.instance))
+
+
+@api_view('GET', authenticated=False)
+async def doctor_agenda(request, token):
+    """Async `doctors/agenda/<token>/`"""
+    queryset = DoctorProfile.objects.filter(user__agenda_token=token)
+    try:
+        return await render_instance(request, queryset, PublicDoctorProfileSerializer)
+    except NotFound:
+        if await sync_to_async(restore_archived_user)(agenda_token=token) is None:
+            raise
+    return await render_instance(request, queryset, PublicDoctorProfileSerializer)
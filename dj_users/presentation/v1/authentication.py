@@ -0,0 +1,99 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.backends import ModelBackend
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from dj_users.application.constants.messages.validation_messages import ValidationMessages
+from dj_users.application.logic.archive_users import (
+    get_archived_password,
+    restore_archived_user,
+)
+
+
+class ArchiveRestoringBackend(ModelBackend):
+    """
+    `ModelBackend` that also logs in archived users. The password is checked
+    against the archived row first, so only a successful login restores it.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None or UserModel._default_manager.filter(
+            **{UserModel.USERNAME_FIELD: username}
+        ).exists():
+            return super().authenticate(request, username=username, password=password, **kwargs)
+
+        encoded = get_archived_password(username=username)
+        if encoded is None:
+            # Unknown user, `ModelBackend` still runs the hasher once
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        if not check_password(password, encoded):
+            return None
+
+        user = restore_archived_user(username=username)
+        if user is None:
+            # Restored by a concurrent request meanwhile
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        return user if self.user_can_authenticate(user) else None
+
+
+class GenerationJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` that also rejects access tokens issued before the
+    user's last revocation (password change, FROZEN/TERMINATED state). The
+    user row is loaded anyway, so the check costs no extra query. Users
+    archived since the token was issued are restored.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user = super().get_user(validated_token)
+        except AuthenticationFailed as error:
+            # The user may have been archived after the token was issued
+            user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+            if error.get_codes() != 'user_not_found' or user_id is None:
+                raise
+            if restore_archived_user(user_id=user_id) is None:
+                raise
+            user = super().get_user(validated_token)
+        self.check_generation(user, validated_token)
+        return user
+
+    def check_generation(self, user, validated_token):
+        generation = validated_token.get('gen')
+        if generation is not None and generation != user.token_generation:
+            raise AuthenticationFailed(ValidationMessages.Auth.TOKEN_REVOKED, code='token_revoked')
+
+    async def aauthenticate(self, request):
+        """
+        Async `authenticate` for plain Django async views. The user row is
+        loaded with the async ORM; only a miss (archived user, error
+        reporting) goes through the sync `get_user` in a thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(ValidationMessages.Auth.TOKEN_WITHOUT_USER)
+        user = await self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).afirst()
+        if user is None:
+            return (await sync_to_async(self.get_user)(validated_token), validated_token)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(ValidationMessages.Auth.USER_INACTIVE, code='user_inactive')
+        self.check_generation(user, validated_token)
+        return (user, validated_token)
@@ -0,0 +1,339 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from dj_users.application.constants.messages.response_messages import ResponseMessages
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.request_profiler import RequestProfile, check_profiling_token
+
+
+# ======================================================================
+# Sparse fieldsets (?fields= / ?omit=)
+# ======================================================================
+
+
+def parse_field_list(raw: str) -> set:
+    """Parses a comma separated query param into a set of field names."""
+    if not raw:
+        return set()
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops serializer fields according to the `sparse_fields` / `sparse_omit`
+    sets found in the serializer context. Only the root serializer (or the
+    child of a `many=True` list) is trimmed; nested serializers are untouched.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('sparse_fields')
+        omit = self.context.get('sparse_omit')
+
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+        if omit:
+            for name in set(self.fields) & omit:
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin that reads `?fields=` and `?omit=` on safe requests, passes
+    them to the serializer and pushes the resulting selection into the
+    queryset: `.only()` on the concrete columns, `select_related` for nested
+    serializers and `prefetch_related` only for the M2M fields still present.
+    """
+    sparse_fields_param = 'fields'
+    sparse_omit_param = 'omit'
+    # Columns that must always be loaded even if no serializer field uses them
+    sparse_required_fields = ()
+    # Non-safe actions that only read (e.g. POST with a body of ids)
+    sparse_read_actions = ()
+
+    def is_sparse_read(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return False
+        return (
+            request.method in SAFE_METHODS or
+            getattr(self, 'action', None) in self.sparse_read_actions
+        )
+
+    def get_sparse_fieldset(self):
+        request = getattr(self, 'request', None)
+        if not self.is_sparse_read():
+            return set(), set()
+        return (
+            parse_field_list(request.query_params.get(self.sparse_fields_param)),
+            parse_field_list(request.query_params.get(self.sparse_omit_param)),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields, omit = self.get_sparse_fieldset()
+        if fields:
+            context['sparse_fields'] = fields
+        if omit:
+            context['sparse_omit'] = omit
+        return context
+
+    def filter_queryset(self, queryset):
+        return self.apply_sparse_fieldset(super().filter_queryset(queryset))
+
+    def apply_sparse_fieldset(self, queryset):
+        if not self.is_sparse_read():
+            return queryset
+
+        return trim_queryset(queryset, self.get_serializer(), self.sparse_required_fields)
+
+
+def trim_queryset(queryset, serializer, required_fields=()):
+    """
+    Restricts `queryset` to the columns and relations the (already trimmed)
+    `serializer` renders, plus `required_fields`.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    only, select, prefetch = set(), [], []
+    complete = _collect_columns(
+        serializer, queryset.model._meta, '', only, select, prefetch,
+        annotations=set(queryset.query.annotations),
+    )
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if complete:
+        opts = queryset.model._meta
+        only.add(opts.pk.name)
+        only.update(
+            name for name in required_fields
+            if _get_model_field(opts, name) is not None
+        )
+        queryset = queryset.only(*only)
+    return queryset
+
+
+def _get_model_field(opts, name):
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _collect_columns(serializer, opts, prefix, only, select, prefetch, annotations=()):
+    """
+    Walks the serializer fields and collects the `.only()`, `select_related`
+    and `prefetch_related` lookups they need. Returns False when a field can
+    not be mapped to a column, in which case `.only()` must not be applied.
+    """
+    complete = True
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        source = field.source
+        if not prefix and source in annotations:
+            continue
+        if source == '*' or '.' in source:
+            complete = False
+            continue
+
+        model_field = _get_model_field(opts, source)
+        if model_field is None:
+            complete = False
+            continue
+
+        lookup = f'{prefix}{source}'
+        if model_field.many_to_many and not model_field.auto_created:
+            if not isinstance(field, serializers.BaseSerializer):
+                prefetch.append(lookup)
+            continue
+        if model_field.auto_created and not model_field.concrete:
+            # Reverse relations (e.g. `doctors`) are prefetched by the view
+            continue
+
+        only.add(lookup)
+        if model_field.is_relation and isinstance(field, serializers.Serializer):
+            select.append(lookup)
+            related_opts = model_field.related_model._meta
+            only.add(f'{lookup}__{related_opts.pk.name}')
+            complete &= _collect_columns(
+                field, related_opts, f'{lookup}__', only, select, prefetch
+            )
+    return complete
+
+
+# ======================================================================
+# Conditional requests (ETag / If-None-Match / If-Match)
+# ======================================================================
+
+
+def compute_etag(instance, variant: str = ''):
+    """
+    Builds an ETag from the model label, pk and `updated_at`. `variant`
+    distinguishes representations of the same row (e.g. sparse fieldsets)
+    and is appended as a `.suffix` so `If-Match` can ignore it.
+    """
+    updated_at = getattr(instance, 'updated_at', None)
+    if instance is None or updated_at is None:
+        return None
+    raw = f'{instance._meta.label_lower}:{instance.pk}:{updated_at.isoformat()}'
+    tag = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    if variant:
+        tag = f'{tag}.{hashlib.blake2b(variant.encode(), digest_size=4).hexdigest()}'
+    return quote_etag(tag)
+
+
+def _opaque(etag: str, ignore_variant: bool = False) -> str:
+    # Weak and strong validators are compared by their opaque tag, the
+    # compression middleware turns our strong ETags into weak ones.
+    etag = etag[2:] if etag.startswith('W/') else etag
+    if ignore_variant:
+        etag = etag.strip('"').split('.', 1)[0]
+    return etag
+
+
+def etag_matches(header: str, etag: str, ignore_variant: bool = False) -> bool:
+    if not header or not etag:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or _opaque(etag, ignore_variant) in {
+        _opaque(tag, ignore_variant) for tag in etags
+    }
+
+
+def sparse_variant(params) -> str:
+    """ETag variant of a representation trimmed with `?fields=`/`?omit=`."""
+    return '&'.join(
+        f'{param}={params.get(param, "")}'
+        for param in ('fields', 'omit')
+        if param in params
+    )
+
+
+def precondition_holds(instance, header: str) -> bool:
+    """
+    True when the `If-Match` header matches `instance` and the row is still
+    the one that was loaded. Must run inside the transaction of the write:
+    the conditional UPDATE keeps the row locked until commit, so two
+    concurrent writers can't both pass.
+    """
+    if not etag_matches(header, compute_etag(instance), ignore_variant=True):
+        return False
+    return bool(type(instance)._default_manager.filter(
+        pk=instance.pk,
+        updated_at=instance.updated_at,
+    ).update(updated_at=instance.updated_at))
+
+
+class ConditionalRequestMixin:
+    """
+    ETags derived from `updated_at`: `If-None-Match` answers 304 before any
+    serialization and `If-Match` on writes answers 412 when the row changed.
+    """
+
+    def get_etag(self, instance):
+        request = self.request
+        variant = ''
+        if request.method in SAFE_METHODS:
+            variant = sparse_variant(request.query_params)
+        return compute_etag(instance, variant)
+
+    def check_not_modified(self, instance):
+        """Returns a 304 response if the client's copy is still current."""
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        etag = self.get_etag(instance)
+        if etag_matches(self.request.headers.get('If-None-Match'), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return None
+
+    def check_precondition(self, instance):
+        """
+        Returns a 412 response when `If-Match` does not match `instance`, or
+        when the row changed since `instance` was loaded. Must be called inside
+        the transaction that performs the write, see `precondition_holds`.
+        """
+        header = self.request.headers.get('If-Match')
+        if not header or precondition_holds(instance, header):
+            return None
+
+        return Response(
+            {"detail": ResponseMessages.Concurrency.PRECONDITION_FAILED},
+            status=status.HTTP_412_PRECONDITION_FAILED,
+        )
+
+    def with_etag(self, response, instance):
+        etag = self.get_etag(instance)
+        if etag:
+            response['ETag'] = etag
+        return response
+
+
+# ======================================================================
+# Per-request profiling for staff
+# ======================================================================
+
+
+class RequestProfilingMixin:
+    """
+    Profiles the request (cProfile plus SQL timings) when a staff user sends
+    the token shown in the admin in the `DJ_USERS_PROFILING_HEADER` header or
+    the `DJ_USERS_PROFILING_QUERY_PARAM` query param. The trace covers the
+    handler and serialization, not authentication or rendering, and its id
+    is returned in `X-Profile-Id`. Other requests only pay a header lookup.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self._request_profile = None
+        super().initial(request, *args, **kwargs)
+        if not get_setting('PROFILING_ENABLED'):
+            return
+        token = (
+            request.headers.get(get_setting('PROFILING_HEADER')) or
+            request.query_params.get(get_setting('PROFILING_QUERY_PARAM'))
+        )
+        if token and check_profiling_token(request.user, token):
+            self._request_profile = RequestProfile()
+            self._request_profile.start()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        profile = getattr(self, '_request_profile', None)
+        if profile is None:
+            return response
+        self._request_profile = None
+
+        query = request.query_params.copy()
+        query.pop(get_setting('PROFILING_QUERY_PARAM'), None)
+        profile_id = profile.finish(
+            user=request.user.get_username(),
+            method=request.method,
+            path=f'{request.path}?{query.urlencode()}' if query else request.path,
+            view=type(self).__name__,
+            action=getattr(self, 'action', None),
+            status=response.status_code,
+        )
+        response['X-Profile-Id'] = str(profile_id)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Unhandled exceptions skip `finalize_response`
+            profile = getattr(self, '_request_profile', None)
+            if profile is not None:
+                self._request_profile = None
+                profile.stop()
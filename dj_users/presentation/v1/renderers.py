@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.utils.functional import Promise
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _orjson_default(obj):
+    # UUIDs, dates and datetimes are handled natively by orjson
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        # As DRF's encoder: DecimalFields are already strings unless
+        # COERCE_DECIMAL_TO_STRING is False, and then they render as numbers
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed. Falls back to DRF's
+    stdlib based `JSONRenderer` when orjson is missing or an indented
+    (browsable/pretty) response is requested.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+
+
+class FastJSONParser(JSONParser):
+    """JSON parser backed by orjson, with the stdlib `JSONParser` as fallback."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -1,22 +1,43 @@
 
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from dj_users.application.constants.messages.validation_messages import ValidationMessages
+from dj_users.application.domain.change_events import ChangeEntity
 from dj_users.application.domain.roles import UserRole
+from dj_users.application.domain.stats import SeriesGranularity
+from dj_users.application.logic.archive_users import is_archived
+from dj_users.application.logic.token_revocation import get_token_generation
+from dj_users.application.utils.settings import get_setting
+from dj_users.application.utils.text import normalize_text, split_services
+from dj_users.infrastructure.last_login_buffer import last_login_buffer
 from dj_users.infrastructure.models import (
     CustomUser,
     DoctorProfile,
     PatientProfile,
     NurseProfile,
+    NurseService,
     Clinic,
+    DoctorDirectoryEntry,
 )
 
+from .mixins import SparseFieldsetSerializerMixin
+
 
 # ======================================================================
 # Base Serializers (ModelSerializers simples)
 # ======================================================================
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = [
@@ -57,7 +78,10 @@ class UserSerializer(serializers.ModelSerializer):
 
     def validate_email(self, value):
         user = self.context['request'].user
-        if CustomUser.objects.exclude(pk=user.pk).filter(email=value).exists():
+        if (
+            CustomUser.objects.exclude(pk=user.pk).filter(email=value).exists() or
+            is_archived(email=value)
+        ):
             raise serializers.ValidationError(
                 ValidationMessages.User.EMAIL_ALREADY_EXISTS
             )
@@ -65,21 +89,24 @@ class UserSerializer(serializers.ModelSerializer):
 
     def validate_username(self, value):
         user = self.context['request'].user
-        if CustomUser.objects.exclude(pk=user.pk).filter(username=value).exists():
+        if (
+            CustomUser.objects.exclude(pk=user.pk).filter(username=value).exists() or
+            is_archived(username=value)
+        ):
             raise serializers.ValidationError(
                ValidationMessages.User.USERNAME_ALREADY_EXISTS
             )
         return value
 
 
-class ClinicSerializer(serializers.ModelSerializer):
+class ClinicSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Clinic
         fields = '__all__'
         read_only_fields = ['id']
 
 
-class DoctorProfileSerializer(serializers.ModelSerializer):
+class DoctorProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
@@ -88,14 +115,52 @@ class DoctorProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'agenda_token']
 
 
-class PatientProfileSerializer(serializers.ModelSerializer):
+class PublicUserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """What anonymous clients may see of a user: no contact or account data"""
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'first_name', 'last_name', 'image', 'user_type']
+        read_only_fields = fields
+
+
+class PublicDoctorProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Doctor profile for anonymous endpoints (the agenda link). The agenda
+    token is published in the directory, so it must not unlock more than it.
+    """
+    user = PublicUserSerializer(read_only=True)
+
+    class Meta:
+        model = DoctorProfile
+        fields = ['id', 'user', 'specialty', 'clinic', 'verificated']
+        read_only_fields = fields
+
+
+class ClinicRosterSerializer(ClinicSerializer):
+    """`ClinicSerializer` plus the annotated headcount and the doctor roster"""
+    doctor_count = serializers.IntegerField(read_only=True)
+    doctors = DoctorProfileSerializer(many=True, read_only=True)
+
+    class Meta(ClinicSerializer.Meta):
+        pass
+
+
+class ClinicRosterQuerySerializer(serializers.Serializer):
+    min_doctors = serializers.IntegerField(min_value=0, required=False)
+    max_doctors = serializers.IntegerField(min_value=0, required=False)
+
+
+class PatientProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = PatientProfile
         fields = '__all__'
         read_only_fields = ['id']
 
 
-class NurseProfileSerializer(serializers.ModelSerializer):
+class NurseProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    # Parsed from `available_services`, which stays the writable field
+    services = serializers.SlugRelatedField(many=True, read_only=True, slug_field='slug')
+
     class Meta:
         model = NurseProfile
         fields = '__all__'
@@ -106,7 +171,7 @@ class NurseProfileSerializer(serializers.ModelSerializer):
 # Input Serializers (Para escritura: create/update/patch)
 # ======================================================================
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     image = serializers.ImageField(write_only=True, required=False)
 
     class Meta:
@@ -127,8 +192,12 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ['username']
 
     def validate_email(self, value):
-        user = self.context['request'].user
-        if CustomUser.objects.exclude(pk=user.pk).filter(email=value).exists():
+        # The instance being edited may not be the requester (admin bulk update)
+        user = self.instance or self.context['request'].user
+        if (
+            CustomUser.objects.exclude(pk=user.pk).filter(email=value).exists() or
+            is_archived(email=value)
+        ):
             raise serializers.ValidationError(
                 ValidationMessages.User.EMAIL_ALREADY_EXISTS
             )
@@ -151,14 +220,20 @@ class RegisterUserSerializer(serializers.Serializer):
     birth_date = serializers.DateField(required=False)
 
     def validate_email(self, value):
-        if CustomUser.objects.filter(email=value).exists():
+        if (
+            CustomUser.objects.filter(email=value).exists() or
+            is_archived(email=value)
+        ):
             raise serializers.ValidationError(
                 ValidationMessages.User.EMAIL_ALREADY_EXISTS
             )
         return value
 
     def validate_username(self, value):
-        if CustomUser.objects.filter(username=value).exists():
+        if (
+            CustomUser.objects.filter(username=value).exists() or
+            is_archived(username=value)
+        ):
             raise serializers.ValidationError(
                 ValidationMessages.User.USERNAME_ALREADY_EXISTS
             )
@@ -186,6 +261,298 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
 
+class AsyncChangePasswordSerializer(ChangePasswordSerializer):
+    """The async view checks the old password itself, off the event loop"""
+
+    def validate_old_password(self, value):
+        return value
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['gen'] = user.token_generation
+        return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if get_setting('LAST_LOGIN_BUFFER'):
+            last_login_buffer.record(self.user.pk, timezone.now())
+        return data
+
+
+class StatelessTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    With `DJ_USERS_STATELESS_REFRESH` the refresh token is checked against the
+    user's token generation (one cache lookup) instead of the blacklist and
+    user tables, and rotation issues a new token without any DB write.
+    """
+
+    def validate(self, attrs):
+        if not get_setting('STATELESS_REFRESH'):
+            return super().validate(attrs)
+
+        refresh = RefreshToken(attrs['refresh'])
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if refresh.payload.get('gen', 0) != get_token_generation(user_id):
+            raise InvalidToken(ValidationMessages.Auth.TOKEN_REVOKED)
+
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+# ======================================================================
+# Bulk Serializers
+# ======================================================================
+
+
+class BulkRetrieveSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+    )
+    include_profile = serializers.BooleanField(default=False)
+
+    def validate_ids(self, value):
+        max_ids = get_setting('BULK_RETRIEVE_MAX_IDS')
+        if len(value) > max_ids:
+            raise serializers.ValidationError(
+                ValidationMessages.Bulk.TOO_MANY_IDS % {'max': max_ids}
+            )
+        # Keep the requested order, drop duplicates
+        return list(dict.fromkeys(value))
+
+
+class BulkUserUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    changes = serializers.DictField()
+
+
+class BulkUserChangesSerializer(UserUpdateSerializer):
+    """
+    One row of the admin bulk update: the `UserUpdateSerializer` fields
+    (without the image upload) plus `is_email_confirmed`. Keys that aren't
+    writable here are rejected instead of silently dropped.
+    """
+    image = None
+
+    class Meta(UserUpdateSerializer.Meta):
+        fields = [
+            'username', 'email', 'phone_number', 'birth_date',
+            'first_name', 'last_name', 'is_email_confirmed'
+        ]
+
+    def validate(self, attrs):
+        writable = {name for (name, field) in self.fields.items() if not field.read_only}
+        unknown = set(self.initial_data) - writable
+        if unknown:
+            raise serializers.ValidationError({
+                key: [ValidationMessages.Bulk.FIELD_NOT_UPDATABLE] for key in sorted(unknown)
+            })
+        return attrs
+
+
+class BulkUserUpdateSerializer(serializers.Serializer):
+    items = BulkUserUpdateItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        max_items = get_setting('BULK_UPDATE_MAX_ITEMS')
+        if len(value) > max_items:
+            raise serializers.ValidationError(
+                ValidationMessages.Bulk.TOO_MANY_ITEMS % {'max': max_items}
+            )
+        return value
+
+
+# ======================================================================
+# Stats Serializers
+# ======================================================================
+
+
+class SignupStatsQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    granularity = serializers.ChoiceField(
+        choices=SeriesGranularity.choices,
+        default=SeriesGranularity.DAY
+    )
+    user_type = serializers.ChoiceField(choices=UserRole.choices, required=False)
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({
+                'end': ValidationMessages.Stats.END_BEFORE_START
+            })
+        max_days = get_setting('SIGNUP_STATS_MAX_HOURLY_DAYS')
+        if (
+            attrs['granularity'] == SeriesGranularity.HOUR and
+            (attrs['end'] - attrs['start']).days >= max_days
+        ):
+            raise serializers.ValidationError({
+                'end': ValidationMessages.Stats.HOURLY_RANGE_TOO_LONG % {'max': max_days}
+            })
+        return attrs
+
+
+# ======================================================================
+# Directory Serializers
+# ======================================================================
+
+
+class DoctorDirectoryQuerySerializer(serializers.Serializer):
+    specialty = serializers.IntegerField(min_value=1, required=False)
+    clinic = serializers.IntegerField(min_value=1, required=False)
+    q = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    cursor = serializers.CharField(max_length=500, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class DoctorDirectoryEntrySerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='doctor_id', read_only=True)
+    image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DoctorDirectoryEntry
+        fields = [
+            'id',
+            'full_name',
+            'specialty',
+            'clinic',
+            'clinic_name',
+            'image',
+            'agenda_token',
+        ]
+        read_only_fields = fields
+
+    def get_image(self, obj):
+        return default_storage.url(obj.image) if obj.image else None
+
+
+class NearbyClinicsQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0, required=False)
+    k = serializers.IntegerField(min_value=1, default=10)
+
+    def validate_k(self, value):
+        return min(value, get_setting('NEARBY_CLINICS_MAX_RESULTS'))
+
+
+class NearbyClinicSerializer(serializers.ModelSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+    doctors = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Clinic
+        fields = [
+            'id',
+            'name',
+            'address',
+            'phone',
+            'latitude',
+            'longitude',
+            'distance_km',
+            'doctors',
+        ]
+        read_only_fields = fields
+
+    def get_doctors(self, obj):
+        # Only doctors listed in the public directory, with its public fields
+        return DoctorDirectoryEntrySerializer(
+            [doctor.directory_entry for doctor in obj.doctors.all()],
+            many=True
+        ).data
+
+
 # ======================================================================
 # Custom
 # ======================================================================
+
+
+class NurseSearchQuerySerializer(serializers.Serializer):
+    services = serializers.CharField(required=False, allow_blank=True)
+    after = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, default=20)
+
+    def validate_services(self, value):
+        slugs = list(split_services(value))
+        if len(slugs) > get_setting('NURSE_SEARCH_MAX_SERVICES'):
+            raise serializers.ValidationError(
+                ValidationMessages.NurseServices.TOO_MANY_SERVICES
+            )
+        return slugs
+
+    def validate_limit(self, value):
+        return min(value, get_setting('NURSE_SEARCH_MAX_RESULTS'))
+
+
+class NurseSearchEntrySerializer(serializers.ModelSerializer):
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+    services = serializers.SlugRelatedField(many=True, read_only=True, slug_field='slug')
+
+    class Meta:
+        model = NurseProfile
+        fields = ['id', 'first_name', 'last_name', 'services']
+        read_only_fields = fields
+
+
+class NurseServiceSerializer(serializers.ModelSerializer):
+    nurse_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = NurseService
+        fields = ['slug', 'name', 'nurse_count']
+        read_only_fields = fields
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=1, max_length=100)
+    limit = serializers.IntegerField(min_value=1, default=10)
+
+    def validate_q(self, value):
+        tokens = normalize_text(value).split(' ')
+        if not tokens[0]:
+            raise serializers.ValidationError(ValidationMessages.Autocomplete.EMPTY_QUERY)
+        return tokens
+
+    def validate_limit(self, value):
+        return min(value, get_setting('AUTOCOMPLETE_MAX_RESULTS'))
+
+
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'username', 'first_name', 'last_name', 'user_type']
+        read_only_fields = fields
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=150, required=False)
+    email = serializers.EmailField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(ValidationMessages.Availability.MISSING_VALUE)
+        return attrs
+
+
+class ChangeFeedQuerySerializer(serializers.Serializer):
+    after = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, default=100)
+    entity = serializers.CharField(required=False)
+
+    def validate_entity(self, value):
+        entities = {name.strip() for name in value.split(',') if name.strip()}
+        if not entities <= set(ChangeEntity.values):
+            raise serializers.ValidationError(ValidationMessages.ChangeFeed.INVALID_ENTITY)
+        return entities
+
+    def validate_limit(self, value):
+        return min(value, get_setting('CHANGE_FEED_MAX_RESULTS'))
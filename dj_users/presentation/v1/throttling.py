@@ -0,0 +1,18 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+from dj_users.application.utils.settings import get_setting
+
+
+class AvailabilityThrottle(SimpleRateThrottle):
+    """
+    Per-user limit for the availability endpoint, which is hit on every
+    keystroke. Counted in the default cache, so the limit holds across
+    workers.
+    """
+    scope = 'dj_users_availability'
+
+    def get_rate(self):
+        return f"{get_setting('AVAILABILITY_THROTTLE_PER_MINUTE')}/min"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
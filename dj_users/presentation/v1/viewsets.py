@@ -4,39 +4,100 @@
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import filters, status, viewsets
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
-from rest_framework.generics import get_object_or_404
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView
-from django.db.models import Q
-
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Prefetch, Q
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.email_confirmation import EmailConfirmationStatus
 from dj_users.application.domain.roles import UserRole
 
+from dj_users.application.logic.archive_users import is_archived, restore_archived_user
+from dj_users.application.logic.bulk_update_users import bulk_update_users
+from dj_users.application.logic.change_events import get_change_feed, record_change
 from dj_users.application.logic.change_password import change_user_password
+from dj_users.application.logic.confirm_email import (
+    confirm_email,
+    get_confirmation_status,
+    rotate_confirmation_token,
+)
+from dj_users.application.logic.doctor_directory import (
+    InvalidCursor,
+    get_directory_version,
+    search_doctor_directory,
+)
+from dj_users.application.logic.nearby_clinics import find_nearby_clinics
+from dj_users.application.logic.nurse_services import find_nurses_by_services
 from dj_users.application.logic.register_user import register_user
+from dj_users.application.logic.signup_rollups import get_signup_series
 from dj_users.application.logic.update_user import update_user
 
 from dj_users.application.constants.messages.response_messages import ResponseMessages
+from dj_users.application.constants.messages.validation_messages import ValidationMessages
+from dj_users.application.utils.settings import get_setting
+from dj_users.infrastructure.availability import availability_filter
+from dj_users.infrastructure.login_throttle import login_throttle
+from dj_users.infrastructure.typeahead import typeahead_index
 from dj_users.infrastructure.models import (
     CustomUser,
     DoctorProfile,
     PatientProfile,
     NurseProfile,
+    NurseService,
     Clinic
 )
 
+from .mixins import (
+    ConditionalRequestMixin,
+    RequestProfilingMixin,
+    SparseFieldsetMixin,
+    parse_field_list,
+)
 from .serializers import (
     ClinicSerializer,
     UserSerializer,
     DoctorProfileSerializer,
+    PublicDoctorProfileSerializer,
     PatientProfileSerializer,
     NurseProfileSerializer,
     ChangePasswordSerializer,
     RegisterUserSerializer,
     UserUpdateSerializer,
+    BulkRetrieveSerializer,
+    BulkUserChangesSerializer,
+    BulkUserUpdateSerializer,
+    UserTokenObtainPairSerializer,
+    StatelessTokenRefreshSerializer,
+    SignupStatsQuerySerializer,
+    DoctorDirectoryQuerySerializer,
+    DoctorDirectoryEntrySerializer,
+    ClinicRosterSerializer,
+    ClinicRosterQuerySerializer,
+    NearbyClinicsQuerySerializer,
+    NearbyClinicSerializer,
+    NurseSearchQuerySerializer,
+    NurseSearchEntrySerializer,
+    NurseServiceSerializer,
+    AutocompleteQuerySerializer,
+    UserAutocompleteSerializer,
+    AvailabilityQuerySerializer,
+    ChangeFeedQuerySerializer,
 )
+from .authentication import GenerationJWTAuthentication
+from .throttling import AvailabilityThrottle
 
 from dj_core_utils.presentation.mixins import (
     ActionSerializerMixin,
@@ -45,18 +106,27 @@ from dj_core_utils.presentation.mixins import (
 )
 from dj_core_utils.db.mixins import UniversalState
 
+# Access tokens are checked against the user's token generation and users
+# archived since they were issued are restored; sessions serve the browsable
+# API. Set explicitly so it doesn't depend on the project's defaults.
+AUTHENTICATION_CLASSES = [GenerationJWTAuthentication, SessionAuthentication]
+
 # ======================================================================
 # UserViewSet - authenticated user management
 # ======================================================================
 
 
 class UserViewSet(
+    RequestProfilingMixin,
+    ConditionalRequestMixin,
+    SparseFieldsetMixin,
     ActionSerializerMixin,
     UniversalStateQuerysetMixin,
     UniversalStateSoftDeleteMixin,
     viewsets.ModelViewSet
 ):
     permission_classes = [IsAuthenticated]
+    authentication_classes = AUTHENTICATION_CLASSES
     queryset = CustomUser.objects.all()
     http_method_names = ['get', 'patch', 'post', 'head', 'options']
     
@@ -68,6 +138,19 @@ class UserViewSet(
     ordering = ['-date_joined']
 
     serializer_class = UserSerializer
+    sparse_read_actions = ('bulk_retrieve',)
+    # `user_type` picks the embedded profile in `bulk_retrieve`
+    sparse_required_fields = ('user_type',)
+    # Roles allowed to autocomplete and the roles they can find (None: all)
+    autocomplete_roles = {
+        UserRole.ADMIN: None,
+        UserRole.DOCTOR: (UserRole.PATIENT, UserRole.DOCTOR),
+    }
+    # Roles allowed to read the signup stats and the roles they see (None: all)
+    signup_stats_roles = {
+        UserRole.ADMIN: None,
+        UserRole.DOCTOR: (UserRole.PATIENT, UserRole.DOCTOR),
+    }
 
     action_serializer_classes = {
         'partial_update': UserUpdateSerializer,
@@ -82,6 +165,10 @@ class UserViewSet(
             'get': UserSerializer,
             'patch': UserUpdateSerializer,
         },
+        'bulk_retrieve': {
+            'get': UserSerializer,
+            'post': UserSerializer,
+        },
     }
 
     def get_queryset(self):
@@ -104,7 +191,7 @@ class UserViewSet(
         # For detail views, return the requested object if user has permission
         if hasattr(self, 'kwargs') and 'pk' in self.kwargs:
             pk = self.kwargs['pk']
-            return self.get_queryset().get(pk=pk)
+            return self.apply_sparse_fieldset(self.get_queryset()).get(pk=pk)
         return self.request.user
 
     def partial_update(self, request, *args, **kwargs):
@@ -152,30 +239,226 @@ class UserViewSet(
             status=status.HTTP_200_OK
         )
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='resend-confirmation',
+        url_name='resend_confirmation'
+    )
+    def resend_confirmation(self, request):
+        """Issue a new email confirmation token for the current user"""
+        if request.user.is_email_confirmed:
+            return Response(
+                {"detail": ResponseMessages.EmailConfirmation.ALREADY_CONFIRMED},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rotate_confirmation_token(request.user)
+        return Response(
+            {"detail": ResponseMessages.EmailConfirmation.CONFIRMATION_SENT},
+            status=status.HTTP_200_OK
+        )
+
     @action(detail=False, methods=['get', 'patch'], url_path='me', url_name='my_user')
     def my_user(self, request):
         instance = self.get_object()
 
         if request.method == 'GET':
+            not_modified = self.check_not_modified(instance)
+            if not_modified:
+                return not_modified
+
             serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            return self.with_etag(Response(serializer.data), instance)
 
         elif request.method == 'PATCH':
             serializer = self.get_serializer(instance, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
 
-            updated_user = update_user(
-                user=self.request.user,
-                data=serializer.validated_data
+            with transaction.atomic():
+                precondition_failed = self.check_precondition(instance)
+                if precondition_failed:
+                    return precondition_failed
+
+                updated_user = update_user(
+                    user=self.request.user,
+                    data=serializer.validated_data
+                )
+            return self.with_etag(
+                Response(self.get_serializer(updated_user).data),
+                updated_user
             )
-            return Response(self.get_serializer(updated_user).data)
 
     @action(detail=False, methods=['get'], url_path='my_data', url_name='my_data')
     def my_data(self, request):
         """Get current user data for frontend auth service"""
         user = self.request.user
+        not_modified = self.check_not_modified(user)
+        if not_modified:
+            return not_modified
+
         serializer = self.get_serializer(user)
-        return Response(serializer.data)
+        return self.with_etag(Response(serializer.data), user)
+
+    @action(detail=False, methods=['get', 'post'], url_path='bulk', url_name='bulk_retrieve')
+    def bulk_retrieve(self, request):
+        """
+        Resolve many users in one request: `GET ?ids=1,2,3` or `POST {"ids": [...]}`.
+        Visibility follows `get_queryset`; ids that are not visible are reported
+        in `missing`. `include_profile` embeds the role profile of each user.
+        """
+        if request.method == 'GET':
+            data = {
+                'ids': [
+                    value.strip()
+                    for value in request.query_params.get('ids', '').split(',')
+                    if value.strip()
+                ],
+                'include_profile': request.query_params.get('include_profile', False),
+            }
+        else:
+            data = request.data
+
+        input_serializer = BulkRetrieveSerializer(data=data)
+        input_serializer.is_valid(raise_exception=True)
+        ids = input_serializer.validated_data['ids']
+
+        users = self.apply_sparse_fieldset(self.get_queryset()).in_bulk(ids)
+        found = [users[pk] for pk in ids if pk in users]
+        results = self.get_serializer(found, many=True).data
+
+        if input_serializer.validated_data['include_profile']:
+            profiles = self._get_profiles_data(found)
+            for user, item in zip(found, results):
+                item['profile'] = profiles.get(user.pk)
+
+        return Response({
+            'results': results,
+            'missing': [pk for pk in ids if pk not in users],
+        }, status=status.HTTP_200_OK)
+
+    def _get_profiles_data(self, users):
+        """Serializes the profiles of `users` with one query per role."""
+        ids_by_role = {}
+        for user in users:
+            ids_by_role.setdefault(user.user_type, []).append(user.pk)
+
+        profiles = {}
+        for role, user_ids in ids_by_role.items():
+            if role not in ProfileViewSet.role_map:
+                continue
+            (model, serializer_class) = ProfileViewSet.role_map[role]
+            instances = list(model.objects.filter(user_id__in=user_ids))
+            serializer = serializer_class(
+                instances,
+                many=True,
+                context={'request': self.request, 'sparse_omit': {'user'}},
+            )
+            for instance, item in zip(instances, serializer.data):
+                profiles[instance.user_id] = item
+        return profiles
+
+    @action(
+        detail=False,
+        methods=['patch'],
+        url_path='bulk-update',
+        url_name='bulk_update',
+        permission_classes=[IsAdminUser]
+    )
+    def bulk_update(self, request):
+        """
+        Admin maintenance: PATCH a list of `{"id": ..., "changes": {...}}`.
+        Each row is validated with `BulkUserChangesSerializer`; valid rows are
+        written with `bulk_update` in one transaction. Returns one outcome per row;
+        rows losing a unique value to a concurrent write come back as `conflict`.
+        """
+        data = request.data
+        if isinstance(data, list):
+            data = {'items': data}
+        input_serializer = BulkUserUpdateSerializer(data=data)
+        input_serializer.is_valid(raise_exception=True)
+        items = input_serializer.validated_data['items']
+
+        users = CustomUser.objects.in_bulk([item['id'] for item in items])
+        outcomes, changes, changed_outcomes = [], [], []
+        seen_ids, claimed_emails = set(), {}
+
+        for item in items:
+            pk = item['id']
+            outcome = {'id': pk}
+            outcomes.append(outcome)
+
+            if pk in seen_ids:
+                outcome.update(
+                    status='invalid',
+                    errors={'id': [ValidationMessages.Bulk.DUPLICATED_ID]}
+                )
+                continue
+            seen_ids.add(pk)
+
+            user = users.get(pk)
+            if user is None:
+                outcome.update(
+                    status='not_found',
+                    errors={'id': [ValidationMessages.Bulk.USER_NOT_FOUND]}
+                )
+                continue
+
+            serializer = BulkUserChangesSerializer(
+                user,
+                data=item['changes'],
+                partial=True,
+                context={'request': request}
+            )
+            if not serializer.is_valid():
+                outcome.update(status='invalid', errors=serializer.errors)
+                continue
+
+            validated_data = {
+                field: value
+                for field, value in serializer.validated_data.items()
+                if getattr(user, field) != value
+            }
+            email = validated_data.get('email')
+            if email is not None:
+                if claimed_emails.setdefault(email.lower(), pk) != pk:
+                    outcome.update(
+                        status='invalid',
+                        errors={'email': [ValidationMessages.Bulk.DUPLICATED_EMAIL_IN_REQUEST]}
+                    )
+                    continue
+
+            if not validated_data:
+                outcome['status'] = 'unchanged'
+                continue
+
+            outcome.update(status='updated', fields=sorted(validated_data))
+            changes.append((user, validated_data))
+            changed_outcomes.append(outcome)
+
+        batch_size = get_setting('BULK_UPDATE_BATCH_SIZE')
+        try:
+            bulk_update_users(changes, batch_size=batch_size, updated_by=request.user)
+        except IntegrityError:
+            # A concurrent write took a unique value (email, username) after
+            # validation; retry row by row so only the conflicting rows fail
+            for (change, outcome) in zip(changes, changed_outcomes):
+                try:
+                    bulk_update_users([change], batch_size=batch_size, updated_by=request.user)
+                except IntegrityError:
+                    del outcome['fields']
+                    outcome.update(
+                        status='conflict',
+                        errors={'non_field_errors': [ValidationMessages.Bulk.CONFLICT]}
+                    )
+
+        summary = {}
+        for outcome in outcomes:
+            summary[outcome['status']] = summary.get(outcome['status'], 0) + 1
+        return Response(
+            {'summary': summary, 'results': outcomes},
+            status=status.HTTP_200_OK
+        )
 
     @action(detail=False, methods=['get'], url_path='stats', url_name='user_stats')
     def user_stats(self, request):
@@ -207,28 +490,190 @@ class UserViewSet(
 
         return Response(stats, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], url_path='autocomplete', url_name='autocomplete')
+    def autocomplete(self, request):
+        """
+        Name typeahead: `?q=mar gon` returns the visible users with a name
+        word starting with each query word. Candidates come from the
+        in-process prefix index (database prefix search while it builds) and
+        are checked against `get_queryset`, so visibility is the same as `list`.
+        """
+        if request.user.user_type not in self.autocomplete_roles:
+            return Response(
+                {"detail": ResponseMessages.User.NO_PERMISSION_TO_LIST_USERS},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        query = AutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        (words, limit) = (query.validated_data['q'], query.validated_data['limit'])
+
+        queryset = self.get_queryset().only(*UserAutocompleteSerializer.Meta.fields)
+        roles = self.autocomplete_roles[request.user.user_type]
+        # Candidates the queryset hides don't count, widen the scan until
+        # `limit` users are visible or the index has no more matches
+        scan_limit = limit * 5
+        while True:
+            candidates = typeahead_index.search(words, roles=roles, limit=scan_limit)
+            if candidates is None:
+                break
+            found = queryset.in_bulk(candidates)
+            results = [found[pk] for pk in candidates if pk in found][:limit]
+            if len(results) >= limit or len(candidates) < scan_limit:
+                break
+            scan_limit *= 4
+
+        if candidates is None:
+            word_filters = [
+                Q(first_name__istartswith=word) |
+                Q(last_name__istartswith=word) |
+                Q(username__istartswith=word)
+                for word in words
+            ]
+            results = list(
+                queryset.filter(*word_filters).order_by('last_name', 'first_name')[:limit]
+            )
+
+        return Response(
+            {'results': UserAutocompleteSerializer(results, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'], url_path='signup-stats', url_name='signup_stats')
+    def signup_stats(self, request):
+        """Signups per role over a date range, served from the rollup table"""
+        if request.user.user_type not in self.signup_stats_roles:
+            return Response(
+                {"detail": ResponseMessages.Stats.NO_PERMISSION_TO_VIEW_STATS},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        query = SignupStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        allowed = self.signup_stats_roles[request.user.user_type]
+        if 'user_type' in params:
+            if allowed is not None and params['user_type'] not in allowed:
+                return Response(
+                    {"detail": ResponseMessages.Stats.NO_PERMISSION_FOR_USER_TYPE},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            user_types = [params['user_type']]
+        else:
+            user_types = None if allowed is None else list(allowed)
+
+        return Response({
+            'start': params['start'],
+            'end': params['end'],
+            'granularity': params['granularity'],
+            'results': get_signup_series(
+                params['start'],
+                params['end'],
+                params['granularity'],
+                user_types
+            ),
+        }, status=status.HTTP_200_OK)
+
 
 # ======================================================================
 # ProfileViewSet - profile view by user type
 # ======================================================================
 
 
-class AdminClinicViewSet(viewsets.ModelViewSet):
+class AdminClinicViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Reads are annotated with `doctor_count` (active doctors), which supports
+    `?ordering=-doctor_count` and `?min_doctors=`/`?max_doctors=`.
+    `?include=doctor_count,doctors` adds the count and the prefetched roster
+    (with nested users) to the response.
+    """
     queryset = Clinic.objects.all()
     serializer_class = ClinicSerializer
     permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['name', 'created_at', 'doctor_count']
+    ordering = ['name']
+
+    roster_fields = {'doctor_count', 'doctors'}
 
+    def get_includes(self):
+        return parse_field_list(self.request.query_params.get('include')) & self.roster_fields
+
+    def get_queryset(self):
+        queryset = Clinic.objects.all()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        active_doctors = Q(doctors__universal_state=UniversalState.ACTIVE)
+        queryset = queryset.annotate(doctor_count=Count('doctors', filter=active_doctors))
+
+        query = ClinicRosterQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        if 'min_doctors' in query.validated_data:
+            queryset = queryset.filter(doctor_count__gte=query.validated_data['min_doctors'])
+        if 'max_doctors' in query.validated_data:
+            queryset = queryset.filter(doctor_count__lte=query.validated_data['max_doctors'])
+
+        if 'doctors' in self.get_includes():
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'doctors',
+                    queryset=DoctorProfile.objects.filter(
+                        universal_state=UniversalState.ACTIVE
+                    ).select_related('user').prefetch_related(
+                        'user__groups',
+                        'user__user_permissions'
+                    ).order_by('user__last_name', 'user__first_name')
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.request.method in SAFE_METHODS:
+            return ClinicRosterSerializer
+        return ClinicSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in SAFE_METHODS:
+            context['sparse_omit'] = (
+                context.get('sparse_omit', set()) |
+                (self.roster_fields - self.get_includes())
+            )
+        return context
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
+        record_change(serializer.instance, ChangeAction.CREATED)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        record_change(serializer.instance, ChangeAction.UPDATED, serializer.validated_data)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        clinic_id = instance.pk
+        instance.delete()
+        record_change(instance, ChangeAction.DELETED, entity_id=clinic_id)
 
 
 class ProfileViewSet(
+    RequestProfilingMixin,
+    ConditionalRequestMixin,
+    SparseFieldsetMixin,
     ActionSerializerMixin,
     UniversalStateQuerysetMixin,
     viewsets.ModelViewSet
 ):
     permission_classes = [IsAuthenticated]
+    authentication_classes = AUTHENTICATION_CLASSES
     http_method_names = ['get', 'patch', 'head', 'options']
+    # `updated_at` backs the ETag even when `?fields=` leaves it out
+    sparse_required_fields = ('updated_at',)
 
     role_map = {
         UserRole.DOCTOR: (DoctorProfile, DoctorProfileSerializer),
@@ -246,7 +691,7 @@ class ProfileViewSet(
             return model.objects.filter(user=self.request.user)
 
     def get_object(self):
-        return self.get_queryset().first()
+        return self.apply_sparse_fieldset(self.get_queryset()).first()
 
     def get_serializer_class(self):
         role = self.request.user.user_type
@@ -266,18 +711,37 @@ class ProfileViewSet(
         instance = self.get_object()
 
         if request.method == 'GET':
+            not_modified = self.check_not_modified(instance)
+            if not_modified:
+                return not_modified
+
             serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            return self.with_etag(Response(serializer.data), instance)
 
         elif request.method == 'PATCH':
             serializer = self.get_serializer(instance, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data)
 
-
-class AdminUserProfileViewSet(viewsets.ModelViewSet):
+            with transaction.atomic():
+                precondition_failed = self.check_precondition(instance)
+                if precondition_failed:
+                    return precondition_failed
+                serializer.save()
+                record_change(
+                    serializer.instance,
+                    ChangeAction.UPDATED,
+                    serializer.validated_data
+                )
+            return self.with_etag(Response(serializer.data), serializer.instance)
+
+
+class AdminUserProfileViewSet(
+    RequestProfilingMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet
+):
     permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     search_fields = ['user__first_name', 'user__last_name', 'user__email']
     filterset_fields = ['user__user_type', 'specialty']
@@ -325,6 +789,22 @@ class AdminUserProfileViewSet(viewsets.ModelViewSet):
             )
         return super().list(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save()
+        record_change(serializer.instance, ChangeAction.CREATED)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        record_change(serializer.instance, ChangeAction.UPDATED, serializer.validated_data)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        profile_id = instance.pk
+        instance.delete()
+        record_change(instance, ChangeAction.DELETED, entity_id=profile_id)
+
     @action(detail=False, methods=['get'], url_path='stats', url_name='profile_stats')
     def profile_stats(self, request):
         """Get profile statistics for admin users"""
@@ -355,6 +835,7 @@ class AdminUserProfileViewSet(viewsets.ModelViewSet):
 
 class RegisterUserAPIView(APIView):
     permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
 
     def post(self, request):
         serializer = RegisterUserSerializer(data=request.data)
@@ -370,10 +851,271 @@ class RegisterUserAPIView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class UserTokenObtainPairView(TokenObtainPairView):
+    serializer_class = UserTokenObtainPairSerializer
+    # Tokens must not be compressed (BREACH), see CompressionMiddleware
+    compress_response = False
+
+    def post(self, request, *args, **kwargs):
+        if not get_setting('LOGIN_THROTTLE_ENABLED'):
+            return super().post(request, *args, **kwargs)
+
+        # Reject before the password hasher runs
+        username = (
+            request.data.get(get_user_model().USERNAME_FIELD)
+            if isinstance(request.data, dict) else None
+        )
+        rejection = login_throttle.check(
+            username if isinstance(username, str) else '',
+            BaseThrottle().get_ident(request)
+        )
+        if rejection:
+            (_, retry_after) = rejection
+            return Response(
+                {"detail": ResponseMessages.Auth.TOO_MANY_LOGIN_ATTEMPTS},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)}
+            )
+
+        if not login_throttle.acquire_hash_slot():
+            return Response(
+                {"detail": ResponseMessages.Auth.LOGIN_BUSY},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'}
+            )
+        try:
+            return super().post(request, *args, **kwargs)
+        finally:
+            login_throttle.release_hash_slot()
+
+
+class UserTokenRefreshView(TokenRefreshView):
+    serializer_class = StatelessTokenRefreshSerializer
+    compress_response = False
+
+
+class LoginMetricsAPIView(APIView):
+    """Login throttle counters of the worker serving the request"""
+    permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
+
+    def get(self, request):
+        return Response(login_throttle.metrics.snapshot(), status=status.HTTP_200_OK)
+
+
 class DoctorAgendaAPIView(APIView):
     permission_classes = []
 
     def get(self, request, token):
-        doctor = get_object_or_404(DoctorProfile, user__agenda_token=token)
-        serializer = DoctorProfileSerializer(doctor)
+        doctor = DoctorProfile.objects.filter(user__agenda_token=token).first()
+        if doctor is None and restore_archived_user(agenda_token=token) is not None:
+            doctor = DoctorProfile.objects.filter(user__agenda_token=token).first()
+        if doctor is None:
+            raise Http404
+        serializer = PublicDoctorProfileSerializer(doctor)
         return Response(serializer.data)
+
+
+class ConfirmEmailAPIView(APIView):
+    permission_classes = []
+
+    status_map = {
+        EmailConfirmationStatus.CONFIRMED: (
+            ResponseMessages.EmailConfirmation.CONFIRMED, status.HTTP_200_OK
+        ),
+        EmailConfirmationStatus.ALREADY_CONFIRMED: (
+            ResponseMessages.EmailConfirmation.ALREADY_CONFIRMED, status.HTTP_200_OK
+        ),
+        EmailConfirmationStatus.EXPIRED: (
+            ResponseMessages.EmailConfirmation.EXPIRED, status.HTTP_410_GONE
+        ),
+        EmailConfirmationStatus.INVALID: (
+            ResponseMessages.EmailConfirmation.INVALID, status.HTTP_404_NOT_FOUND
+        ),
+    }
+
+    def get(self, request, token):
+        # Email links are opened with GET, which link scanners and prefetchers
+        # also send: only show the status, the page's form POSTs to confirm
+        result = get_confirmation_status(token)
+        if result == EmailConfirmationStatus.PENDING:
+            return self.render_page(request, result, ResponseMessages.EmailConfirmation.PENDING)
+        return self.render_page(request, result, self.status_map[result][0])
+
+    def post(self, request, token):
+        result = confirm_email(token)
+        (detail, status_code) = self.status_map[result]
+        if request.content_type.startswith('application/x-www-form-urlencoded'):
+            # Submitted from the page rendered by `get`
+            return self.render_page(request, result, detail, status_code)
+        return Response({"detail": detail, "status": result}, status=status_code)
+
+    def render_page(self, request, result, detail, status_code=status.HTTP_200_OK):
+        return TemplateResponse(
+            request._request,
+            'dj_users/confirm_email.html',
+            {
+                'detail': detail,
+                'status': result,
+                'pending': result == EmailConfirmationStatus.PENDING,
+            },
+            status=status_code,
+        )
+
+
+class DoctorDirectoryAPIView(APIView):
+    """
+    Public doctor directory: verified, active doctors filtered by specialty,
+    clinic and name prefix, with facet counts and keyset pagination.
+    Responses are cached until the directory changes.
+    """
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        query = DoctorDirectoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        cache_key = 'dj_users:doctor_directory:{version}:{params}'.format(
+            version=get_directory_version(),
+            params='&'.join(f'{key}={params[key]}' for key in sorted(params)),
+        )
+        data = cache.get(cache_key)
+        if data is None:
+            try:
+                page = search_doctor_directory(
+                    specialty_id=params.get('specialty'),
+                    clinic_id=params.get('clinic'),
+                    prefix=params.get('q', ''),
+                    cursor=params.get('cursor'),
+                    limit=params['limit'],
+                )
+            except InvalidCursor:
+                raise ValidationError({'cursor': ValidationMessages.Pagination.INVALID_CURSOR})
+
+            data = {
+                **page,
+                'results': DoctorDirectoryEntrySerializer(page['results'], many=True).data,
+            }
+            cache.set(cache_key, data, get_setting('DOCTOR_DIRECTORY_CACHE_SECONDS'))
+
+        response = Response(data, status=status.HTTP_200_OK)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=get_setting('DOCTOR_DIRECTORY_CACHE_SECONDS')
+        )
+        return response
+
+
+class NearbyClinicsAPIView(APIView):
+    """Clinics around `lat`/`lng`, by radius or k-nearest, sorted by distance."""
+    permission_classes = []
+
+    def get(self, request):
+        query = NearbyClinicsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        clinics = find_nearby_clinics(
+            latitude=params['lat'],
+            longitude=params['lng'],
+            radius_km=params.get('radius_km'),
+            k=params['k'],
+        )
+        return Response(
+            {'results': NearbyClinicSerializer(clinics, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+
+class NurseSearchAPIView(APIView):
+    """
+    Nurses offering all of `?services=curaciones,inyecciones`, paginated by
+    id with `?after=`.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = AUTHENTICATION_CLASSES
+
+    def get(self, request):
+        query = NurseSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        nurses = find_nurses_by_services(
+            slugs=params.get('services', []),
+            after=params.get('after'),
+            limit=params['limit'],
+        )
+        return Response(
+            {
+                'results': NurseSearchEntrySerializer(nurses, many=True).data,
+                'next': nurses[-1].pk if len(nurses) == params['limit'] else None,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class NurseServiceListAPIView(APIView):
+    """Catalog of nurse services with the number of active nurses offering each."""
+    permission_classes = [IsAuthenticated]
+    authentication_classes = AUTHENTICATION_CLASSES
+
+    def get(self, request):
+        services = NurseService.objects.annotate(
+            nurse_count=Count(
+                'nurses',
+                filter=Q(nurses__universal_state=UniversalState.ACTIVE)
+            )
+        )
+        return Response(
+            {'results': NurseServiceSerializer(services, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+
+class AvailabilityAPIView(APIView):
+    """
+    `?username=` / `?email=` availability for the (admin only) registration
+    and user edit forms, which check as the admin types. A per-process Bloom
+    filter answers "free" without a query; only possible hits are confirmed
+    with the unique index lookup the registration serializer uses.
+    """
+    permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
+    throttle_classes = [AvailabilityThrottle]
+
+    def get(self, request):
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        data = {}
+        for (field, value) in query.validated_data.items():
+            available = availability_filter.might_exist(field, value) is False
+            if not available:
+                queryset = CustomUser.objects.filter(**{field: value})
+                available = not queryset.exists() and not is_archived(**{field: value})
+            data[field] = {'value': value, 'available': available}
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ChangeFeedAPIView(APIView):
+    """
+    Incremental feed of user, profile and clinic changes for downstream
+    services: `?after=<next of the previous page>&entity=user,clinic`.
+    """
+    permission_classes = [IsAdminUser]
+    authentication_classes = AUTHENTICATION_CLASSES
+
+    def get(self, request):
+        query = ChangeFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        feed = get_change_feed(
+            after=params['after'],
+            limit=params['limit'],
+            entities=params.get('entity'),
+        )
+        return Response(feed, status=status.HTTP_200_OK)
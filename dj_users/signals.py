@@ -0,0 +1,188 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.utils import geohash
+from dj_users.infrastructure.models import (
+    Clinic,
+    CustomUser,
+    DoctorDirectoryEntry,
+    DoctorProfile,
+    NurseProfile,
+)
+
+REVOKED_STATES = (UniversalState.FROZEN, UniversalState.TERMINATED)
+# `CustomUser` fields copied into, or deciding, a doctor's directory entry
+DIRECTORY_USER_FIELDS = {
+    'first_name',
+    'last_name',
+    'username',
+    'image',
+    'agenda_token',
+    'is_active',
+    'universal_state',
+}
+
+# Receivers import the logic they call when they first run, so
+# `django.setup()` (and every worker cold start) doesn't load it.
+
+
+def _is_blocked(universal_state, is_active) -> bool:
+    return universal_state in REVOKED_STATES or not is_active
+
+
+@receiver(pre_save, sender=CustomUser, dispatch_uid='dj_users_detect_blocking')
+def detect_blocking(sender, instance, update_fields=None, **kwargs):
+    # Only saves that block the user revoke its tokens; the previous state
+    # is only read when the saved one is blocked
+    instance._dj_users_blocking = False
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'universal_state', 'is_active'} & set(update_fields):
+        return
+    if not _is_blocked(instance.universal_state, instance.is_active):
+        return
+    previous = CustomUser.objects.filter(pk=instance.pk).values_list(
+        'universal_state', 'is_active'
+    ).first()
+    if previous is None:
+        return
+    (previous_state, previous_active) = previous
+    instance._dj_users_blocking = (
+        (
+            instance.universal_state in REVOKED_STATES and
+            instance.universal_state != previous_state
+        ) or
+        (previous_active and not instance.is_active)
+    )
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='dj_users_revoke_tokens')
+def revoke_tokens_of_blocked_users(sender, instance, created, **kwargs):
+    if created or not getattr(instance, '_dj_users_blocking', False):
+        return
+    instance._dj_users_blocking = False
+    from dj_users.application.logic.token_revocation import revoke_user_tokens
+    revoke_user_tokens([instance.pk])
+
+
+# ======================================================================
+# Doctor directory
+# ======================================================================
+
+
+@receiver(post_save, sender=DoctorProfile, dispatch_uid='dj_users_directory_doctor')
+def sync_directory_on_doctor_save(sender, instance, **kwargs):
+    from dj_users.application.logic.doctor_directory import sync_doctor_directory
+    sync_doctor_directory([instance.pk])
+
+
+@receiver(post_delete, sender=DoctorProfile, dispatch_uid='dj_users_directory_doctor_delete')
+def bump_directory_on_doctor_delete(sender, instance, **kwargs):
+    # The entry is removed by the cascade, cached pages still list it
+    from dj_users.application.logic.doctor_directory import bump_directory_version
+    bump_directory_version()
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='dj_users_directory_user')
+def sync_directory_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    # e.g. the `last_login` save of every token login
+    if update_fields is not None and not DIRECTORY_USER_FIELDS & set(update_fields):
+        return
+    from dj_users.application.logic.doctor_directory import sync_doctor_directory
+    doctor_ids = DoctorProfile.objects.filter(user=instance).values_list('pk', flat=True)
+    sync_doctor_directory(doctor_ids)
+
+
+@receiver(post_save, sender=Clinic, dispatch_uid='dj_users_directory_clinic')
+def sync_directory_on_clinic_save(sender, instance, created, **kwargs):
+    if created:
+        return
+    from dj_users.application.logic.doctor_directory import bump_directory_version
+    if DoctorDirectoryEntry.objects.filter(clinic=instance).exclude(
+        clinic_name=instance.name
+    ).update(clinic_name=instance.name):
+        bump_directory_version()
+
+
+@receiver(pre_delete, sender=Clinic, dispatch_uid='dj_users_directory_clinic_delete')
+def clear_directory_clinic_on_delete(sender, instance, **kwargs):
+    from dj_users.application.logic.doctor_directory import bump_directory_version
+    if DoctorDirectoryEntry.objects.filter(clinic=instance).update(clinic_name=''):
+        bump_directory_version()
+
+
+# ======================================================================
+# Clinic location
+# ======================================================================
+
+
+@receiver(pre_save, sender=Clinic, dispatch_uid='dj_users_clinic_geohash')
+def set_clinic_geohash(sender, instance, **kwargs):
+    if instance.latitude is None or instance.longitude is None:
+        instance.geohash = ''
+    else:
+        instance.geohash = geohash.encode(instance.latitude, instance.longitude)
+
+
+# ======================================================================
+# Nurse services
+# ======================================================================
+
+
+@receiver(post_save, sender=NurseProfile, dispatch_uid='dj_users_nurse_services')
+def sync_services_on_nurse_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'available_services' not in update_fields:
+        return
+    from dj_users.application.logic.nurse_services import sync_nurse_services
+    sync_nurse_services(instance)
+
+
+# ======================================================================
+# Name autocomplete
+# ======================================================================
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='dj_users_typeahead_save')
+def update_typeahead_on_user_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {
+        'first_name', 'last_name', 'username', 'user_type'
+    } & set(update_fields):
+        return
+    from dj_users.infrastructure.typeahead import typeahead_index
+    typeahead_index.update(instance)
+
+
+@receiver(post_delete, sender=CustomUser, dispatch_uid='dj_users_typeahead_delete')
+def remove_from_typeahead_on_user_delete(sender, instance, **kwargs):
+    from dj_users.infrastructure.typeahead import typeahead_index
+    typeahead_index.remove(instance.pk)
+
+
+# ======================================================================
+# Username/email availability
+# ======================================================================
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='dj_users_availability_save')
+def update_availability_on_user_save(sender, instance, update_fields=None, **kwargs):
+    # Every taken value must reach the filter, a miss answers "available"
+    if update_fields is not None and not {'username', 'email'} & set(update_fields):
+        return
+    from dj_users.infrastructure.availability import availability_filter
+    availability_filter.add(username=instance.username, email=instance.email)
+
+
+# ======================================================================
+# Slow queries
+# ======================================================================
+
+
+@receiver(connection_created, dispatch_uid='dj_users_slow_queries')
+def install_slow_query_recorder(sender, connection, **kwargs):
+    from dj_users.infrastructure.slow_queries import slow_query_recorder
+    slow_query_recorder.install(connection)
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from dj_users.application.logic.archive_users import archive_inactive_users
+from dj_users.application.logic.change_events import prune_change_events, relay_change_events
+from dj_users.application.logic.confirmation_emails import dispatch_confirmation_emails
+from dj_users.application.logic.duplicate_patients import find_duplicate_patients
+from dj_users.application.logic.retention import purge_terminated_users
+from dj_users.application.logic.signup_rollups import rebuild_signup_rollups
+
+
+@shared_task(name='dj_users.dispatch_confirmation_emails')
+def dispatch_confirmation_emails_task(batch_size=None):
+    return dispatch_confirmation_emails(batch_size=batch_size)
+
+
+@shared_task(name='dj_users.rebuild_signup_rollups')
+def rebuild_signup_rollups_task(days=2):
+    """
+    Corrects the signup rollups of the last `days` days. History is filled
+    once with the `backfill_signup_rollups` command.
+    """
+    end = timezone.now()
+    return rebuild_signup_rollups(end - timedelta(days=days), end)
+
+
+@shared_task(name='dj_users.find_duplicate_patients')
+def find_duplicate_patients_task(full=False):
+    """Incremental by default: only patients registered since the last run."""
+    run = find_duplicate_patients(full=full)
+    return {'users_scanned': run.users_scanned, 'candidates_found': run.candidates_found}
+
+
+@shared_task(name='dj_users.purge_terminated_users')
+def purge_terminated_users_task(mode=None):
+    return purge_terminated_users(mode=mode)
+
+
+@shared_task(name='dj_users.archive_inactive_users')
+def archive_inactive_users_task():
+    return archive_inactive_users()
+
+
+@shared_task(name='dj_users.relay_change_events')
+def relay_change_events_task(batch_size=None):
+    return relay_change_events(batch_size=batch_size)
+
+
+@shared_task(name='dj_users.prune_change_events')
+def prune_change_events_task():
+    return prune_change_events()
@@ -0,0 +1,52 @@
+import itertools
+
+from django.apps import apps
+from django.db import models
+
+from dj_users.application.domain.roles import UserRole
+from dj_users.infrastructure.models import Clinic, CustomUser, DoctorProfile
+
+_sequence = itertools.count(1)
+
+
+def make_user(user_type=UserRole.PATIENT, **fields):
+    number = next(_sequence)
+    fields.setdefault('username', f'user{number}')
+    fields.setdefault('email', f'user{number}@example.com')
+    return CustomUser.objects.create_user(password='secret', user_type=user_type, **fields)
+
+
+def make_clinic(owner=None, **fields):
+    fields.setdefault('name', f'Clinic {next(_sequence)}')
+    return Clinic.objects.create(owner=owner or make_user(UserRole.DOCTOR), **fields)
+
+
+def make_specialty(name):
+    """
+    A `dj_catalogs.Specialty` row. Its required text fields are filled in,
+    so the tests don't depend on the catalog's exact schema.
+    """
+    model = apps.get_model('dj_catalogs', 'Specialty')
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.null or field.has_default():
+            continue
+        if isinstance(field, models.CharField):
+            values[field.name] = name[:field.max_length]
+        elif isinstance(field, models.TextField):
+            values[field.name] = name
+    return model.objects.create(**values)
+
+
+def make_doctor(first_name='', last_name='', specialty=None, clinic=None,
+                verificated=True, **user_fields):
+    user = make_user(
+        UserRole.DOCTOR, first_name=first_name, last_name=last_name, **user_fields
+    )
+    return DoctorProfile.objects.create(
+        user=user,
+        specialty=specialty,
+        clinic=clinic,
+        professional_license=f'LIC-{user.pk}',
+        verificated=verificated,
+    )
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.logic.archive_users import (
+    archive_inactive_users,
+    is_archived,
+    restore_archived_user,
+)
+from dj_users.application.logic.confirmation_emails import enqueue_confirmation_email
+from dj_users.application.logic.duplicate_patients import index_patients
+from dj_users.infrastructure.models import (
+    ArchivedUser,
+    ChangeEvent,
+    ConfirmationEmail,
+    CustomUser,
+    DuplicateCandidate,
+    NurseProfile,
+    NurseService,
+    PatientBlockingKey,
+    PatientProfile,
+)
+from dj_users.tests.factories import make_clinic, make_doctor, make_user
+
+TOKEN_URL = '/users/api/token/'
+MY_USER_URL = '/users/api/v1/user/me/'
+
+
+def make_inactive(user_type=UserRole.PATIENT, **fields):
+    user = make_user(user_type, **fields)
+    CustomUser.objects.filter(pk=user.pk).update(
+        last_login=timezone.now() - timedelta(days=800)
+    )
+    return CustomUser.objects.get(pk=user.pk)
+
+
+class ArchiveUsersTest(TestCase):
+
+    def test_round_trip_restores_the_user_and_its_rows(self):
+        user = make_inactive(first_name='Ana', birth_date=timezone.now().date())
+        PatientProfile.objects.create(user=user, blood_type='O+')
+        enqueue_confirmation_email(user)
+        index_patients(CustomUser.objects.filter(pk=user.pk))
+        keys = set(PatientBlockingKey.objects.filter(user=user).values_list('key', flat=True))
+
+        self.assertEqual(archive_inactive_users(pause=0), 1)
+
+        self.assertFalse(CustomUser.objects.filter(pk=user.pk).exists())
+        self.assertFalse(ConfirmationEmail.objects.filter(user_id=user.pk).exists())
+        self.assertTrue(is_archived(username=user.username))
+
+        restored = restore_archived_user(email=user.email)
+
+        self.assertEqual(restored.pk, user.pk)
+        self.assertEqual(restored.password, user.password)
+        self.assertEqual(restored.agenda_token, user.agenda_token)
+        self.assertEqual(PatientProfile.objects.get(user=restored).blood_type, 'O+')
+        self.assertTrue(ConfirmationEmail.objects.filter(user=restored).exists())
+        self.assertEqual(
+            set(PatientBlockingKey.objects.filter(user=restored).values_list('key', flat=True)),
+            keys,
+        )
+        self.assertFalse(ArchivedUser.objects.exists())
+        self.assertIsNone(restore_archived_user(email=user.email))
+
+    def test_nurse_services_come_back(self):
+        user = make_inactive(UserRole.NURSE)
+        nurse = NurseProfile.objects.create(user=user)
+        service = NurseService.objects.create(name='Curaciones', slug='curaciones')
+        nurse.services.add(service)
+
+        archive_inactive_users(pause=0)
+        restore_archived_user(user_id=user.pk)
+
+        self.assertEqual(list(NurseProfile.objects.get(user_id=user.pk).services.all()), [service])
+
+    def test_archive_and_restore_write_change_events(self):
+        user = make_inactive()
+        ChangeEvent.objects.all().delete()
+
+        archive_inactive_users(pause=0)
+        restore_archived_user(user_id=user.pk)
+
+        self.assertEqual(
+            list(ChangeEvent.objects.order_by('pk').values_list('entity_id', 'action')),
+            [(user.pk, ChangeAction.DELETED), (user.pk, ChangeAction.CREATED)],
+        )
+
+    def test_only_long_inactive_regular_users_are_archived(self):
+        make_user()
+        make_inactive(UserRole.ADMIN)
+        make_inactive(is_staff=True)
+        make_inactive(universal_state=UniversalState.TERMINATED)
+        make_clinic(owner=make_inactive())
+        doctor = make_doctor('Ana', 'Álvarez')
+        CustomUser.objects.filter(pk=doctor.user_id).update(
+            last_login=timezone.now() - timedelta(days=800)
+        )
+
+        self.assertEqual(archive_inactive_users(pause=0), 0)
+
+    def test_users_with_rows_that_can_not_be_restored_stay(self):
+        user = make_inactive()
+        DuplicateCandidate.objects.create(
+            user=user, duplicate=make_user(), cluster=user.pk, score=0.9
+        )
+
+        self.assertEqual(archive_inactive_users(pause=0), 0)
+        self.assertTrue(CustomUser.objects.filter(pk=user.pk).exists())
+
+
+class ArchivedUserLoginTest(TestCase):
+
+    def setUp(self):
+        self.user = make_inactive(username='ana')
+        archive_inactive_users(pause=0)
+        self.client = APIClient()
+
+    def test_login_restores_the_user(self):
+        response = self.client.post(
+            TOKEN_URL, {'username': 'ana', 'password': 'secret'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(CustomUser.objects.filter(pk=self.user.pk).exists())
+
+    def test_wrong_password_keeps_it_archived(self):
+        response = self.client.post(
+            TOKEN_URL, {'username': 'ana', 'password': 'wrong'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(is_archived(username='ana'))
+
+    def test_token_issued_before_archiving_restores_the_user(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = self.client.get(MY_USER_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'ana')
+        self.assertFalse(is_archived(username='ana'))
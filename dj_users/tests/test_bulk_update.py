@@ -0,0 +1,127 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dj_users.application.domain.change_events import ChangeAction
+from dj_users.infrastructure.models import ChangeEvent, CustomUser
+
+BULK_UPDATE_URL = '/users/api/v1/user/bulk-update/'
+
+
+class BulkUpdateTest(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret'
+        )
+        self.ana = CustomUser.objects.create_user(
+            username='ana', email='ana@example.com', password='secret', first_name='Ana'
+        )
+        self.luis = CustomUser.objects.create_user(
+            username='luis', email='luis@example.com', password='secret', first_name='Luis'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _patch(self, items):
+        response = self.client.patch(BULK_UPDATE_URL, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return {result['id']: result for result in response.data['results']}, response.data
+
+    def test_updates_valid_rows_and_reports_each_outcome(self):
+        (results, data) = self._patch([
+            {'id': self.ana.pk, 'changes': {'first_name': 'Anabel', 'is_email_confirmed': True}},
+            {'id': self.luis.pk, 'changes': {'first_name': 'Luis'}},
+            {'id': 999999, 'changes': {'first_name': 'Nadie'}},
+        ])
+
+        self.assertEqual(results[self.ana.pk]['status'], 'updated')
+        self.assertEqual(results[self.ana.pk]['fields'], ['first_name', 'is_email_confirmed'])
+        self.assertEqual(results[self.luis.pk]['status'], 'unchanged')
+        self.assertEqual(results[999999]['status'], 'not_found')
+        self.assertEqual(data['summary'], {'updated': 1, 'unchanged': 1, 'not_found': 1})
+
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.first_name, 'Anabel')
+        self.assertTrue(self.ana.is_email_confirmed)
+        self.assertEqual(self.ana.updated_by_id, self.admin.pk)
+
+    def test_invalid_rows_do_not_block_the_others(self):
+        (results, _) = self._patch([
+            {'id': self.ana.pk, 'changes': {'email': 'not-an-email'}},
+            {'id': self.luis.pk, 'changes': {'last_name': 'Pérez'}},
+        ])
+
+        self.assertEqual(results[self.ana.pk]['status'], 'invalid')
+        self.assertIn('email', results[self.ana.pk]['errors'])
+        self.assertEqual(results[self.luis.pk]['status'], 'updated')
+        self.luis.refresh_from_db()
+        self.assertEqual(self.luis.last_name, 'Pérez')
+
+    def test_keys_that_are_not_updatable_are_rejected(self):
+        (results, _) = self._patch([
+            {'id': self.ana.pk, 'changes': {'first_name': 'Anabel', 'is_staff': True}},
+            {'id': self.luis.pk, 'changes': {'username': 'luisito'}},
+        ])
+
+        self.assertEqual(results[self.ana.pk]['status'], 'invalid')
+        self.assertIn('is_staff', results[self.ana.pk]['errors'])
+        self.assertEqual(results[self.luis.pk]['status'], 'invalid')
+        self.assertIn('username', results[self.luis.pk]['errors'])
+        self.ana.refresh_from_db()
+        self.assertFalse(self.ana.is_staff)
+        self.assertEqual(self.ana.first_name, 'Ana')
+
+    def test_duplicated_ids_and_emails_in_one_request(self):
+        (_, data) = self._patch([
+            {'id': self.ana.pk, 'changes': {'email': 'shared@example.com'}},
+            {'id': self.luis.pk, 'changes': {'email': 'SHARED@example.com'}},
+            {'id': self.ana.pk, 'changes': {'first_name': 'Anabel'}},
+        ])
+
+        (first, second, repeated) = data['results']
+        self.assertEqual(first['status'], 'updated')
+        self.assertEqual(second['status'], 'invalid')
+        self.assertIn('email', second['errors'])
+        self.assertEqual(repeated['status'], 'invalid')
+        self.assertIn('id', repeated['errors'])
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.email, 'shared@example.com')
+        self.assertEqual(self.ana.first_name, 'Ana')
+
+    def test_email_taken_by_another_user_is_invalid(self):
+        (results, _) = self._patch([
+            {'id': self.ana.pk, 'changes': {'email': 'luis@example.com'}},
+        ])
+
+        self.assertEqual(results[self.ana.pk]['status'], 'invalid')
+
+    def test_updated_rows_write_change_events(self):
+        self._patch([
+            {'id': self.ana.pk, 'changes': {'first_name': 'Anabel'}},
+            {'id': self.luis.pk, 'changes': {'first_name': 'Luis'}},
+        ])
+
+        events = ChangeEvent.objects.filter(action=ChangeAction.UPDATED)
+        self.assertEqual(
+            list(events.values_list('entity_id', 'fields')),
+            [(self.ana.pk, ['first_name'])],
+        )
+
+    @override_settings(DJ_USERS_BULK_UPDATE_MAX_ITEMS=1)
+    def test_too_many_items_is_rejected(self):
+        response = self.client.patch(BULK_UPDATE_URL, [
+            {'id': self.ana.pk, 'changes': {'first_name': 'Anabel'}},
+            {'id': self.luis.pk, 'changes': {'first_name': 'Lucho'}},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_an_admin(self):
+        self.client.force_authenticate(self.ana)
+
+        response = self.client.patch(BULK_UPDATE_URL, [
+            {'id': self.luis.pk, 'changes': {'first_name': 'Lucho'}},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,196 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib import admin
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dj_users.application.domain.change_events import ChangeAction, ChangeEntity
+from dj_users.application.logic.change_events import (
+    get_change_feed,
+    prune_change_events,
+    record_change,
+    relay_change_events,
+)
+from dj_users.application.logic.confirm_email import confirm_email
+from dj_users.infrastructure.models import ChangeEvent, CustomUser
+from dj_users.tests.factories import make_doctor, make_user
+
+MY_USER_URL = '/users/api/v1/user/me/'
+FEED_URL = '/users/api/v1/changes/'
+
+relayed_batches = []
+
+
+def collect_events(events):
+    relayed_batches.append(events)
+
+
+def fail_relay(events):
+    raise ConnectionError('broker down')
+
+
+def events(**filters):
+    return list(
+        ChangeEvent.objects.filter(**filters).order_by('pk')
+        .values_list('entity', 'entity_id', 'action', 'fields')
+    )
+
+
+class RecordChangesTest(TestCase):
+
+    def setUp(self):
+        self.user = make_user(first_name='Ana')
+        self.admin = CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret'
+        )
+        ChangeEvent.objects.all().delete()
+
+    def test_self_service_update_records_the_changed_fields(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        client.patch(MY_USER_URL, {'first_name': 'Anabel'}, format='json')
+
+        self.assertEqual(
+            events(),
+            [(ChangeEntity.USER, self.user.pk, ChangeAction.UPDATED, ['first_name'])],
+        )
+
+    def test_failed_precondition_records_nothing(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.patch(
+            MY_USER_URL, {'first_name': 'Anabel'}, format='json', HTTP_IF_MATCH='"stale"'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(events(), [])
+
+    def test_email_confirmation_is_recorded_once(self):
+        confirm_email(self.user.confirmation_token)
+        confirm_email(self.user.confirmation_token)
+
+        self.assertEqual(
+            events(),
+            [(ChangeEntity.USER, self.user.pk, ChangeAction.UPDATED, ['is_email_confirmed'])],
+        )
+
+    def test_admin_profile_changes_are_recorded(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        profile = make_doctor('Ana', 'Álvarez')
+        ChangeEvent.objects.all().delete()
+        url = f'/users/api/v1/profile-admin/{profile.pk}/?user_type=doctor'
+
+        client.patch(url, {'professional_license': 'CMP-1'}, format='json')
+        client.delete(url)
+
+        self.assertEqual(events(), [
+            (
+                ChangeEntity.DOCTOR_PROFILE, profile.pk, ChangeAction.UPDATED,
+                ['professional_license'],
+            ),
+            (ChangeEntity.DOCTOR_PROFILE, profile.pk, ChangeAction.DELETED, []),
+        ])
+        self.assertEqual(ChangeEvent.objects.last().user_id, profile.user_id)
+
+    def test_admin_site_saves_are_recorded(self):
+        model_admin = admin.site._registry[CustomUser]
+        request = RequestFactory().post('/admin/')
+        request.user = self.admin
+        self.user.first_name = 'Anabel'
+
+        model_admin.save_model(
+            request, self.user, SimpleNamespace(changed_data=['first_name']), change=True
+        )
+
+        self.assertEqual(
+            events(),
+            [(ChangeEntity.USER, self.user.pk, ChangeAction.UPDATED, ['first_name'])],
+        )
+
+
+@override_settings(DJ_USERS_CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTest(TestCase):
+
+    def setUp(self):
+        self.user = make_user()
+        ChangeEvent.objects.all().delete()
+        self.events = [
+            record_change(self.user, ChangeAction.UPDATED, ['first_name'])
+            for _ in range(3)
+        ]
+        relayed_batches.clear()
+
+    def test_pages_resume_from_the_cursor(self):
+        first = get_change_feed(limit=2)
+        second = get_change_feed(after=first['next'], limit=2)
+
+        self.assertEqual(
+            [event['id'] for event in first['results'] + second['results']],
+            [event.pk for event in self.events],
+        )
+        self.assertEqual(get_change_feed(after=second['next'])['results'], [])
+        self.assertEqual(get_change_feed(after=second['next'])['next'], second['next'])
+
+    @override_settings(DJ_USERS_CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_recent_events_are_held_back(self):
+        ChangeEvent.objects.filter(pk=self.events[0].pk).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        feed = get_change_feed()
+
+        self.assertEqual([event['id'] for event in feed['results']], [self.events[0].pk])
+        self.assertEqual(feed['next'], self.events[0].pk)
+
+    def test_entity_filter(self):
+        self.assertEqual(get_change_feed(entities={ChangeEntity.CLINIC})['results'], [])
+
+    def test_endpoint_is_admin_only_and_validates_entities(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get(FEED_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(CustomUser.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret'
+        ))
+        self.assertEqual(client.get(FEED_URL, {'entity': 'user'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            client.get(FEED_URL, {'entity': 'payments'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    @override_settings(DJ_USERS_CHANGE_RELAY='dj_users.tests.test_change_events.collect_events')
+    def test_relay_hands_over_batches_and_marks_them(self):
+        self.assertEqual(relay_change_events(batch_size=2), 3)
+
+        self.assertEqual([len(batch) for batch in relayed_batches], [2, 1])
+        self.assertFalse(ChangeEvent.objects.filter(relayed_at__isnull=True).exists())
+        self.assertEqual(relay_change_events(), 0)
+
+    @override_settings(DJ_USERS_CHANGE_RELAY='dj_users.tests.test_change_events.fail_relay')
+    def test_failed_relay_keeps_events_pending(self):
+        self.assertEqual(relay_change_events(), 0)
+
+        self.assertEqual(ChangeEvent.objects.filter(relayed_at__isnull=True).count(), 3)
+
+    @override_settings(
+        DJ_USERS_CHANGE_RELAY='dj_users.tests.test_change_events.collect_events',
+        DJ_USERS_CHANGE_EVENT_RETENTION_DAYS=30,
+    )
+    def test_prune_keeps_recent_and_unrelayed_events(self):
+        ChangeEvent.objects.filter(pk__in=[self.events[0].pk, self.events[1].pk]).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        ChangeEvent.objects.filter(pk=self.events[0].pk).update(relayed_at=timezone.now())
+
+        self.assertEqual(prune_change_events(), 1)
+        self.assertEqual(
+            list(ChangeEvent.objects.order_by('pk').values_list('pk', flat=True)),
+            [self.events[1].pk, self.events[2].pk],
+        )
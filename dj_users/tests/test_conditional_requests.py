@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dj_users.infrastructure.models import CustomUser
+
+MY_USER_URL = '/users/api/v1/user/me/'
+
+
+class MyUserConditionalRequestTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='ana',
+            email='ana@example.com',
+            password='secret',
+            first_name='Ana',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _etag(self, url=MY_USER_URL):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'])
+        return response['ETag']
+
+    def _touch(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(
+            updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        # Every request authenticates a freshly loaded user
+        self.client.force_authenticate(CustomUser.objects.get(pk=self.user.pk))
+
+    def test_get_with_current_etag_is_not_modified(self):
+        etag = self._etag()
+
+        response = self.client.get(MY_USER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_weak_etag_from_compression_still_matches(self):
+        etag = self._etag()
+
+        response = self.client.get(MY_USER_URL, HTTP_IF_NONE_MATCH=f'W/{etag}')
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_after_change_returns_the_new_representation(self):
+        etag = self._etag()
+        self._touch()
+
+        response = self.client.get(MY_USER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_sparse_fieldsets_have_their_own_etag(self):
+        self.assertNotEqual(self._etag(), self._etag(f'{MY_USER_URL}?fields=first_name'))
+
+    def test_patch_with_current_etag_updates(self):
+        etag = self._etag()
+
+        response = self.client.patch(
+            MY_USER_URL, {'first_name': 'Anabel'}, format='json', HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Anabel')
+
+    def test_patch_with_sparse_etag_updates(self):
+        etag = self._etag(f'{MY_USER_URL}?fields=first_name')
+
+        response = self.client.patch(
+            MY_USER_URL, {'first_name': 'Anabel'}, format='json', HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_patch_with_stale_etag_fails_precondition(self):
+        etag = self._etag()
+        self._touch()
+
+        response = self.client.patch(
+            MY_USER_URL, {'first_name': 'Anabel'}, format='json', HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Ana')
+
+    def test_patch_without_if_match_is_unconditional(self):
+        self._touch()
+
+        response = self.client.patch(MY_USER_URL, {'first_name': 'Anabel'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from dj_users.application.domain.email_confirmation import ConfirmationEmailStatus
+from dj_users.application.logic.confirmation_emails import (
+    dispatch_confirmation_emails,
+    enqueue_confirmation_email,
+)
+from dj_users.infrastructure.models import ConfirmationEmail, CustomUser
+
+LOCMEM_SEND = 'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    DJ_USERS_EMAIL_DISPATCH_MAX_ATTEMPTS=3,
+    DJ_USERS_EMAIL_DISPATCH_RETRY_BASE_SECONDS=60,
+    DJ_USERS_EMAIL_DISPATCH_RETRY_MAX_SECONDS=90,
+)
+class DispatchConfirmationEmailsTest(TestCase):
+
+    def _enqueue(self, count):
+        users = [
+            CustomUser.objects.create_user(
+                username=f'user{index}',
+                email=f'user{index}@example.com',
+                password='secret',
+            )
+            for index in range(count)
+        ]
+        return [enqueue_confirmation_email(user) for user in users]
+
+    def test_enqueue_keeps_one_pending_row_per_user(self):
+        (outbox,) = self._enqueue(1)
+        self.assertEqual(enqueue_confirmation_email(outbox.user), outbox)
+        self.assertEqual(ConfirmationEmail.objects.count(), 1)
+
+    def test_sends_batch_and_marks_rows_sent(self):
+        self._enqueue(3)
+
+        metrics = dispatch_confirmation_emails(batch_size=2)
+
+        self.assertEqual((metrics['claimed'], metrics['sent']), (2, 2))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            ConfirmationEmail.objects.filter(status=ConfirmationEmailStatus.SENT).count(), 2
+        )
+        self.assertEqual(dispatch_confirmation_emails()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_message_links_the_current_token(self):
+        (outbox,) = self._enqueue(1)
+
+        dispatch_confirmation_emails()
+
+        self.assertEqual(mail.outbox[0].to, [outbox.user.email])
+        self.assertIn(str(outbox.user.confirmation_token), mail.outbox[0].body)
+
+    def test_confirmed_users_are_cancelled(self):
+        (outbox,) = self._enqueue(1)
+        CustomUser.objects.filter(pk=outbox.user_id).update(is_email_confirmed=True)
+
+        metrics = dispatch_confirmation_emails()
+
+        self.assertEqual(metrics['cancelled'], 1)
+        self.assertEqual(mail.outbox, [])
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, ConfirmationEmailStatus.CANCELLED)
+
+    def test_failure_is_retried_with_backoff(self):
+        (outbox,) = self._enqueue(1)
+
+        with mock.patch(LOCMEM_SEND, side_effect=OSError('connection reset')):
+            metrics = dispatch_confirmation_emails()
+        after_send = timezone.now()
+
+        self.assertEqual(metrics['retried'], 1)
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, ConfirmationEmailStatus.PENDING)
+        self.assertEqual(outbox.attempts, 1)
+        self.assertIn('connection reset', outbox.last_error)
+        self.assertGreater(outbox.next_attempt_at, after_send + timedelta(seconds=55))
+        # Not due yet
+        self.assertEqual(dispatch_confirmation_emails()['claimed'], 0)
+
+    def test_backoff_is_capped_and_gives_up_after_max_attempts(self):
+        (outbox,) = self._enqueue(1)
+
+        with mock.patch(LOCMEM_SEND, side_effect=OSError('connection reset')):
+            for attempt in range(3):
+                ConfirmationEmail.objects.filter(pk=outbox.pk).update(
+                    next_attempt_at=timezone.now()
+                )
+                started = timezone.now()
+                dispatch_confirmation_emails()
+                outbox.refresh_from_db()
+                if attempt == 1:
+                    # 60 * 2 capped at 90 seconds
+                    self.assertLessEqual(
+                        outbox.next_attempt_at, timezone.now() + timedelta(seconds=90)
+                    )
+                    self.assertGreater(outbox.next_attempt_at, started + timedelta(seconds=85))
+
+        self.assertEqual(outbox.status, ConfirmationEmailStatus.FAILED)
+        self.assertEqual(outbox.attempts, 3)
+
+    def test_expired_lease_is_claimed_again(self):
+        (outbox,) = self._enqueue(1)
+        ConfirmationEmail.objects.filter(pk=outbox.pk).update(
+            status=ConfirmationEmailStatus.SENDING,
+            next_attempt_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertEqual(dispatch_confirmation_emails()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 1)
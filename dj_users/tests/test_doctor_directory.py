@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dj_users.application.logic.doctor_directory import search_doctor_directory
+from dj_users.infrastructure.models import DoctorDirectoryEntry
+from dj_users.tests.factories import make_clinic, make_doctor, make_specialty
+
+DIRECTORY_URL = '/users/api/v1/doctors/directory/'
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DoctorDirectoryTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cardiology = make_specialty('Cardiología')
+        cls.pediatrics = make_specialty('Pediatría')
+        cls.north = make_clinic(name='Norte')
+        cls.south = make_clinic(name='Sur')
+        cls.doctors = [
+            make_doctor('Ana', 'Álvarez', cls.cardiology, cls.north),
+            make_doctor('Bruno', 'Benítez', cls.cardiology, cls.south),
+            make_doctor('Carla', 'Castro', cls.pediatrics, cls.north),
+            make_doctor('Diego', 'Castro', cls.pediatrics, cls.north),
+            # Same name as the previous one, ordered by id
+            make_doctor('Diego', 'Castro', cls.pediatrics, cls.south),
+        ]
+        make_doctor('Eva', 'Espinoza', cls.cardiology, cls.north, verificated=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def _walk(self, limit, **filters):
+        ids, cursor = [], None
+        while True:
+            page = search_doctor_directory(cursor=cursor, limit=limit, **filters)
+            ids.extend(entry.doctor_id for entry in page['results'])
+            cursor = page['next']
+            if cursor is None:
+                return ids
+
+    def test_lists_only_verified_doctors(self):
+        self.assertEqual(
+            set(DoctorDirectoryEntry.objects.values_list('doctor_id', flat=True)),
+            {doctor.pk for doctor in self.doctors},
+        )
+
+    def test_keyset_pages_cover_every_entry_once_in_order(self):
+        self.assertEqual(self._walk(limit=2), [doctor.pk for doctor in self.doctors])
+
+    def test_keyset_pages_keep_the_filters(self):
+        self.assertEqual(
+            self._walk(limit=1, specialty_id=self.pediatrics.pk),
+            [doctor.pk for doctor in self.doctors[2:]],
+        )
+
+    def test_name_prefix_ignores_accents_and_case(self):
+        page = search_doctor_directory(prefix='alv')
+        self.assertEqual([entry.doctor_id for entry in page['results']], [self.doctors[0].pk])
+
+    def test_facets_count_what_selecting_them_would_return(self):
+        page = search_doctor_directory(specialty_id=self.pediatrics.pk)
+
+        self.assertEqual(page['count'], 3)
+        # Specialty counts ignore the specialty filter itself
+        self.assertEqual(
+            {facet['specialty']: facet['count'] for facet in page['facets']['specialty']},
+            {self.cardiology.pk: 2, self.pediatrics.pk: 3},
+        )
+        # Clinic counts honour it
+        self.assertEqual(
+            {facet['clinic']: facet['count'] for facet in page['facets']['clinic']},
+            {self.north.pk: 2, self.south.pk: 1},
+        )
+
+    def test_facets_cross_both_filters(self):
+        page = search_doctor_directory(specialty_id=self.cardiology.pk, clinic_id=self.north.pk)
+
+        self.assertEqual(page['count'], 1)
+        self.assertEqual(
+            {facet['specialty']: facet['count'] for facet in page['facets']['specialty']},
+            {self.cardiology.pk: 1, self.pediatrics.pk: 2},
+        )
+        self.assertEqual(
+            {facet['clinic']: facet['count'] for facet in page['facets']['clinic']},
+            {self.north.pk: 1, self.south.pk: 1},
+        )
+
+    def test_unlisting_a_doctor_removes_the_entry(self):
+        doctor = self.doctors[0]
+        doctor.verificated = False
+        doctor.save()
+
+        self.assertFalse(DoctorDirectoryEntry.objects.filter(doctor=doctor).exists())
+
+    def test_renaming_a_clinic_updates_the_entries(self):
+        self.north.name = 'Norte Centro'
+        self.north.save()
+
+        self.assertEqual(
+            set(DoctorDirectoryEntry.objects.filter(clinic=self.north).values_list(
+                'clinic_name', flat=True
+            )),
+            {'Norte Centro'},
+        )
+
+    def test_cached_response_is_invalidated_by_changes(self):
+        client = APIClient()
+        self.assertEqual(client.get(DIRECTORY_URL).data['count'], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_doctor('Fabián', 'Flores', self.cardiology, self.south)
+
+        self.assertEqual(client.get(DIRECTORY_URL).data['count'], 6)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = APIClient().get(DIRECTORY_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', response.data)
+
+    def test_response_has_no_private_fields(self):
+        (entry,) = APIClient().get(DIRECTORY_URL, {'q': 'ana'}).data['results']
+
+        self.assertEqual(
+            set(entry),
+            {'id', 'full_name', 'specialty', 'clinic', 'clinic_name', 'image', 'agenda_token'},
+        )
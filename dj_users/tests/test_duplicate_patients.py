@@ -0,0 +1,117 @@
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from dj_users.application.domain.duplicates import DuplicateStatus
+from dj_users.application.domain.roles import UserRole
+from dj_users.application.logic.duplicate_patients import blocking_keys, find_duplicate_patients
+from dj_users.infrastructure.models import DuplicateCandidate
+from dj_users.tests.factories import make_user
+
+BIRTH_DATE = date(1990, 5, 17)
+
+
+def make_patient(first_name, last_name, birth_date=BIRTH_DATE, phone_number='', **fields):
+    return make_user(
+        UserRole.PATIENT,
+        first_name=first_name,
+        last_name=last_name,
+        birth_date=birth_date,
+        phone_number=phone_number,
+        **fields,
+    )
+
+
+def pairs():
+    return set(DuplicateCandidate.objects.values_list('user_id', 'duplicate_id'))
+
+
+class BlockingKeysTest(SimpleTestCase):
+
+    def test_spelling_variants_share_keys(self):
+        self.assertTrue(
+            blocking_keys('María', 'González', BIRTH_DATE, '') &
+            blocking_keys('Maria', 'Gonzales', BIRTH_DATE, '')
+        )
+
+    def test_phone_suffix_ignores_formatting(self):
+        self.assertIn('p:9876543', blocking_keys('', '', None, '+51 (1) 987-654-3'))
+        self.assertEqual(blocking_keys('', '', None, '12-34'), set())
+
+
+class FindDuplicatePatientsTest(TestCase):
+
+    def test_full_run_finds_spelling_variants(self):
+        maria = make_patient('María', 'González')
+        variant = make_patient('Maria', 'Gonzalez')
+        typo = make_patient('Mario', 'Gonzales', phone_number='987654321')
+        typo_twin = make_patient('Maria', 'Gonzales', phone_number='987 654 321')
+        make_patient('Pedro', 'Gonzalez')
+        make_patient('María', 'González', birth_date=date(1970, 1, 1))
+
+        run = find_duplicate_patients(full=True)
+
+        self.assertTrue(run.full)
+        self.assertIn((maria.pk, variant.pk), pairs())
+        self.assertIn((typo.pk, typo_twin.pk), pairs())
+        self.assertEqual(run.candidates_found, len(pairs()))
+        self.assertIsNotNone(run.finished_at)
+
+    def test_connected_pairs_share_the_lowest_id_as_cluster(self):
+        first = make_patient('Ana', 'Torres')
+        second = make_patient('Ána', 'Torres')
+        third = make_patient('Ana', 'Tórres')
+        other = make_patient('Luis', 'Quispe', phone_number='999111222')
+        other_twin = make_patient('Luis', 'Quispe', phone_number='999111222')
+
+        find_duplicate_patients(full=True)
+
+        clusters = dict(DuplicateCandidate.objects.values_list('duplicate_id', 'cluster'))
+        self.assertEqual(clusters[second.pk], first.pk)
+        self.assertEqual(clusters[third.pk], first.pk)
+        self.assertEqual(clusters[other_twin.pk], other.pk)
+
+    def test_only_patients_are_compared(self):
+        make_patient('Ana', 'Torres')
+        make_user(UserRole.DOCTOR, first_name='Ana', last_name='Torres', birth_date=BIRTH_DATE)
+
+        find_duplicate_patients(full=True)
+
+        self.assertEqual(pairs(), set())
+
+    def test_incremental_run_compares_new_patients_with_everyone(self):
+        old = make_patient('Ana', 'Torres')
+        old_twin = make_patient('Ana', 'Torres')
+        find_duplicate_patients(full=True)
+        DuplicateCandidate.objects.update(status=DuplicateStatus.DISMISSED)
+
+        new = make_patient('Ána', 'Torres')
+        run = find_duplicate_patients()
+
+        self.assertFalse(run.full)
+        self.assertEqual(run.users_scanned, 1)
+        self.assertEqual(pairs(), {(old.pk, old_twin.pk), (old.pk, new.pk), (old_twin.pk, new.pk)})
+        # The dismissed pair is not proposed again
+        self.assertEqual(
+            DuplicateCandidate.objects.get(user=old, duplicate=old_twin).status,
+            DuplicateStatus.DISMISSED,
+        )
+
+    def test_large_blocks_go_through_lsh(self):
+        patients = [make_patient(f'Paciente{index:02d}', 'Ramos') for index in range(6)]
+        twin = make_patient('Paciente03', 'Ramos')
+
+        with mock.patch('dj_users.application.logic.duplicate_patients.EXACT_BLOCK_SIZE', 2):
+            find_duplicate_patients(full=True)
+
+        self.assertIn((patients[3].pk, twin.pk), pairs())
+
+    @override_settings(DJ_USERS_DUPLICATE_MAX_BLOCK_SIZE=2)
+    def test_oversized_blocks_are_skipped(self):
+        for _ in range(3):
+            make_patient('Ana', 'Torres')
+
+        find_duplicate_patients(full=True)
+
+        self.assertEqual(pairs(), set())
@@ -0,0 +1,135 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.logic.nearby_clinics import find_nearby_clinics
+from dj_users.application.utils import geohash
+from dj_users.infrastructure.models import Clinic
+from dj_users.tests.factories import make_clinic, make_doctor, make_user
+
+NEARBY_URL = '/users/api/v1/clinics/nearby/'
+# Around Lima
+CENTER = (-12.05, -77.04)
+
+
+class GeohashTest(SimpleTestCase):
+
+    def test_encode(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+
+    def test_neighborhood_is_the_block_around_the_cell(self):
+        cells = geohash.neighborhood(*CENTER, precision=5)
+
+        self.assertEqual(len(cells), 9)
+        self.assertIn(geohash.encode(*CENTER, precision=5), cells)
+
+    def test_neighborhood_wraps_the_antimeridian(self):
+        cells = geohash.neighborhood(0.0, 179.99, precision=3)
+
+        self.assertIn(geohash.encode(0.0, -179.99, precision=3), cells)
+
+    def test_covered_radius_fits_in_the_block(self):
+        for precision in range(1, 8):
+            covered = geohash.covered_radius_km(CENTER[0], precision)
+            (height, width) = geohash.cell_size(precision)
+            self.assertLessEqual(covered, height * geohash.KM_PER_DEGREE)
+            self.assertLessEqual(covered, width * geohash.KM_PER_DEGREE)
+
+    def test_haversine(self):
+        # Lima - Cusco, about 573 km
+        self.assertAlmostEqual(
+            geohash.haversine_km(-12.0464, -77.0428, -13.5320, -71.9675), 573, delta=5
+        )
+
+
+class FindNearbyClinicsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user()
+        generator = random.Random(39)
+        cls.clinics = [
+            make_clinic(
+                owner,
+                latitude=CENTER[0] + generator.uniform(-0.5, 0.5),
+                longitude=CENTER[1] + generator.uniform(-0.5, 0.5),
+            )
+            for _ in range(60)
+        ]
+        # Never listed
+        make_clinic(owner)
+        make_clinic(
+            owner,
+            latitude=CENTER[0],
+            longitude=CENTER[1],
+            universal_state=UniversalState.FROZEN,
+        )
+
+    def _brute_force(self, latitude, longitude):
+        return sorted(
+            (
+                geohash.haversine_km(latitude, longitude, clinic.latitude, clinic.longitude),
+                clinic.pk,
+            )
+            for clinic in self.clinics
+        )
+
+    def _points(self):
+        generator = random.Random(7)
+        return [
+            (CENTER[0] + generator.uniform(-0.6, 0.6), CENTER[1] + generator.uniform(-0.6, 0.6))
+            for _ in range(15)
+        ]
+
+    def test_k_nearest_matches_brute_force(self):
+        for (latitude, longitude) in self._points():
+            for k in (1, 5, 20):
+                expected = [pk for (_, pk) in self._brute_force(latitude, longitude)[:k]]
+                found = find_nearby_clinics(latitude, longitude, k=k)
+                self.assertEqual([clinic.pk for clinic in found], expected)
+
+    def test_radius_matches_brute_force(self):
+        for (latitude, longitude) in self._points():
+            for radius_km in (2, 15, 40):
+                expected = [
+                    pk for (distance, pk) in self._brute_force(latitude, longitude)
+                    if distance <= radius_km
+                ][:50]
+                found = find_nearby_clinics(latitude, longitude, radius_km=radius_km, k=50)
+                self.assertEqual([clinic.pk for clinic in found], expected)
+
+    def test_far_away_point_falls_back_to_every_clinic(self):
+        found = find_nearby_clinics(40.0, 100.0, k=3)
+
+        self.assertEqual(len(found), 3)
+        self.assertEqual(
+            [clinic.pk for clinic in found],
+            [pk for (_, pk) in self._brute_force(40.0, 100.0)[:3]],
+        )
+
+    def test_moving_a_clinic_updates_its_geohash(self):
+        clinic = self.clinics[0]
+        clinic.latitude, clinic.longitude = 40.0, 100.0
+        clinic.save()
+
+        self.assertEqual(
+            Clinic.objects.get(pk=clinic.pk).geohash,
+            geohash.encode(40.0, 100.0),
+        )
+        (nearest,) = find_nearby_clinics(40.0, 100.0, k=1)
+        self.assertEqual(nearest.pk, clinic.pk)
+
+    def test_lists_only_directory_doctors(self):
+        clinic = find_nearby_clinics(*CENTER, k=1)[0]
+        listed = make_doctor('Ana', 'Álvarez', clinic=clinic)
+        make_doctor('Bruno', 'Benítez', clinic=clinic, verificated=False)
+
+        response = APIClient().get(NEARBY_URL, {'lat': CENTER[0], 'lng': CENTER[1], 'k': 1})
+
+        (result,) = response.data['results']
+        self.assertEqual(result['id'], clinic.pk)
+        self.assertEqual([doctor['id'] for doctor in result['doctors']], [listed.pk])
+        self.assertNotIn('owner', result)
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from dj_core_utils.db.mixins import UniversalState
+
+from dj_users.application.logic.change_password import change_user_password
+from dj_users.application.logic.token_revocation import get_token_generation, revoke_user_tokens
+from dj_users.infrastructure.models import CustomUser
+from dj_users.presentation.v1.serializers import StatelessTokenRefreshSerializer
+
+TOKEN_URL = '/users/api/token/'
+REFRESH_URL = '/users/api/token/refresh/'
+MY_USER_URL = '/users/api/v1/user/me/'
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    DJ_USERS_STATELESS_REFRESH=True,
+)
+class TokenRevocationTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='ana', email='ana@example.com', password='secret'
+        )
+        self.client = APIClient()
+        response = self.client.post(
+            TOKEN_URL, {'username': 'ana', 'password': 'secret'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.tokens = response.data
+
+    def _get_me(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        return self.client.get(MY_USER_URL)
+
+    def _refresh(self):
+        return self.client.post(REFRESH_URL, {'refresh': self.tokens['refresh']}, format='json')
+
+    def _revoke(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            revoke_user_tokens([self.user.pk])
+
+    def test_tokens_work_until_revoked(self):
+        self.assertEqual(self._get_me().status_code, status.HTTP_200_OK)
+        self.assertEqual(self._refresh().status_code, status.HTTP_200_OK)
+
+        self._revoke()
+
+        self.assertEqual(self._get_me().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._refresh().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stateless_refresh_skips_the_database_once_cached(self):
+        get_token_generation(self.user.pk)
+        serializer = StatelessTokenRefreshSerializer(data={'refresh': self.tokens['refresh']})
+
+        with self.assertNumQueries(0):
+            self.assertTrue(serializer.is_valid())
+        self.assertIn('access', serializer.validated_data)
+
+    def test_stateless_refresh_sees_the_revocation_through_the_cache(self):
+        get_token_generation(self.user.pk)
+        self._revoke()
+        serializer = StatelessTokenRefreshSerializer(data={'refresh': self.tokens['refresh']})
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(InvalidToken):
+                serializer.is_valid(raise_exception=True)
+
+    def test_password_change_revokes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            change_user_password(self.user, 'new-secret')
+
+        self.assertEqual(self._refresh().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_freezing_the_user_revokes(self):
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.universal_state = UniversalState.FROZEN
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertEqual(get_token_generation(self.user.pk), 1)
+        self.assertEqual(self._refresh().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrelated_saves_do_not_revoke(self):
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.first_name = 'Ana'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertEqual(self._refresh().status_code, status.HTTP_200_OK)
+
+    def test_rolled_back_revocation_leaves_the_cache_alone(self):
+        get_token_generation(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    revoke_user_tokens([self.user.pk])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(get_token_generation(self.user.pk), 0)
+        self.assertEqual(self._refresh().status_code, status.HTTP_200_OK)
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Cold start budget of `django.setup()` plus the first URL resolution, in ms
+STARTUP_BUDGET_MS = float(os.environ.get('DJ_USERS_STARTUP_BUDGET_MS', 3000))
+# Cumulative `-X importtime` of `dj_users.urls` after `django.setup()`, in ms
+URLS_IMPORT_BUDGET_MS = float(os.environ.get('DJ_USERS_URLS_IMPORT_BUDGET_MS', 400))
+
+# Logic loaded lazily by the signal receivers and admin actions
+LAZY_MODULES = (
+    'dj_users.application.logic.change_events',
+    'dj_users.application.logic.doctor_directory',
+    'dj_users.application.logic.token_revocation',
+    'dj_users.infrastructure.request_profiler',
+    'dj_users.infrastructure.slow_queries',
+    'dj_users.infrastructure.typeahead',
+)
+
+STARTUP_SCRIPT = '''
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import django
+django.setup()
+setup_ms = (time.perf_counter() - started) * 1000
+loaded = sorted(name for name in sys.modules if name.startswith("dj_users."))
+
+from django.urls import get_resolver
+get_resolver().resolve("/users/api/v1/user/me/")
+total_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"setup_ms": setup_ms, "total_ms": total_ms, "loaded": loaded}))
+'''
+
+URLS_IMPORT_SCRIPT = '''
+import django
+django.setup()
+import dj_users.urls
+'''
+
+
+def _run(args):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'demo.settings'}
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+    return result
+
+
+class StartupTimeTest(unittest.TestCase):
+    """Measured in a fresh interpreter, as a newly started worker would be."""
+
+    @classmethod
+    def setUpClass(cls):
+        result = _run(['-c', STARTUP_SCRIPT])
+        cls.report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_setup_and_url_resolution_within_budget(self):
+        self.assertLessEqual(
+            self.report['total_ms'],
+            STARTUP_BUDGET_MS,
+            f"django.setup() + URL resolution took {self.report['total_ms']:.0f} ms "
+            f"(setup {self.report['setup_ms']:.0f} ms), budget {STARTUP_BUDGET_MS:.0f} ms",
+        )
+
+    def test_setup_does_not_load_lazy_modules(self):
+        loaded = set(self.report['loaded']) & set(LAZY_MODULES)
+        self.assertFalse(loaded, f'Imported by django.setup(): {sorted(loaded)}')
+
+
+class UrlsImportTimeTest(unittest.TestCase):
+    """
+    What `import dj_users.urls` adds on top of `django.setup()`: the
+    viewsets, serializers, `django_filters` and simplejwt views.
+    """
+
+    def test_urls_import_within_budget(self):
+        result = _run(['-X', 'importtime', '-c', URLS_IMPORT_SCRIPT])
+        # Lines read "import time: self [us] | cumulative | package"
+        cumulative_us = None
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == 'dj_users.urls':
+                cumulative_us = int(fields[1])
+        self.assertIsNotNone(cumulative_us, 'dj_users.urls missing from -X importtime')
+
+        import_ms = cumulative_us / 1000
+        self.assertLessEqual(
+            import_ms,
+            URLS_IMPORT_BUDGET_MS,
+            f'import dj_users.urls took {import_ms:.0f} ms, '
+            f'budget {URLS_IMPORT_BUDGET_MS:.0f} ms',
+        )
@@ -1,16 +1,26 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
+from dj_users.presentation.v1 import async_views
 from dj_users.presentation.v1.viewsets import (
     UserViewSet,
     ProfileViewSet,
 )
 from dj_users.presentation.v1.viewsets import (
     RegisterUserAPIView,
+    ConfirmEmailAPIView,
     DoctorAgendaAPIView,
+    DoctorDirectoryAPIView,
+    NearbyClinicsAPIView,
+    NurseSearchAPIView,
+    NurseServiceListAPIView,
+    AvailabilityAPIView,
+    ChangeFeedAPIView,
     AdminUserProfileViewSet,
-    AdminClinicViewSet
+    AdminClinicViewSet,
+    UserTokenObtainPairView,
+    UserTokenRefreshView,
+    LoginMetricsAPIView,
 )
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
 router.register('user', UserViewSet, basename='user')
@@ -22,12 +32,42 @@ urlpatterns = [
     path('api/v1/', include(router.urls)),
     # APIView
     path('api/v1/register/', RegisterUserAPIView.as_view(), name='register_user'),
+    path('api/v1/availability/', AvailabilityAPIView.as_view(), name='availability'),
+    path('api/v1/changes/', ChangeFeedAPIView.as_view(), name='change_feed'),
+    path(
+        route='api/v1/confirm-email/<uuid:token>/',
+        view=ConfirmEmailAPIView.as_view(),
+        name='confirm_email'
+    ),
     path(
         route='api/v1/doctors/agenda/<uuid:token>/',
         view=DoctorAgendaAPIView.as_view(),
         name='doctor_agenda'
     ),
+    path(
+        route='api/v1/doctors/directory/',
+        view=DoctorDirectoryAPIView.as_view(),
+        name='doctor_directory'
+    ),
+    path('api/v1/clinics/nearby/', NearbyClinicsAPIView.as_view(), name='nearby_clinics'),
+    path('api/v1/nurses/', NurseSearchAPIView.as_view(), name='nurse_search'),
+    path('api/v1/nurses/services/', NurseServiceListAPIView.as_view(), name='nurse_services'),
+    # Async (ASGI) variants
+    path('api/v1/async/user/me/', async_views.my_user, name='my_user_async'),
+    path('api/v1/async/user/my_data/', async_views.my_data, name='my_data_async'),
+    path(
+        route='api/v1/async/user/change-password/',
+        view=async_views.change_password,
+        name='change_password_async'
+    ),
+    path('api/v1/async/profile/me/', async_views.my_profile, name='my_profile_async'),
+    path(
+        route='api/v1/async/doctors/agenda/<uuid:token>/',
+        view=async_views.doctor_agenda,
+        name='doctor_agenda_async'
+    ),
     #  Token
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/', UserTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', UserTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/metrics/', LoginMetricsAPIView.as_view(), name='token_metrics'),
 ]
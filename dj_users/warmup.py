@@ -0,0 +1,104 @@
+"""
+Worker start-up hooks.
+
+`warm_up` runs once in the gunicorn master before it forks web workers:
+it populates the URL resolvers, which imports the views, and builds the
+field maps of every serializer, so forked workers inherit them
+(copy-on-write) instead of paying for them on their first request.
+`start_indexes` runs in each web worker after the fork. Celery workers
+serve no views and need neither.
+
+Gunicorn (with `preload_app = True` in the config file)::
+
+    from dj_users.warmup import post_fork, when_ready  # noqa
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _setup():
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+        django.setup()
+
+
+def _build_serializer_fields() -> int:
+    from rest_framework.serializers import BaseSerializer
+
+    from dj_users.presentation.v1 import serializers
+
+    built = 0
+    for serializer_class in vars(serializers).values():
+        if not (
+            isinstance(serializer_class, type) and
+            issubclass(serializer_class, BaseSerializer) and
+            serializer_class.__module__ == serializers.__name__
+        ):
+            continue
+        try:
+            # Fills the model `_meta` caches and compiles the lazy validators
+            serializer_class(context={}).fields
+            built += 1
+        except Exception:
+            logger.debug('Could not warm up %s', serializer_class.__name__, exc_info=True)
+    return built
+
+
+def warm_up() -> None:
+    """Loads the views and serializers of `dj_users` ahead of the fork."""
+    started = time.monotonic()
+    _setup()
+
+    from django.db import connections
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    # Imports every urlconf (and the views behind it) and builds the reverse maps
+    resolver.reverse_dict
+    serializers = _build_serializer_fields()
+
+    # Workers must not share the master's database sockets
+    connections.close_all()
+    logger.info(
+        'dj_users warmed up in %.0f ms (%s serializers)',
+        (time.monotonic() - started) * 1000,
+        serializers,
+    )
+
+
+def start_indexes() -> None:
+    """
+    Starts the background builds of the per-process typeahead index and
+    availability filters when `DJ_USERS_WARMUP_INDEXES` is enabled, so the
+    first autocomplete/availability requests of a worker don't fall back to
+    the database.
+    """
+    _setup()
+
+    from dj_users.application.utils.settings import get_setting
+
+    if not get_setting('WARMUP_INDEXES'):
+        return
+
+    from dj_users.infrastructure.availability import availability_filter
+    from dj_users.infrastructure.typeahead import typeahead_index
+
+    typeahead_index.start()
+    availability_filter.start()
+
+
+# ======================================================================
+# Gunicorn server hooks
+# ======================================================================
+
+
+def when_ready(server):
+    warm_up()
+
+
+def post_fork(server, worker):
+    start_indexes()